@@ -1,8 +1,15 @@
 # backend/DB/database.py
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 import os
+import sqlite3
+from backend.utils.deadline import expired, remaining
+from backend.utils.logger import get_logger
+from backend.utils.memory_diagnostics import live_objects, register_component
+
+log = get_logger(__name__)
 
 # ✅ build path to root-level airline.db
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))      # backend/DB/
@@ -18,4 +25,43 @@ engine = create_engine(
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-print(f"✅ Using database at: {DATABASE_PATH}")
+log.info("Using database at: %s", DATABASE_PATH)
+
+# Request deadlines (utils/deadline.py) for every SQLite engine, including the benchmarks' synthetic ones
+DEFAULT_BUSY_TIMEOUT_MS = 5000 # sqlite3's own default lock wait outside a deadline
+PROGRESS_CHECK_OPS = 10_000 # VM instructions between deadline checks (~1ms of query work)
+
+
+@event.listens_for(Engine, "connect")
+def _install_deadline_abort(dbapi_conn, connection_record):
+    if isinstance(dbapi_conn, sqlite3.Connection):
+        # A non-zero return interrupts the running statement (OperationalError: interrupted)
+        dbapi_conn.set_progress_handler(expired, PROGRESS_CHECK_OPS)
+
+
+@event.listens_for(Engine, "checkout")
+def _limit_lock_wait(dbapi_conn, connection_record, connection_proxy):
+    if isinstance(dbapi_conn, sqlite3.Connection):
+        # Never wait on a writer's lock longer than the request has left
+        left = remaining()
+        busy_ms = DEFAULT_BUSY_TIMEOUT_MS if left is None else max(1, min(DEFAULT_BUSY_TIMEOUT_MS, int(left * 1000)))
+        dbapi_conn.execute(f"PRAGMA busy_timeout = {busy_ms}")
+
+
+def _reset_pool_after_fork():
+    # Pooled connections inherited from a preloading parent (backend/server.py) belong to it:
+    # drop them without closing so each worker opens its own
+    engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+
+def _session_memory_stats():
+    # Sessions that are never closed keep every loaded row in their identity map
+    sessions = live_objects(lambda o: isinstance(o, Session))
+    return {"live_sessions": len(sessions), "identity_map_objects": sum(len(s.identity_map) for s in sessions)}
+
+
+register_component("db_sessions", _session_memory_stats)
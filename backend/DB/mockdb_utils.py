@@ -2,13 +2,20 @@
 from backend.DB.database import SessionLocal
 from backend.DB.models import Booking, Seat, Flight, Customer
 from sqlalchemy.orm import joinedload
-from sqlalchemy import func # Import func for count
+from sqlalchemy import func, select, tuple_ # Import func for count
 from datetime import datetime
 import random
 import re # Import re for seat parsing
-from typing import Tuple, Optional, List # For type hinting
+from typing import Dict, Tuple, Optional, List # For type hinting
+from backend.utils.metrics import timed
+from backend.utils.logger import get_logger
+
+log = get_logger(__name__)
+
+UNBOOKABLE_STATUSES = ("Cancelled", "Departed", "Landed") # Flights in these states are never offered for booking
 
 # --- Flight Status ---
+@timed("db.get_flight_status_from_db")
 def get_flight_status_from_db(flight_number: str) -> Optional[str]:
     """Retrieves the current status of a flight from the mock DB."""
     db = SessionLocal()
@@ -16,12 +23,13 @@ def get_flight_status_from_db(flight_number: str) -> Optional[str]:
         flight = db.query(Flight).filter(Flight.flight_number == flight_number.upper()).first()
         return flight.current_status if flight else None
     except Exception as e:
-        print(f"[DB Utils] Error getting flight status for {flight_number}: {e}")
+        log.error("Error getting flight status for %s: %s", flight_number, e)
         return None
     finally:
         db.close()
 
 # --- Cancellation ---
+@timed("db.cancel_booking")
 def cancel_booking(pnr: str) -> str:
     """Cancels a booking by PNR and marks the seat as available."""
     db = SessionLocal()
@@ -51,21 +59,21 @@ def cancel_booking(pnr: str) -> str:
                             seat_to_free = seat
                             break
                 else:
-                     print(f"[DB Utils] Could not parse seat '{booking.assigned_seat}' for PNR {pnr}.")
+                     log.warning("Could not parse seat '%s' for PNR %s.", booking.assigned_seat, pnr)
             except ValueError:
-                 print(f"[DB Utils] Invalid number in seat '{booking.assigned_seat}' for PNR {pnr}.")
+                 log.warning("Invalid number in seat '%s' for PNR %s.", booking.assigned_seat, pnr)
             except Exception as e:
-                 print(f"[DB Utils] Unexpected error parsing seat '{booking.assigned_seat}' for PNR {pnr}: {e}")
+                 log.error("Unexpected error parsing seat '%s' for PNR %s: %s", booking.assigned_seat, pnr, e)
 
 
         if seat_to_free:
             if seat_to_free.is_booked:
-                print(f"[DB Utils] Marking seat {seat_to_free.row_number}{seat_to_free.column_letter} on flight {booking.flight_id} as not booked.")
+                log.debug("Marking seat %s%s on flight %s as not booked.", seat_to_free.row_number, seat_to_free.column_letter, booking.flight_id)
                 seat_to_free.is_booked = False
             else:
-                 print(f"[DB Utils] Seat {seat_to_free.row_number}{seat_to_free.column_letter} for PNR {pnr} was already marked as not booked.")
+                 log.info("Seat %s%s for PNR %s was already marked as not booked.", seat_to_free.row_number, seat_to_free.column_letter, pnr)
         else:
-             print(f"[DB Utils] Warning: Could not find DB entry for seat '{booking.assigned_seat}' to free for PNR {pnr}.")
+             log.warning("Could not find DB entry for seat '%s' to free for PNR %s.", booking.assigned_seat, pnr)
 
         # Update booking status and refund info
         booking.booking_status = "Cancelled"
@@ -77,73 +85,90 @@ def cancel_booking(pnr: str) -> str:
 
     except Exception as e:
         db.rollback()
-        print(f"[DB Utils] cancel_booking error for PNR {pnr}: {e}")
+        log.error("cancel_booking error for PNR %s: %s", pnr, e)
         return "An error occurred while cancelling the booking."
     finally:
         db.close()
 
 
 # --- Booking Creation ---
+def _book_seat(db, customer_id: int, flight_id: int, assigned_seat: str, fare_amount: float) -> Booking:
+    """Adds a booking for one seat to `db` and marks the seat as booked (no commit). Raises ValueError if seat is taken."""
+    # Find and check seat availability
+    seat_match = re.match(r"(\d+)([A-Z])", assigned_seat.upper())
+    if not seat_match:
+        raise ValueError(f"Invalid seat format '{assigned_seat}'. Use format like '12A'.")
+
+    seat_row = int(seat_match.group(1))
+    seat_col = seat_match.group(2)
+
+    seat = db.query(Seat).filter(
+        Seat.flight_id == flight_id,
+        Seat.row_number == seat_row,
+        Seat.column_letter == seat_col
+    ).with_for_update().first() # Lock the seat row during transaction
+
+    if not seat:
+        raise ValueError(f"Seat {assigned_seat} does not exist on this flight.")
+    if seat.is_booked:
+        raise ValueError(f"Sorry, seat {assigned_seat} is already booked.")
+
+    # Create unique PNR (simple approach)
+    pnr = "PNR" + str(random.randint(100000, 999999))
+    while db.query(Booking).filter(Booking.pnr == pnr).first(): # Ensure PNR uniqueness
+        pnr = "PNR" + str(random.randint(100000, 999999))
+
+    new_booking = Booking(
+        pnr=pnr,
+        customer_id=customer_id,
+        flight_id=flight_id,
+        booking_date=datetime.utcnow(),
+        assigned_seat=f"{seat.row_number}{seat.column_letter}", # Use confirmed seat format
+        fare_amount=fare_amount, # Use provided fare (should match seat price)
+        payment_status="Paid", # Assume payment succeeded for mock
+        booking_status="Confirmed"
+    )
+    db.add(new_booking)
+
+    # Mark seat as booked
+    seat.is_booked = True
+    log.debug("Marking seat %s%s on flight %s as booked for PNR %s.", seat.row_number, seat.column_letter, flight_id, pnr)
+    return new_booking
+
+
+@timed("db.create_booking")
 def create_booking(customer_id: int, flight_id: int, assigned_seat: str, fare_amount: float) -> Booking:
     """Creates a new booking and marks the seat as booked. Raises ValueError if seat is taken."""
-    db = SessionLocal()
-    try:
-        # Find and check seat availability
-        seat_match = re.match(r"(\d+)([A-Z])", assigned_seat.upper())
-        if not seat_match:
-            raise ValueError(f"Invalid seat format '{assigned_seat}'. Use format like '12A'.")
-
-        seat_row = int(seat_match.group(1))
-        seat_col = seat_match.group(2)
+    return create_itinerary_booking(customer_id, [(flight_id, assigned_seat, fare_amount)])[0]
 
-        seat = db.query(Seat).filter(
-            Seat.flight_id == flight_id,
-            Seat.row_number == seat_row,
-            Seat.column_letter == seat_col
-        ).with_for_update().first() # Lock the seat row during transaction
-
-        if not seat:
-            raise ValueError(f"Seat {assigned_seat} does not exist on this flight.")
-        if seat.is_booked:
-            raise ValueError(f"Sorry, seat {assigned_seat} is already booked.")
-
-        # Create unique PNR (simple approach)
-        pnr = "PNR" + str(random.randint(100000, 999999))
-        while db.query(Booking).filter(Booking.pnr == pnr).first(): # Ensure PNR uniqueness
-            pnr = "PNR" + str(random.randint(100000, 999999))
-
-        new_booking = Booking(
-            pnr=pnr,
-            customer_id=customer_id,
-            flight_id=flight_id,
-            booking_date=datetime.utcnow(),
-            assigned_seat=f"{seat.row_number}{seat.column_letter}", # Use confirmed seat format
-            fare_amount=fare_amount, # Use provided fare (should match seat price)
-            payment_status="Paid", # Assume payment succeeded for mock
-            booking_status="Confirmed"
-        )
-        db.add(new_booking)
-
-        # Mark seat as booked
-        seat.is_booked = True
-        print(f"[DB Utils] Marking seat {seat.row_number}{seat.column_letter} on flight {flight_id} as booked for PNR {pnr}.")
 
+@timed("db.create_itinerary_booking")
+def create_itinerary_booking(customer_id: int, legs: List[Tuple[int, str, float]]) -> List[Booking]:
+    """
+    Books every (flight_id, seat, fare) leg of an itinerary in one transaction, one PNR
+    per leg: either all seats are booked or none. Raises ValueError if a seat is taken.
+    """
+    db = SessionLocal()
+    try:
+        bookings = [_book_seat(db, customer_id, flight_id, seat, fare) for flight_id, seat, fare in legs]
         db.commit()
-        db.refresh(new_booking) # Refresh to get latest state
-        return new_booking
+        for booking in bookings:
+            db.refresh(booking) # Refresh to get latest state
+        return bookings
     except ValueError as ve:
          db.rollback()
-         print(f"[DB Utils] create_booking Value Error: {ve}")
+         log.info("create_booking rejected: %s", ve)
          raise # Re-raise specific errors for orchestrator
     except Exception as e:
         db.rollback()
-        print(f"[DB Utils] create_booking error: {e}")
+        log.error("create_booking error: %s", e)
         # Raise a more generic exception or handle differently
         raise Exception("An unexpected error occurred while creating the booking.") from e
     finally:
         db.close()
 
 # --- Helper Functions for Booking ---
+@timed("db.find_flights_by_route")
 def find_flights_by_route(source_code: str, dest_code: str) -> List[Flight]:
     """Finds flights matching the source and destination in the mock DB."""
     db = SessionLocal()
@@ -151,15 +176,99 @@ def find_flights_by_route(source_code: str, dest_code: str) -> List[Flight]:
         flights = db.query(Flight).filter(
             Flight.source_airport_code == source_code.upper(),
             Flight.destination_airport_code == dest_code.upper(),
-            Flight.current_status.notin_(['Cancelled', 'Departed', 'Landed']) # Only show bookable flights
+            Flight.current_status.notin_(UNBOOKABLE_STATUSES) # Only show bookable flights
         ).order_by(Flight.scheduled_departure).all() # Order by departure time
         return flights
     except Exception as e:
-        print(f"[DB Utils] Error finding flights for {source_code}->{dest_code}: {e}")
+        log.error("Error finding flights for %s->%s: %s", source_code, dest_code, e)
         return []
     finally:
         db.close()
 
+def parse_candidates_cursor(after: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """'<departure ISO>_<flight_id>' -> (departure, flight_id); raises ValueError if malformed."""
+    if after is None:
+        return None
+    departure, flight_id = after.rsplit("_", 1)
+    return datetime.fromisoformat(departure), int(flight_id)
+
+
+@timed("db.find_booking_candidates")
+def find_booking_candidates(source_code: str, dest_code: str, depart_after: Optional[datetime] = None,
+                            depart_before: Optional[datetime] = None, limit: int = 5,
+                            after: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of bookable flights on a route that still have free seats, earliest departure
+    first, each with its free seat count and, per seat_class, the free seat count and the
+    cheapest free seat: one statement instead of a seat query per flight. Returns (flights,
+    cursor of the next page or None); raises ValueError for a malformed cursor.
+
+    The page of flights is a CTE (route index range scan, keyset on departure then
+    flight_id); window functions over its free seats count them per flight and per class
+    and rank them by price, and only each class's rank-1 seat is joined back.
+    """
+    cursor = parse_candidates_cursor(after)
+    page = select(
+        Flight.flight_id, Flight.airline_code, Flight.flight_number, Flight.source_airport_code,
+        Flight.destination_airport_code, Flight.scheduled_departure, Flight.scheduled_arrival, Flight.current_status,
+    ).where(
+        Flight.source_airport_code == source_code.upper(),
+        Flight.destination_airport_code == dest_code.upper(),
+        Flight.current_status.notin_(UNBOOKABLE_STATUSES),
+        select(Seat.seat_id).where(Seat.flight_id == Flight.flight_id, Seat.is_booked == False).exists(),
+    )
+    if depart_after is not None:
+        page = page.where(Flight.scheduled_departure >= depart_after)
+    if depart_before is not None:
+        page = page.where(Flight.scheduled_departure < depart_before)
+    if cursor is not None:
+        page = page.where(tuple_(Flight.scheduled_departure, Flight.flight_id) > tuple_(*cursor))
+    page = page.order_by(Flight.scheduled_departure, Flight.flight_id).limit(limit + 1).cte("page")
+
+    by_class = (Seat.flight_id, Seat.seat_class)
+    free = select(
+        Seat.flight_id, Seat.seat_class, Seat.row_number, Seat.column_letter, Seat.price,
+        func.count().over(partition_by=Seat.flight_id).label("free_seats"),
+        func.count().over(partition_by=by_class).label("class_free_seats"),
+        func.row_number().over(partition_by=by_class,
+                               order_by=(Seat.price, Seat.row_number, Seat.column_letter)).label("price_rank"),
+    ).join(page, page.c.flight_id == Seat.flight_id).where(Seat.is_booked == False).subquery()
+    stmt = select(
+        page, free.c.seat_class, free.c.row_number, free.c.column_letter, free.c.price,
+        free.c.free_seats, free.c.class_free_seats,
+    ).join(free, (free.c.flight_id == page.c.flight_id) & (free.c.price_rank == 1)).order_by(
+        page.c.scheduled_departure, page.c.flight_id, free.c.price,
+    )
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(stmt).all()
+    finally:
+        db.close()
+
+    flights: Dict[int, dict] = {} # One row per (flight, seat_class), cheapest class first
+    for row in rows:
+        flight = flights.get(row.flight_id)
+        if flight is None:
+            flight = flights[row.flight_id] = {
+                "flight_id": row.flight_id, "airline_code": row.airline_code, "flight_number": row.flight_number,
+                "source_airport_code": row.source_airport_code, "destination_airport_code": row.destination_airport_code,
+                "scheduled_departure": row.scheduled_departure, "scheduled_arrival": row.scheduled_arrival,
+                "current_status": row.current_status, "free_seats": row.free_seats, "classes": [],
+            }
+        flight["classes"].append({
+            "seat_class": row.seat_class, "free_seats": row.class_free_seats,
+            "cheapest_seat": f"{row.row_number}{row.column_letter}", "price": row.price,
+        })
+    candidates = list(flights.values())
+    next_cursor = None
+    if len(candidates) > limit:
+        last = candidates[limit - 1]
+        next_cursor = f"{last['scheduled_departure'].isoformat()}_{last['flight_id']}"
+    return candidates[:limit], next_cursor
+
+
+@timed("db.find_available_seat")
 def find_available_seat(flight_id: int) -> Optional[Seat]:
     """Finds the first available seat for a given flight ID."""
     db = SessionLocal()
@@ -170,11 +279,12 @@ def find_available_seat(flight_id: int) -> Optional[Seat]:
         ).order_by(Seat.row_number, Seat.column_letter).first() # Get the 'first' available
         return seat
     except Exception as e:
-        print(f"[DB Utils] Error finding available seat for flight {flight_id}: {e}")
+        log.error("Error finding available seat for flight %s: %s", flight_id, e)
         return None
     finally:
         db.close()
 
+@timed("db.get_customer_by_id")
 def get_customer_by_id(customer_id: int) -> Optional[Customer]:
     """Retrieves a customer by their ID."""
     db = SessionLocal()
@@ -182,12 +292,13 @@ def get_customer_by_id(customer_id: int) -> Optional[Customer]:
         customer = db.query(Customer).filter(Customer.customer_id == customer_id).first()
         return customer
     except Exception as e:
-        print(f"[DB Utils] Error getting customer {customer_id}: {e}")
+        log.error("Error getting customer %s: %s", customer_id, e)
         return None
     finally:
         db.close()
 
 # --- NEW: Seat Availability Check ---
+@timed("db.get_seat_availability")
 def get_seat_availability(flight_number: str) -> Tuple[Optional[int], Optional[int], Optional[str]]:
     """
     Checks the number of available seats for a given flight number in the mock DB.
@@ -201,16 +312,16 @@ def get_seat_availability(flight_number: str) -> Tuple[Optional[int], Optional[i
         # 1. Find the flight_id for the given flight_number
         flight = db.query(Flight.flight_id).filter(Flight.flight_number == flight_number.upper()).first()
         if not flight:
-            print(f"[DB Utils] Flight {flight_number} not found for seat availability check.")
+            log.debug("Flight %s not found for seat availability check.", flight_number)
             return None, None, f"Sorry, I couldn't find flight {flight_number} in our records."
 
         flight_id = flight.flight_id
-        print(f"[DB Utils] Checking seat availability for flight_id: {flight_id} (Number: {flight_number})")
+        log.debug("Checking seat availability for flight_id: %s (Number: %s)", flight_id, flight_number)
 
         # 2. Count total seats for this flight_id
         total_seats = db.query(func.count(Seat.seat_id)).filter(Seat.flight_id == flight_id).scalar()
         total_seats = total_seats if total_seats is not None else 0 # Handle case where count returns None
-        print(f"[DB Utils] Total seats found: {total_seats}")
+        log.debug("Total seats found: %s", total_seats)
 
 
         # 3. Count available seats (is_booked == False) for this flight_id
@@ -219,15 +330,15 @@ def get_seat_availability(flight_number: str) -> Tuple[Optional[int], Optional[i
             Seat.is_booked == False # In SQL, False is often represented as 0
         ).scalar()
         available_seats = available_seats if available_seats is not None else 0 # Handle case where count returns None
-        print(f"[DB Utils] Available seats found: {available_seats}")
+        log.debug("Available seats found: %s", available_seats)
 
 
         return available_seats, total_seats, None # Success, no error message
 
     except Exception as e:
-        print(f"[DB Utils] Error getting seat availability for {flight_number}: {e}")
+        log.error("Error getting seat availability for %s: %s", flight_number, e)
         return None, None, "Sorry, an error occurred while checking seat availability."
     finally:
         db.close()
-        print(f"[DB Utils] Session closed for seat availability check.")
+        log.debug("Session closed for seat availability check.")
 
@@ -1,6 +1,7 @@
 # models.py
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, UniqueConstraint, Index, inspect
 from sqlalchemy.orm import relationship
+from sqlalchemy.schema import CreateIndex
 from datetime import datetime
 from backend.DB.database import Base
 
@@ -16,14 +17,15 @@ class Customer(Base):
 
 class Flight(Base):
     __tablename__ = "flights"
+    __table_args__ = (Index("ix_flights_route", "source_airport_code", "destination_airport_code", "scheduled_departure"),)
     flight_id = Column(Integer, primary_key=True, index=True)
     airline_code = Column(String)
-    flight_number = Column(String)
+    flight_number = Column(String, index=True)
     source_airport_code = Column(String)
     destination_airport_code = Column(String)
     scheduled_departure = Column(DateTime)
     scheduled_arrival = Column(DateTime)
-    current_status = Column(String)
+    current_status = Column(String, index=True)
     seats = relationship("Seat", back_populates="flight")
     bookings = relationship("Booking", back_populates="flight")
 
@@ -31,13 +33,13 @@ class Flight(Base):
 class Booking(Base):
     __tablename__ = "bookings"
     pnr = Column(String, primary_key=True, index=True)
-    customer_id = Column(Integer, ForeignKey("customers.customer_id"))
-    flight_id = Column(Integer, ForeignKey("flights.flight_id"))
+    customer_id = Column(Integer, ForeignKey("customers.customer_id"), index=True)
+    flight_id = Column(Integer, ForeignKey("flights.flight_id"), index=True)
     booking_date = Column(DateTime, default=datetime.utcnow)
     assigned_seat = Column(String)
     fare_amount = Column(Float)
     payment_status = Column(String)
-    booking_status = Column(String)
+    booking_status = Column(String, index=True)
     refund_amount = Column(Float, nullable=True)
     refund_date = Column(DateTime, nullable=True)
     customer = relationship("Customer", back_populates="bookings")
@@ -46,6 +48,7 @@ class Booking(Base):
 
 class Seat(Base):
     __tablename__ = "seats"
+    __table_args__ = (Index("ix_seats_flight_booked", "flight_id", "is_booked"),) # Per-flight lookups and free-seat counts
     seat_id = Column(Integer, primary_key=True, index=True)
     flight_id = Column(Integer, ForeignKey("flights.flight_id"))
     row_number = Column(Integer)
@@ -58,9 +61,45 @@ class Seat(Base):
 
 class Policy(Base):
     __tablename__ = "policies"
+    __table_args__ = (Index("ix_policies_airline_type", "airline_code", "policy_type"),)
     policy_id = Column(Integer, primary_key=True, index=True)
     policy_type = Column(String)
     airline_code = Column(String)
     policy_text = Column(Text) # MODIFIED: Changed from String to Text for longer policies
     source_url = Column(String)
     last_updated = Column(DateTime, default=datetime.utcnow)
+
+
+class PolicyDigest(Base):
+    """Precomputed answer for one (airline_code, policy_type), versioned by its source policies."""
+    __tablename__ = "policy_digests"
+    __table_args__ = (UniqueConstraint("airline_code", "policy_type", name="uq_policy_digest"),)
+    digest_id = Column(Integer, primary_key=True, index=True)
+    airline_code = Column(String, nullable=False)
+    policy_type = Column(String, nullable=False)
+    digest_text = Column(Text, nullable=False)
+    source_version = Column(DateTime) # max(Policy.last_updated) of the source rows
+    source_count = Column(Integer) # Number of source rows (catches deletions/back-dated inserts)
+    generator = Column(String) # "llm" or "extract"
+    generated_at = Column(DateTime, default=datetime.utcnow)
+
+
+def ensure_indexes(bind) -> int:
+    """
+    Creates the indexes declared above that an existing database is missing (create_all
+    only adds them to new tables). Tables that don't exist yet are skipped. Returns the
+    number of indexes created. Safe to run from several processes at once: the CREATE
+    is IF NOT EXISTS, so a process that loses the race to another is not an error.
+    """
+    existing_tables = set(inspect(bind).get_table_names())
+    created = 0
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {ix["name"] for ix in inspect(bind).get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                with bind.begin() as conn:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+                created += 1
+    return created
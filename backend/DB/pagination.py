@@ -0,0 +1,49 @@
+# backend/DB/pagination.py
+"""
+Keyset (cursor) pagination over one table with Core selects.
+
+Rows come back as plain dicts of the projected columns: no ORM objects, identity
+map or pydantic models are built, and each page is a single indexed range scan
+(`key > after ORDER BY key LIMIT n`), so page N costs the same as page 1.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, Table, select
+from sqlalchemy.orm import Session
+
+
+def parse_cursor(table: Table, key: str, after: Optional[str]):
+    """Converts a cursor string to the key column's Python type; raises ValueError if it doesn't fit."""
+    if after is None:
+        return None
+    return table.c[key].type.python_type(after)
+
+
+def keyset_page(session: Session, table: Table, key: str, fields: Sequence[str], filters: Dict[str, object],
+                after: Optional[str], limit: int) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of `fields` from `table`, ordered by `key`, with equality `filters`.
+    Returns (rows, cursor of the next page or None). Datetimes are ISO strings.
+    """
+    select_cols = [table.c[key]] + [table.c[f] for f in fields if f != key]
+    stmt = select(*select_cols).where(*(table.c[col] == value for col, value in filters.items()))
+    cursor = parse_cursor(table, key, after)
+    if cursor is not None:
+        stmt = stmt.where(table.c[key] > cursor)
+    rows = session.execute(stmt.order_by(table.c[key]).limit(limit + 1)).all()
+
+    next_cursor = str(rows[limit - 1][0]) if len(rows) > limit else None
+    names = [c.name for c in select_cols]
+    datetime_idx = [i for i, c in enumerate(select_cols) if isinstance(c.type, DateTime)]
+    wanted = set(fields)
+    items = []
+    for row in rows[:limit]:
+        values = list(row)
+        for i in datetime_idx:
+            if values[i] is not None:
+                values[i] = values[i].isoformat()
+        item = dict(zip(names, values))
+        if key not in wanted:
+            del item[key]
+        items.append(item)
+    return items, next_cursor
@@ -0,0 +1,322 @@
+# backend/DB/route_graph.py
+"""
+In-memory route graph for connecting itineraries (COK -> DXB -> JFK) over the flight schedule.
+
+The graph is time-expanded per airport: every bookable Flight row is a Leg in its
+origin's departure list, sorted by departure time, so "what leaves DXB between 14:45
+and 02:00" is a bisect instead of a query. Searches run in rounds of one flight each
+over flights rather than airports (as in trip-based routing): round k holds the flights
+first reachable with k flights, and expands each into the departures inside its
+connection window [arrival + min connection, arrival + max connection]. A flight is
+reached at most once, by its fewest-flights path; with a maximum layover an earlier
+arrival at an airport does not dominate a later one, so labels per airport would miss
+connections. The first round that reaches the destination gives the fewest-stops
+itinerary; later rounds are kept only if they arrive strictly earlier, so a single
+search returns the whole stops/arrival trade-off, and nothing departing after the best
+arrival so far is expanded.
+
+Updates are incremental: Flight rows written through this process's ORM are applied
+when their transaction commits (session events below), rebuilding one airport's lists
+at most. Readers never lock: an airport's lists are replaced on update, never mutated
+in place. Writes the events can't see (other server workers, sample_data.py, Core bulk
+inserts, direct SQL) are caught by a fingerprint of the bookable flights (count, ids,
+schedule times), compared at most every ROUTE_GRAPH_CHECK_S; a mismatch reloads the graph.
+
+Usage:
+    options = get_route_graph().search("COK", "JFK") # [fewest stops, ..., earliest arrival]
+"""
+import bisect
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from backend.DB.database import SessionLocal
+from backend.DB.mockdb_utils import UNBOOKABLE_STATUSES
+from backend.DB.models import Flight
+from backend.utils.config import (
+    ITINERARY_MAX_CONNECTION_H, ITINERARY_MAX_LEGS, ITINERARY_MIN_CONNECTION_MIN, ROUTE_GRAPH_CHECK_S,
+)
+from backend.utils.logger import get_logger
+from backend.utils.memory_diagnostics import deep_sizeof, register_component
+
+log = get_logger(__name__)
+
+_EPOCH = datetime(1970, 1, 1) # Schedule times are naive: seconds since this keep them comparable as floats
+_PENDING = "route_graph_changes" # Session.info key of flight changes awaiting commit
+
+
+def _ts(dt: datetime) -> float:
+    return (dt - _EPOCH).total_seconds()
+
+
+class Leg(NamedTuple):
+    flight_id: int
+    flight_number: str
+    source: str
+    destination: str
+    dep_ts: float # Seconds since _EPOCH
+    arr_ts: float
+
+    @property
+    def departure(self) -> datetime:
+        return _EPOCH + timedelta(seconds=self.dep_ts)
+
+    @property
+    def arrival(self) -> datetime:
+        return _EPOCH + timedelta(seconds=self.arr_ts)
+
+    @classmethod
+    def from_flight(cls, flight) -> Optional["Leg"]:
+        """Leg for a Flight (ORM object or row of its columns); None if it can't be booked."""
+        if (flight.current_status is None or flight.current_status in UNBOOKABLE_STATUSES
+                or None in (flight.source_airport_code, flight.destination_airport_code,
+                            flight.scheduled_departure, flight.scheduled_arrival)):
+            return None
+        return cls(flight.flight_id, flight.flight_number,
+                   sys.intern(flight.source_airport_code), sys.intern(flight.destination_airport_code),
+                   _ts(flight.scheduled_departure), _ts(flight.scheduled_arrival))
+
+
+class Itinerary(NamedTuple):
+    legs: Tuple[Leg, ...]
+
+    @property
+    def stops(self) -> int:
+        return len(self.legs) - 1
+
+    @property
+    def departure(self) -> datetime:
+        return self.legs[0].departure
+
+    @property
+    def arrival(self) -> datetime:
+        return self.legs[-1].arrival
+
+    @property
+    def via(self) -> List[str]:
+        return [leg.destination for leg in self.legs[:-1]]
+
+
+class RouteGraph:
+    def __init__(self, legs: Iterable[Leg] = (), min_connection_min: float = ITINERARY_MIN_CONNECTION_MIN,
+                 max_connection_h: float = ITINERARY_MAX_CONNECTION_H):
+        self.min_connection_s = min_connection_min * 60
+        self.max_connection_s = max_connection_h * 3600
+        self._lock = threading.Lock() # Serializes writers only
+        self.fingerprint: Optional[tuple] = None # flight_fingerprint() when loaded from the DB
+        self._by_id: Dict[int, Leg] = {}
+        for leg in legs:
+            self._by_id[leg.flight_id] = leg
+        grouped: Dict[str, List[Leg]] = {}
+        for leg in self._by_id.values():
+            grouped.setdefault(leg.source, []).append(leg)
+        # Per origin airport: (departure times, legs), both sorted by departure; times are the bisect keys
+        self._departures: Dict[str, Tuple[List[float], List[Leg]]] = {}
+        for airport, airport_legs in grouped.items():
+            airport_legs.sort(key=lambda leg: leg.dep_ts)
+            self._departures[airport] = ([leg.dep_ts for leg in airport_legs], airport_legs)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def apply(self, changes: Iterable[Tuple[int, Optional[Leg]]]) -> None:
+        """Applies (flight_id, leg) pairs; leg None removes the flight (deleted or no longer bookable)."""
+        with self._lock:
+            for flight_id, leg in changes:
+                if self._by_id.get(flight_id) == leg:
+                    continue # Unchanged (e.g. only its seats or bookings were touched)
+                self._remove(flight_id)
+                if leg is not None:
+                    self._insert(leg)
+
+    def upsert(self, leg: Leg) -> None:
+        self.apply([(leg.flight_id, leg)])
+
+    def remove(self, flight_id: int) -> None:
+        self.apply([(flight_id, None)])
+
+    def _insert(self, leg: Leg) -> None:
+        self._by_id[leg.flight_id] = leg
+        times, legs = self._departures.get(leg.source, ([], []))
+        i = bisect.bisect_right(times, leg.dep_ts)
+        # New lists, so a search iterating the old ones is unaffected
+        self._departures[leg.source] = (times[:i] + [leg.dep_ts] + times[i:], legs[:i] + [leg] + legs[i:])
+
+    def _remove(self, flight_id: int) -> None:
+        leg = self._by_id.pop(flight_id, None)
+        if leg is None:
+            return
+        times, legs = self._departures[leg.source]
+        i = bisect.bisect_left(times, leg.dep_ts)
+        while legs[i].flight_id != flight_id: # Other flights can leave at the same minute
+            i += 1
+        self._departures[leg.source] = (times[:i] + times[i + 1:], legs[:i] + legs[i + 1:])
+
+    def search(self, source: str, destination: str, depart_after: Optional[datetime] = None,
+               max_legs: int = ITINERARY_MAX_LEGS) -> List[Itinerary]:
+        """
+        Itineraries from source to destination, fewest stops first; each later one has
+        more stops and arrives strictly earlier (the last one is the earliest arrival).
+        depart_after None: from the first scheduled departure on. Empty if unreachable.
+        """
+        if source == destination or source not in self._departures:
+            return []
+        start = _ts(depart_after) if depart_after else float("-inf")
+        target = float("inf") # Best arrival at the destination so far: nothing departing later can beat it
+        parent: Dict[int, Optional[Leg]] = {} # Reached flights -> previous flight (None for the first)
+        options: List[Itinerary] = []
+
+        def reach(leg: Leg, previous: Optional[Leg], frontier: List[Leg]) -> Optional[Leg]:
+            # Marks `leg` reached; returns it if it lands at the destination (never continued), else queues it
+            parent[leg.flight_id] = previous
+            if leg.destination == destination:
+                return leg
+            frontier.append(leg)
+            return None
+
+        times, legs = self._departures[source]
+        frontier: List[Leg] = [] # Round 1: every flight out of the source
+        arrived = None
+        for leg in legs[bisect.bisect_left(times, start):]:
+            if reach(leg, None, frontier) and (arrived is None or leg.arr_ts < arrived.arr_ts):
+                arrived = leg
+        for round_ in range(1, max_legs + 1):
+            if arrived is not None:
+                target = arrived.arr_ts
+                path = [arrived]
+                while parent[path[-1].flight_id] is not None:
+                    path.append(parent[path[-1].flight_id])
+                options.append(Itinerary(tuple(reversed(path))))
+            if round_ == max_legs:
+                break
+            # Earliest arrivals first: they find the destination soonest, and every arrival
+            # there tightens `target` for the rest of the round
+            frontier.sort(key=lambda leg: leg.arr_ts)
+            expanded: List[Leg] = []
+            arrived = None
+            for leg in frontier:
+                if leg.arr_ts + self.min_connection_s >= target:
+                    break # Sorted: no later flight in this round can connect in time either
+                entry = self._departures.get(leg.destination)
+                if entry is None:
+                    continue
+                times, legs = entry
+                latest = leg.arr_ts + self.max_connection_s
+                for i in range(bisect.bisect_left(times, leg.arr_ts + self.min_connection_s), len(times)):
+                    if times[i] > latest or times[i] >= target:
+                        break
+                    onward = legs[i]
+                    if onward.flight_id not in parent and onward.arr_ts < target and reach(onward, leg, expanded):
+                        arrived, target = onward, onward.arr_ts
+            if not expanded and arrived is None:
+                break
+            frontier = expanded
+        return options
+
+
+_graph: Optional[RouteGraph] = None
+_graph_lock = threading.Lock()
+_checked_at = 0.0 # time.monotonic() of the last fingerprint check
+register_component("route_graph", lambda: {
+    "flights": len(_graph) if _graph else 0, "bytes": deep_sizeof(_graph) if _graph else 0,
+})
+
+
+def _fingerprint_query():
+    # Changes with any insert, delete, cancellation or reschedule of a bookable flight (SQLite functions)
+    return select(
+        func.count(), func.max(Flight.flight_id), func.total(Flight.flight_id),
+        func.total(func.julianday(Flight.scheduled_departure)), func.total(func.julianday(Flight.scheduled_arrival)),
+    ).where(Flight.current_status.notin_(UNBOOKABLE_STATUSES))
+
+
+def flight_fingerprint() -> tuple:
+    """One aggregate over the bookable flights; differs from the graph's once the table changed under it."""
+    db = SessionLocal()
+    try:
+        return tuple(db.execute(_fingerprint_query()).one())
+    finally:
+        db.close()
+
+
+def load_route_graph() -> RouteGraph:
+    """Builds a graph from the bookable rows of the Flight table (one Core select, no ORM objects)."""
+    db = SessionLocal()
+    try:
+        # Taken first: a write landing during the load makes the next check reload, never hides it
+        fingerprint = tuple(db.execute(_fingerprint_query()).one())
+        rows = db.execute(select(
+            Flight.flight_id, Flight.flight_number, Flight.source_airport_code, Flight.destination_airport_code,
+            Flight.scheduled_departure, Flight.scheduled_arrival, Flight.current_status,
+        ).where(Flight.current_status.notin_(UNBOOKABLE_STATUSES))).all()
+    finally:
+        db.close()
+    graph = RouteGraph(leg for leg in map(Leg.from_flight, rows) if leg is not None)
+    graph.fingerprint = fingerprint
+    return graph
+
+
+def _is_stale(graph: RouteGraph) -> bool:
+    try:
+        return flight_fingerprint() != graph.fingerprint
+    except Exception as e: # E.g. interrupted by the request deadline: keep serving, check again later
+        log.warning("Route graph staleness check failed: %s", e)
+        return False
+
+
+def get_route_graph() -> RouteGraph:
+    """
+    The process-wide graph: loaded on first use, kept current by the session events
+    below, and reloaded when the periodic fingerprint check finds outside changes.
+    """
+    global _graph, _checked_at
+    graph = _graph
+    if graph is not None and time.monotonic() - _checked_at < ROUTE_GRAPH_CHECK_S:
+        return graph
+    # One thread checks (and reloads); the others keep searching the current graph meanwhile
+    if not _graph_lock.acquire(blocking=graph is None):
+        return graph
+    try:
+        if _graph is None or (time.monotonic() - _checked_at >= ROUTE_GRAPH_CHECK_S and _is_stale(_graph)):
+            action = "Loaded" if _graph is None else "Flights changed outside this process; reloaded"
+            t0 = time.perf_counter()
+            _graph = load_route_graph()
+            log.info("%s route graph: %d flights in %.2fs", action, len(_graph), time.perf_counter() - t0)
+        _checked_at = time.monotonic()
+    finally:
+        _graph_lock.release()
+    return _graph
+
+
+def reset_route_graph() -> None:
+    """Drops the graph (after bulk loads or re-binding SessionLocal); the next search reloads it."""
+    global _graph
+    _graph = None
+
+
+# --- Incremental updates: flights flushed in a transaction reach the graph when it commits ---
+@event.listens_for(Session, "after_flush")
+def _collect_flight_changes(session, flush_context):
+    changes = None
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Flight):
+            changes = changes if changes is not None else session.info.setdefault(_PENDING, {})
+            changes[obj.flight_id] = None if obj in session.deleted else Leg.from_flight(obj)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_flight_changes(session):
+    changes = session.info.pop(_PENDING, None)
+    if changes and _graph is not None:
+        _graph.apply(changes.items())
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_flight_changes(session):
+    session.info.pop(_PENDING, None)
@@ -1,9 +1,35 @@
 import os
 import requests
 from datetime import datetime
+from backend.utils.deadline import stage_timeout
+from backend.utils.http_session import pooled_session
+from backend.utils.metrics import timed
+from backend.utils.logger import get_logger
+
+log = get_logger(__name__)
 
 API_KEY = os.getenv("AVIATIONSTACK_API_KEY", "")
-BASE_URL = "http://api.aviationstack.com/v1/flights"
+# Override to point at a local stand-in (e.g. backend/benchmarks/fake_servers.py) for load testing
+BASE_URL = os.getenv("AVIATIONSTACK_BASE_URL", "http://api.aviationstack.com").rstrip("/") + "/v1/flights"
+
+# One keep-alive session per process, created on first use (and again in each forked worker)
+_session: requests.Session | None = None
+
+
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        _session = pooled_session(retries=1)
+    return _session
+
+
+def _reset_session_after_fork():
+    global _session
+    _session = None # The parent's pooled sockets must not be shared with a child
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_session_after_fork)
 
 def _normalize_flight_data(rec: dict) -> dict:
     """Helper function to normalize a single flight record from AviationStack."""
@@ -25,6 +51,7 @@ def _normalize_flight_data(rec: dict) -> dict:
         "raw": rec
     }
 
+@timed("aviationstack.get_live_flight_data")
 def get_live_flight_data(flight_number: str) -> dict | None:
     """
     Returns normalized flight info dict or None.
@@ -33,31 +60,32 @@ def get_live_flight_data(flight_number: str) -> dict | None:
     """
     if not API_KEY:
         # No key configured — caller should handle fallback
-        print("[AviationStack] No API key configured.")
+        log.debug("No API key configured.")
         return None
 
     params = {"access_key": API_KEY, "flight_iata": flight_number}
     try:
-        resp = requests.get(BASE_URL, params=params, timeout=8)
+        resp = _get_session().get(BASE_URL, params=params, timeout=stage_timeout(8))
         resp.raise_for_status()
         data = resp.json()
         if not data.get("data") or len(data["data"]) == 0:
-            print(f"[AviationStack] No data found for {flight_number}")
+            log.info("No data found for %s", flight_number)
             return None
 
         # take first matching record
         rec = data["data"][0]
         return _normalize_flight_data(rec)
     except Exception as e:
-        print(f"[AviationStack] error in get_live_flight_data: {e}")
+        log.error("error in get_live_flight_data: %s", e)
         return None
 
+@timed("aviationstack.search_flights_by_route")
 def search_flights_by_route(dep_iata: str, arr_iata: str) -> list[dict] | None:
     """
     Searches for flights between two airports for the current day.
     """
     if not API_KEY:
-        print("[AviationStack] No API key configured.")
+        log.debug("No API key configured.")
         return None
 
     # Get today's date in YYYY-MM-DD format
@@ -72,18 +100,18 @@ def search_flights_by_route(dep_iata: str, arr_iata: str) -> list[dict] | None:
     }
     
     try:
-        resp = requests.get(BASE_URL, params=params, timeout=10)
+        resp = _get_session().get(BASE_URL, params=params, timeout=stage_timeout(10))
         resp.raise_for_status()
         data = resp.json()
         
         if not data.get("data") or len(data["data"]) == 0:
-            print(f"[AviationStack] No flights found for route {dep_iata}->{arr_iata} on {flight_date}")
+            log.info("No flights found for route %s->%s on %s", dep_iata, arr_iata, flight_date)
             return [] # Return empty list for no flights
 
         # Normalize all flight records
         flights = [_normalize_flight_data(rec) for rec in data["data"]]
         return flights
     except Exception as e:
-        print(f"[AviationStack] error in search_flights_by_route: {e}")
+        log.error("error in search_flights_by_route: %s", e)
         return None # Return None for an actual API error
 
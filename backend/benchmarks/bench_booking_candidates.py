@@ -0,0 +1,123 @@
+# backend/benchmarks/bench_booking_candidates.py
+"""
+Booking candidates for a route: one set-based query vs the per-flight lookups it replaces.
+
+Three ways to get the top --limit upcoming flights of a route, each with its free
+seats and the cheapest free seat per class, on the synthetic database:
+
+  * per_flight: find_flights_by_route() (every flight of the route, as ORM objects), then
+                per flight a free-seat count and a cheapest-seat query per class (1 + N + N*C)
+  * first_seat: what the booking flow did before, find_flights_by_route() plus
+                find_available_seat() until one flight has a seat (less data, no choice)
+  * candidates: find_booking_candidates(), one statement
+
+Reported per method: latency percentiles and SQL statements per lookup (counted with a
+before_cursor_execute listener on the engine).
+
+Usage (from the project root):
+    python -m backend.benchmarks.bench_booking_candidates --size large --limit 5 --iterations 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List
+
+from sqlalchemy import event, func
+
+from backend.benchmarks.stats import latency_summary
+from backend.benchmarks.synthetic_db import SIZES, build_synthetic_db, restore_default_database, use_database
+from backend.DB import database
+from backend.DB.mockdb_utils import find_available_seat, find_booking_candidates, find_flights_by_route
+from backend.DB.models import Seat
+
+
+def per_flight(source: str, dest: str, limit: int) -> List[dict]:
+    flights = find_flights_by_route(source, dest)
+    out = []
+    db = database.SessionLocal()
+    try:
+        for flight in flights:
+            if len(out) == limit:
+                break
+            free = db.query(func.count(Seat.seat_id)).filter(
+                Seat.flight_id == flight.flight_id, Seat.is_booked == False).scalar()
+            if not free:
+                continue
+            classes = []
+            for (seat_class,) in db.query(Seat.seat_class).filter(Seat.flight_id == flight.flight_id).distinct():
+                seat = db.query(Seat).filter(
+                    Seat.flight_id == flight.flight_id, Seat.seat_class == seat_class, Seat.is_booked == False,
+                ).order_by(Seat.price, Seat.row_number, Seat.column_letter).first()
+                if seat is not None:
+                    classes.append((seat_class, f"{seat.row_number}{seat.column_letter}", seat.price))
+            out.append({"flight_id": flight.flight_id, "free_seats": free, "classes": classes})
+    finally:
+        db.close()
+    return out
+
+
+def first_seat(source: str, dest: str, limit: int) -> List[dict]:
+    for flight in find_flights_by_route(source, dest):
+        seat = find_available_seat(flight.flight_id)
+        if seat is not None:
+            return [{"flight_id": flight.flight_id, "seat": f"{seat.row_number}{seat.column_letter}"}]
+    return []
+
+
+def candidates(source: str, dest: str, limit: int) -> List[dict]:
+    return find_booking_candidates(source, dest, limit=limit)[0]
+
+
+METHODS = {"per_flight": per_flight, "first_seat": first_seat, "candidates": candidates}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Booking candidates: one query vs per-flight lookups")
+    parser.add_argument("--size", default="large", choices=sorted(SIZES))
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    report = {"config": vars(args), "results": {}}
+    print(f"[Bench] Building synthetic '{args.size}' database...", file=sys.stderr)
+    db = build_synthetic_db(SIZES[args.size])
+    use_database(db.engine)
+    statements = [0]
+
+    @event.listens_for(db.engine, "before_cursor_execute")
+    def count_statement(*_):
+        statements[0] += 1
+
+    try:
+        for name, method in METHODS.items():
+            latencies = []
+            statements[0] = 0
+            for i in range(args.iterations):
+                source, dest = db.routes[i % len(db.routes)]
+                t0 = time.perf_counter()
+                method(source, dest, args.limit)
+                latencies.append(time.perf_counter() - t0)
+            stats = latency_summary(latencies)
+            stats["statements_per_lookup"] = round(statements[0] / args.iterations, 1)
+            report["results"][name] = stats
+            print(f"[Bench] {name:<10} p50={stats['p50_ms']:7.2f}ms p99={stats['p99_ms']:7.2f}ms "
+                  f"statements={stats['statements_per_lookup']}", file=sys.stderr)
+    finally:
+        restore_default_database()
+        db.engine.dispose()
+        os.remove(db.path)
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+# backend/benchmarks/bench_conversation_state.py
+"""
+Bytes per active user of the orchestrator's conversation state, three layouts:
+
+  * dict:   the previous layout, a dict of awaiting_* flags and *_details dicts plus a
+            "history" list of "USER: ..."/"BOT: ..." strings re-sliced to 10 lines every turn
+  * deque:  slotted state with a deque(maxlen=5) of packed turns
+  * slots:  ConversationState (query_processing/conversation_state.py): slotted state,
+            FlowStep enum, slotted details, list ring buffer of packed (user, bot) turns
+
+Every layout replays the same conversations (1-8 turns per user, ~10% of users left
+mid-booking) with freshly built message strings, so text is counted in all three.
+Memory is the tracemalloc delta of building --users states; serialized size is
+json.dumps of the dict vs ConversationState.to_bytes().
+
+Usage (from the project root):
+    python -m backend.benchmarks.bench_conversation_state --users 100000
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+from typing import Callable, Dict, List, Tuple
+
+from backend.query_processing.conversation_state import (
+    HISTORY_TURNS, ConversationState, FlowDetails, FlowStep, pack_turn,
+)
+
+USER_TEMPLATES = ["What is the status of flight AI{n}?", "How many seats are left on 6E{n}?",
+                  "What is the baggage policy for booking {n}?", "Show me flights from DEL to BOM on day {n}"]
+BOT_TEMPLATE = ("Flight AI{n} (Air India) is currently *scheduled*. It is flying from DEL International "
+                "to BOM International, departing at 10:{m:02d}.")
+
+
+class DequeState:
+    """The textbook variant: same fields, history in a deque(maxlen=HISTORY_TURNS)."""
+    __slots__ = ("step", "details", "history")
+
+    def __init__(self):
+        self.step = FlowStep.NONE
+        self.details = None
+        self.history = deque(maxlen=HISTORY_TURNS)
+
+
+def dict_turn(state: dict, q: str, response: str) -> None:
+    # What process_user_query did per turn before ConversationState
+    state["history"].append(f"USER: {q}")
+    state["history"].append(f"BOT: {response}")
+    if len(state["history"]) > 2 * HISTORY_TURNS:
+        state["history"] = state["history"][-2 * HISTORY_TURNS:]
+
+
+def build_dict(plan: List[Tuple[int, bool]]) -> Dict[str, dict]:
+    states = {}
+    for user, (turns, in_flow) in enumerate(plan):
+        state = {"history": []}
+        for t in range(turns):
+            dict_turn(state, USER_TEMPLATES[t % 4].format(n=user + t), BOT_TEMPLATE.format(n=user, m=t))
+        if in_flow:
+            state["awaiting_booking_source"] = False
+            state["awaiting_booking_dest"] = True
+            state["booking_details"] = {"source": "DEL", "destination": "BOM"}
+        states[f"user-{user}"] = state
+    return states
+
+
+def build_deque(plan: List[Tuple[int, bool]]) -> Dict[str, DequeState]:
+    states = {}
+    for user, (turns, in_flow) in enumerate(plan):
+        state = DequeState()
+        for t in range(turns):
+            turn = pack_turn(USER_TEMPLATES[t % 4].format(n=user + t), BOT_TEMPLATE.format(n=user, m=t))
+            state.history.append(turn)
+        if in_flow:
+            state.step = FlowStep.AWAITING_BOOKING_DEST
+            state.details = FlowDetails(source="DEL", destination="BOM")
+        states[f"user-{user}"] = state
+    return states
+
+
+def build_slots(plan: List[Tuple[int, bool]]) -> Dict[str, ConversationState]:
+    states = {}
+    for user, (turns, in_flow) in enumerate(plan):
+        state = ConversationState()
+        for t in range(turns):
+            state.add_turn(USER_TEMPLATES[t % 4].format(n=user + t), BOT_TEMPLATE.format(n=user, m=t))
+        if in_flow:
+            details = state.start(FlowStep.AWAITING_BOOKING_DEST)
+            details.source, details.destination = "DEL", "BOM"
+        states[f"user-{user}"] = state
+    return states
+
+
+def measure_memory(build: Callable[[List[Tuple[int, bool]]], dict], plan: List[Tuple[int, bool]]) -> Tuple[dict, dict]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    states = build(plan)
+    elapsed = time.perf_counter() - t0
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return states, {"bytes_per_user": round(used / len(plan), 1), "total_mb": round(used / 2**20, 1),
+                    "build_us_per_turn": round(elapsed / sum(t for t, _ in plan) * 1e6, 3)}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Conversation state bytes per active user")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    plan = [(rng.randint(1, 8), rng.random() < 0.1) for _ in range(args.users)]
+    report = {"config": vars(args), "results": {}}
+    for name, build in (("dict", build_dict), ("deque", build_deque), ("slots", build_slots)):
+        states, stats = measure_memory(build, plan)
+        sample = list(states.values())[: min(len(states), 10_000)]
+        if name == "dict":
+            stats["serialized_bytes"] = round(sum(len(json.dumps(s)) for s in sample) / len(sample), 1)
+        elif name == "slots":
+            stats["serialized_bytes"] = round(sum(len(s.to_bytes()) for s in sample) / len(sample), 1)
+        report["results"][name] = stats
+        print(f"[Bench] {name:<5} {stats['bytes_per_user']:8.1f} B/user  total={stats['total_mb']:.1f}MB  "
+              f"build={stats['build_us_per_turn']:.2f}us/turn"
+              + (f"  serialized={stats['serialized_bytes']:.0f}B" if "serialized_bytes" in stats else ""),
+              file=sys.stderr)
+        del states, sample
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# backend/benchmarks/bench_deadlines.py
+"""
+Turn latency against slow externals, with and without a per-request deadline.
+
+AviationStack and the LLM are stubbed (stubs.py) with a slow, wide latency
+distribution, and the stubs honour the timeouts they are given the way the real
+clients do. Each scenario runs once per --deadlines entry ("none" = no deadline,
+the behaviour before request deadlines) inside request_deadline(), as /query does.
+
+Reported per scenario and deadline: latency percentiles, the share of turns that
+overran the deadline, and how often a stage was degraded (live API or LLM skipped
+for the DB/template answer), from trip_assistant_deadline_events_total.
+
+Usage (from the project root):
+    python -m backend.benchmarks.bench_deadlines --deadlines none,2,5 --iterations 20
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List
+
+from backend.benchmarks.bench_orchestrator import SCENARIOS
+from backend.benchmarks.stats import latency_summary
+from backend.benchmarks.stubs import StubLatency, stubbed_externals
+from backend.benchmarks.synthetic_db import SIZES, build_synthetic_db, restore_default_database, use_database
+from backend.query_processing import orchestrator
+from backend.utils.deadline import DEADLINE_EVENTS, request_deadline
+
+DEFAULT_PATHS = "flight_status,route_search,fallback"
+STAGES = ("aviationstack", "llm", "llm_retry")
+
+
+def degraded_counts() -> dict:
+    return {stage: DEADLINE_EVENTS.value(stage, "degraded") for stage in STAGES}
+
+
+def run(db, path: str, deadline_s: float | None, iterations: int) -> dict:
+    before = degraded_counts()
+    latencies: List[float] = []
+    for i in range(iterations):
+        user_id = f"bench-deadline-{path}-{i}"
+        for turn in SCENARIOS[path](db, i):
+            t0 = time.perf_counter()
+            with request_deadline(deadline_s):
+                orchestrator.process_user_query(user_id, turn)
+            latencies.append(time.perf_counter() - t0)
+        orchestrator.conversation_state.pop(user_id, None)
+    stats = latency_summary(latencies)
+    stats["over_deadline"] = round(sum(t > deadline_s for t in latencies) / len(latencies), 3) if deadline_s else None
+    stats["degraded"] = {stage: n - before[stage] for stage, n in degraded_counts().items() if n > before[stage]}
+    return stats
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Turn latency with slow externals, with and without deadlines")
+    parser.add_argument("--deadlines", default="none,2,5", help='Comma-separated seconds; "none" for no deadline')
+    parser.add_argument("--paths", default=DEFAULT_PATHS, help="Comma-separated scenario names from bench_orchestrator")
+    parser.add_argument("--size", default="small", choices=sorted(SIZES))
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--api-latency-ms", type=float, default=1500.0)
+    parser.add_argument("--api-jitter-ms", type=float, default=4000.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=2000.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=6000.0)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    deadlines = [None if d.strip() == "none" else float(d) for d in args.deadlines.split(",") if d.strip()]
+    paths = [p.strip() for p in args.paths.split(",") if p.strip()]
+    report = {"config": vars(args), "results": {}}
+
+    print(f"[Bench] Building synthetic '{args.size}' database...", file=sys.stderr)
+    db = build_synthetic_db(SIZES[args.size])
+    use_database(db.engine)
+    try:
+        for path in paths:
+            report["results"][path] = {}
+            for deadline_s in deadlines:
+                # Same seeds per run, so every deadline sees the same latency samples
+                llm_latency = StubLatency(args.llm_latency_ms, args.llm_jitter_ms, seed=1)
+                api_latency = StubLatency(args.api_latency_ms, args.api_jitter_ms, seed=2)
+                with stubbed_externals(llm_latency, api_latency):
+                    stats = run(db, path, deadline_s, args.iterations)
+                label = "none" if deadline_s is None else f"{deadline_s:g}s"
+                report["results"][path][label] = stats
+                print(f"[Bench] {path:<14} deadline={label:<5} p50={stats['p50_ms']:8.1f}ms "
+                      f"p99={stats['p99_ms']:8.1f}ms max={stats['max_ms']:8.1f}ms "
+                      f"over={stats['over_deadline']} degraded={stats['degraded']}", file=sys.stderr)
+    finally:
+        restore_default_database()
+        db.engine.dispose()
+        os.remove(db.path)
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
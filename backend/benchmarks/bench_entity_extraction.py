@@ -0,0 +1,172 @@
+# backend/benchmarks/bench_entity_extraction.py
+"""
+Microbenchmark for extract_entities_and_keywords.
+
+Compares, per query over a realistic corpus:
+  * keyword scan: the old per-keyword `re.search(r'\\b' + kw + r'\\b')` loop vs the
+    single precompiled KEYWORD_RE alternation;
+  * full extraction: the complete en_core_web_sm pipeline vs the NER-only pipeline
+    (skipped if the model isn't installed);
+  * how often the rules tier decided without running NER, and the time that saved;
+  * the memoized entry point on repeated, differently spelled queries vs uncached
+    extraction, with the cache hit rate.
+
+Usage (from the project root):
+    python -m backend.benchmarks.bench_entity_extraction --repeat 200 --output extraction.json
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from typing import Callable, List
+
+import spacy
+
+from backend.benchmarks.stats import latency_summary
+from backend.query_processing import spacy_processor
+
+QUERY_CORPUS = [
+    "What is the status of flight AI202?",
+    "status of AI 202",
+    "Is EK510 on time?",
+    "When does UA123 depart?",
+    "What's the departure gate for AI305?",
+    "Which terminal does EK510 arrive at?",
+    "Has AI450 been delayed? What's the new ETA?",
+    "How many seats are available on AI202?",
+    "Are there any empty seats on EK510",
+    "seat availability for UA123 please",
+    "I want to cancel my booking",
+    "Please cancel my flight ticket, my PNR is PNR12345",
+    "cancel my booking",
+    "I want to book a flight",
+    "Book me a flight from Delhi to Mumbai next Friday",
+    "Can you book a seat for me on a flight to Bangalore?",
+    "Search flights from DEL to BOM",
+    "Find flights from BLR to DEL tomorrow",
+    "Look for flights to Dubai",
+    "Are there flights flying from LHR to EWR today?",
+    "What is the baggage policy?",
+    "What is the baggage allowance on Emirates for economy?",
+    "Can I bring my pet on Delta?",
+    "Do you allow animals in the cabin on United flights?",
+    "What is the refund policy for Air India?",
+    "When does online check-in open?",
+    "How early should I check in at the airport for an international flight?",
+    "What is the cancellation policy for Emirates?",
+    "Hi there!",
+    "Thanks, that's all",
+    "Tell me something interesting about travelling",
+    "Can you help me plan a trip to Paris in December?",
+    "My flight AI202 from Delhi was cancelled, can I get a refund?",
+    "Is there wifi on board?",
+    "What's the schedule for flights between Mumbai and Chennai on Monday?",
+    "I need to change the date of my booking PNR67890",
+]
+
+
+def legacy_keyword_scan(text: str) -> List[str]:
+    """The pre-optimization loop: one freshly built regex search per keyword."""
+    text_lower = text.lower()
+    detected = []
+    for kw in spacy_processor.KEYWORDS:
+        if re.search(r'\b' + re.escape(kw) + r'\b', text_lower):
+            detected.append(kw)
+    return sorted(set(detected))
+
+
+def compiled_keyword_scan(text: str) -> List[str]:
+    return sorted({m.group(0) for m in spacy_processor.KEYWORD_RE.finditer(text.lower())})
+
+
+def spelling_variants(corpus: List[str]) -> List[str]:
+    """Each query as typed, lowercased, uppercased and with extra/odd whitespace."""
+    variants = []
+    for text in corpus:
+        variants += [text, text.lower(), text.upper(), "  " + text.replace(" ", "   ") + " "]
+    return variants
+
+
+def time_per_query(func: Callable[[str], object], corpus: List[str], repeat: int) -> dict:
+    """Times each call of `func` over `repeat` passes of the corpus."""
+    for text in corpus: # Warm-up (regex cache, spaCy vocab)
+        func(text)
+    samples = []
+    for _ in range(repeat):
+        for text in corpus:
+            t0 = time.perf_counter()
+            func(text)
+            samples.append(time.perf_counter() - t0)
+    return latency_summary(samples)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Entity extraction microbenchmark")
+    parser.add_argument("--repeat", type=int, default=100, help="Passes over the query corpus")
+    parser.add_argument("--model", default="en_core_web_sm")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    mismatches = [q for q in QUERY_CORPUS if legacy_keyword_scan(q) != compiled_keyword_scan(q)]
+    if mismatches:
+        print(f"[Bench] Keyword scan results differ for: {mismatches}", file=sys.stderr)
+        return 1
+
+    report = {
+        "corpus_size": len(QUERY_CORPUS),
+        "repeat": args.repeat,
+        "keyword_scan": {
+            "legacy_loop": time_per_query(legacy_keyword_scan, QUERY_CORPUS, args.repeat),
+            "compiled_alternation": time_per_query(compiled_keyword_scan, QUERY_CORPUS, args.repeat),
+        },
+    }
+
+    try:
+        full = spacy.load(args.model)
+        trimmed = spacy_processor.load_ner_pipeline(args.model)
+    except OSError:
+        report["extraction"] = f"skipped: spaCy model '{args.model}' is not installed"
+    else:
+        original = spacy_processor.nlp
+        results = {}
+        try:
+            for label, pipeline in (("full_pipeline", full), ("ner_only_pipeline", trimmed)):
+                spacy_processor.nlp = pipeline
+                results[label] = time_per_query(spacy_processor.extract_entities_uncached, QUERY_CORPUS, args.repeat)
+                results[label]["components"] = list(pipeline.pipe_names)
+        finally:
+            spacy_processor.nlp = original
+        report["extraction"] = results
+
+    # Which tier (rules vs NER) decided each extraction above, and the NER time that saved
+    report["tiers"] = spacy_processor.extraction_tier_stats()
+
+    # Repeated traffic: every query arrives in several spellings
+    variants = spelling_variants(QUERY_CORPUS)
+    spacy_processor._entity_cache.clear()
+    report["memoization"] = {
+        "uncached": time_per_query(spacy_processor.extract_entities_uncached, variants, args.repeat),
+        "memoized": time_per_query(spacy_processor.extract_entities_and_keywords, variants, args.repeat),
+        "cache": spacy_processor.entity_cache_stats(),
+    }
+
+    for section, variants in report.items():
+        if section in ("keyword_scan", "extraction", "memoization") and isinstance(variants, dict):
+            for name, stats in variants.items():
+                if name == "cache":
+                    continue
+                print(f"[Bench] {section:<13} {name:<22} p50={stats['p50_ms']:.4f}ms "
+                      f"p95={stats['p95_ms']:.4f}ms mean={stats['mean_ms']:.4f}ms", file=sys.stderr)
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
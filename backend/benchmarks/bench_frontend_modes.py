@@ -0,0 +1,116 @@
+# backend/benchmarks/bench_frontend_modes.py
+"""
+Latency of one chat message as the Streamlit frontend sends it, per backend mode:
+
+  * inprocess:     process_user_query called directly (TRIP_ASSISTANT_BACKEND_MODE=inprocess)
+  * remote_pooled: POST /query over the shared keep-alive session (the frontend's remote mode)
+  * remote_fresh:  a new requests.post per message (the frontend before pooling)
+
+The API runs in this process under uvicorn on a free port, so all three modes hit
+the same stubbed LLM/AviationStack and the same synthetic database; the difference
+is the HTTP/JSON hop and connection setup.
+
+Usage (from the project root):
+    python -m backend.benchmarks.bench_frontend_modes --iterations 300 --output frontend_modes.json
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Callable, Dict, List
+
+import requests
+import uvicorn
+
+from backend.benchmarks.stats import latency_summary
+from backend.benchmarks.stubs import stubbed_externals
+from backend.benchmarks.synthetic_db import SIZES, build_synthetic_db, restore_default_database, use_database
+from backend.main import app
+from backend.query_processing import orchestrator
+from backend.utils.http_session import pooled_session
+
+QUERIES = [
+    "What is the status of flight {fn}?",
+    "How many seats are available on {fn}?",
+    "What is the baggage policy?",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_api(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="bench-api", daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def run_mode(send: Callable[[dict], dict], payloads: List[dict], warmup: int) -> dict:
+    for payload in payloads[:warmup]:
+        send(payload)
+    latencies = []
+    for payload in payloads:
+        t0 = time.perf_counter()
+        reply = send(payload)
+        latencies.append(time.perf_counter() - t0)
+        if "response" not in reply:
+            raise RuntimeError(f"Unexpected reply: {reply}")
+    return latency_summary(latencies)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Streamlit backend modes: in-process vs remote (pooled/fresh)")
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--size", default="small", choices=sorted(SIZES))
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    db = build_synthetic_db(SIZES[args.size])
+    use_database(db.engine)
+    payloads = [{"query": QUERIES[i % len(QUERIES)].format(fn=db.flight_numbers[i % len(db.flight_numbers)]),
+                 "user_id": f"bench-frontend-{i}"} for i in range(args.iterations)]
+    report = {"config": vars(args), "modes": {}}
+    try:
+        with stubbed_externals():
+            port = free_port()
+            server = start_api(port)
+            url = f"http://127.0.0.1:{port}/query"
+            session = pooled_session()
+            modes: Dict[str, Callable[[dict], dict]] = {
+                "inprocess": lambda p: {"response": orchestrator.process_user_query(p["user_id"], p["query"])},
+                "remote_pooled": lambda p: session.post(url, json=p, timeout=(3.05, 12)).json(),
+                "remote_fresh": lambda p: requests.post(url, json=p, timeout=12).json(),
+            }
+            try:
+                for name, send in modes.items():
+                    stats = report["modes"][name] = run_mode(send, payloads, args.warmup)
+                    print(f"[Bench] {name:<14} p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms "
+                          f"p99={stats['p99_ms']:.2f}ms", file=sys.stderr)
+            finally:
+                session.close()
+                server.should_exit = True
+    finally:
+        restore_default_database()
+        db.engine.dispose()
+        os.remove(db.path)
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+# backend/benchmarks/bench_intent_classifier.py
+"""
+Intent source comparison: rule-based hints (spacy_processor) vs the hashed n-gram
+classifier (intent_classifier), side by side on a hand-labelled query set written
+independently of the training templates.
+
+Reports accuracy, the confusion cases of each source, per-query latency of both,
+bulk classifier throughput (predict_many) and artifact load time.
+
+Usage (from the project root):
+    python -m backend.benchmarks.bench_intent_classifier --repeat 200 --output intents.json
+"""
+import argparse
+import json
+import sys
+import time
+from typing import List, Tuple
+
+from backend.benchmarks.bench_entity_extraction import time_per_query
+from backend.query_processing import intent_classifier
+from backend.query_processing.intent_classifier import IntentClassifier
+from backend.query_processing.spacy_processor import extract_entities_and_keywords
+
+LABELLED_QUERIES: List[Tuple[str, str]] = [
+    ("What is the status of flight AI202?", "api_flight_info"),
+    ("status of AI 202", "api_flight_info"),
+    ("Is EK510 on time?", "api_flight_info"),
+    ("When does UA123 depart?", "api_flight_info"),
+    ("has BA117 landed", "api_flight_info"),
+    ("where's my flight SQ421 at", "api_flight_info"),
+    ("QR570 delay info", "api_flight_info"),
+    ("How many seats are available on AI202?", "check_seat_availability"),
+    ("Are there any empty seats on EK510", "check_seat_availability"),
+    ("is there still room on DL45?", "check_seat_availability"),
+    ("any seats free on 6E 2345 tomorrow", "check_seat_availability"),
+    ("I want to cancel my booking", "cancel_booking"),
+    ("Please cancel my flight ticket, my PNR is PNR12345", "cancel_booking"),
+    ("I can't make it anymore, please cancel PNR67890", "cancel_booking"),
+    ("scrap my reservation", "cancel_booking"),
+    ("I want to book a flight", "create_booking"),
+    ("Book me a flight from Delhi to Mumbai next Friday", "create_booking"),
+    ("get me a ticket on a flight to Chennai", "create_booking"),
+    ("I'd like to reserve a seat to London", "create_booking"),
+    ("Search flights from DEL to BOM", "search_flights_by_route"),
+    ("Find flights from BLR to DEL tomorrow", "search_flights_by_route"),
+    ("Look for flights to Dubai", "search_flights_by_route"),
+    ("what's flying from Mumbai to Goa on Sunday", "search_flights_by_route"),
+    ("Delhi to Singapore options this week", "search_flights_by_route"),
+    ("What is the baggage policy?", "rag_policy"),
+    ("Can I bring my pet on Delta?", "rag_policy"),
+    ("What is the refund policy for Air India?", "rag_policy"),
+    ("When does online check-in open?", "rag_policy"),
+    ("how much luggage can I carry in economy", "rag_policy"),
+    ("can my dog travel with me on Emirates", "rag_policy"),
+    ("Hi there!", "unknown"),
+    ("Thanks, that's all", "unknown"),
+    ("Is there wifi on board?", "unknown"),
+    ("Can you help me plan a trip to Paris in December?", "unknown"),
+    ("what time is it in Tokyo", "unknown"),
+    ("cool, thanks a lot", "unknown"),
+]
+
+
+def rule_intent(text: str) -> str:
+    return extract_entities_and_keywords(text).get("intent_hint") or "unknown"
+
+
+def evaluate(predict, queries: List[Tuple[str, str]]) -> dict:
+    misses = []
+    for text, label in queries:
+        predicted = predict(text)
+        if predicted != label:
+            misses.append({"query": text, "expected": label, "predicted": predicted})
+    return {"accuracy": round(1 - len(misses) / len(queries), 4), "misses": misses}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Rule-based vs trained intent classifier")
+    parser.add_argument("--repeat", type=int, default=100, help="Passes over the labelled set for latency")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    model = IntentClassifier.load()
+    load_ms = 1000 * (time.perf_counter() - t0)
+    texts = [text for text, _ in LABELLED_QUERIES]
+
+    batch = (texts * (args.batch_size // len(texts) + 1))[:args.batch_size]
+    model.predict_many(batch) # Warm-up
+    t0 = time.perf_counter()
+    model.predict_many(batch)
+    batch_s = time.perf_counter() - t0
+
+    report = {
+        "queries": len(LABELLED_QUERIES),
+        "artifact": {"path": intent_classifier.MODEL_PATH, "load_ms": round(load_ms, 3),
+                     "weight_rows": len(model.weights), "labels": model.labels},
+        "rules": {**evaluate(rule_intent, LABELLED_QUERIES),
+                  "latency": time_per_query(rule_intent, texts, args.repeat)},
+        "classifier": {**evaluate(lambda t: model.predict(t)[0], LABELLED_QUERIES),
+                       "latency": time_per_query(model.predict, texts, args.repeat),
+                       "batch": {"size": args.batch_size, "queries_per_s": round(args.batch_size / batch_s, 1)}},
+    }
+
+    for name in ("rules", "classifier"):
+        section = report[name]
+        print(f"[Bench] {name:<10} accuracy={section['accuracy']:.3f} p50={section['latency']['p50_ms']:.4f}ms "
+              f"p95={section['latency']['p95_ms']:.4f}ms", file=sys.stderr)
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# backend/benchmarks/bench_llm_gateway.py
+"""
+Burst benchmark for LLM admission control.
+
+A simulated provider accepts at most --provider-limit concurrent calls and
+rejects the rest immediately (like a 429). A burst of interactive chat calls,
+plus background precomputation calls, is fired through generate_llm_response
+twice: with the gateway disabled (everything hits the provider at once) and with
+the gateway limiting concurrency to the provider's limit.
+
+Reports, per mode and priority: answered by the LLM, rejected by the provider,
+shed by the gateway (template fallback), and end-to-end latency including queueing.
+
+Usage (from the project root):
+    python -m backend.benchmarks.bench_llm_gateway --interactive 64 --background 16 --provider-limit 8
+"""
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from backend.benchmarks.stats import latency_summary
+from backend.benchmarks.stubs import StubLatency, stubbed_externals
+from backend.query_processing import llm_gateway, llm_layer, llm_providers
+from backend.query_processing.llm_gateway import LLMGateway, Priority
+from backend.query_processing.llm_providers import Completion, LLMProvider
+
+
+class SimulatedProvider(LLMProvider):
+    """Fixed-latency provider that rejects calls beyond `limit` concurrent ones (not retried)."""
+    name = "simulated"
+
+    def __init__(self, limit: int, latency: StubLatency):
+        self.limit = limit
+        self.latency = latency
+        self.active = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def complete(self, prompt: str, model: str | None, max_tokens: int, timeout_s: float) -> Completion:
+        with self._lock:
+            if self.active >= self.limit:
+                self.rejected += 1
+                raise RuntimeError("429 Too Many Requests (simulated)")
+            self.active += 1
+        try:
+            self.latency.sleep()
+            return Completion("[simulated-llm] ok", len(prompt) // 4 + 50)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def run_burst(gateway: LLMGateway, provider: SimulatedProvider, interactive: int, background: int) -> dict:
+    llm_layer.gateway = gateway
+    llm_providers.register_provider(provider)
+    jobs = [Priority.BACKGROUND] * background + [Priority.INTERACTIVE] * interactive
+    results = {p.name.lower(): {"llm": 0, "fallback": 0, "latencies": []} for p in Priority}
+    lock = threading.Lock()
+    start = threading.Barrier(len(jobs))
+
+    def call(priority: Priority) -> None:
+        start.wait() # Release the whole burst at once
+        t0 = time.perf_counter()
+        answer = llm_layer.generate_llm_response("Summarise this policy. " * 20, priority=priority)
+        elapsed = time.perf_counter() - t0
+        with lock:
+            bucket = results[priority.name.lower()]
+            bucket["llm" if answer else "fallback"] += 1
+            bucket["latencies"].append(elapsed)
+
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        list(pool.map(call, jobs))
+
+    report = {"provider_rejections": provider.rejected}
+    for name, bucket in results.items():
+        if bucket["latencies"]:
+            report[name] = {"llm": bucket["llm"], "fallback": bucket["fallback"],
+                            "latency": latency_summary(bucket["latencies"])}
+    return report
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="LLM gateway burst benchmark")
+    parser.add_argument("--interactive", type=int, default=64, help="Concurrent interactive calls in the burst")
+    parser.add_argument("--background", type=int, default=16, help="Concurrent background calls in the burst")
+    parser.add_argument("--provider-limit", type=int, default=8, help="Concurrent calls the provider accepts")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument("--deadline-s", type=float, default=0.5, help="Interactive queueing deadline")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    # The ungated run logs one error per simulated 429; they are counted in the report instead
+    logging.getLogger(llm_layer.log.name).setLevel(logging.CRITICAL)
+    saved = (llm_layer.gateway, llm_gateway.LLM_QUEUE_DEADLINE_S)
+    llm_gateway.LLM_QUEUE_DEADLINE_S = args.deadline_s
+    report = {"config": vars(args)}
+    try:
+        with stubbed_externals():
+            llm_providers.configure_providers("simulated") # Restored by stubbed_externals
+            for mode, gateway in (
+                ("ungated", LLMGateway(max_concurrency=0, tokens_per_minute=0)),
+                ("gated", LLMGateway(max_concurrency=args.provider_limit, tokens_per_minute=0,
+                                     expected_call_s=args.llm_latency_ms / 1000.0)),
+            ):
+                provider = SimulatedProvider(args.provider_limit, StubLatency(args.llm_latency_ms))
+                report[mode] = run_burst(gateway, provider, args.interactive, args.background)
+                for name in ("interactive", "background"):
+                    if name in report[mode]:
+                        r = report[mode][name]
+                        print(f"[Bench] {mode:<8} {name:<12} llm={r['llm']:<4} fallback={r['fallback']:<4} "
+                              f"p50={r['latency']['p50_ms']:.1f}ms p95={r['latency']['p95_ms']:.1f}ms", file=sys.stderr)
+                print(f"[Bench] {mode:<8} provider rejections={report[mode]['provider_rejections']}", file=sys.stderr)
+    finally:
+        llm_layer.gateway, llm_gateway.LLM_QUEUE_DEADLINE_S = saved
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# backend/benchmarks/bench_llm_providers.py
+"""
+Latency per LLM provider, through the same path the orchestrator uses
+(generate_llm_response / stream_llm_response: admission gateway, timeouts,
+retries, metrics).
+
+  * echo:   in-process, deterministic
+  * local:  in-process CPU model (skipped if transformers or the model is missing)
+  * openai: the OpenAI client against the local fake server (started in-process on a
+            free port, so no network or API key is needed); --openai-real uses
+            OPENAI_API_KEY/OPENAI_BASE_URL from the environment instead
+
+Reports full-answer latency and, for streaming, time to first chunk.
+
+Usage (from the project root):
+    python -m backend.benchmarks.bench_llm_providers --providers echo,openai --iterations 50
+"""
+import argparse
+import json
+import sys
+import time
+from typing import List
+
+from backend.benchmarks.fake_servers import FakeOpenAIHandler, FaultModel, LatencyModel, make_server, start_in_background
+from backend.benchmarks.stats import latency_summary
+from backend.query_processing import llm_layer, llm_providers
+from backend.query_processing.llm_providers import OpenAIProvider
+from backend.query_processing.prompt_builder import build_flight_info_prompt
+
+FLIGHT_INFO = {"flight_number": "AI202", "airline": "Air India", "status": "active",
+               "departure_airport": "Indira Gandhi International", "arrival_airport": "Chhatrapati Shivaji International",
+               "departure_scheduled": "2025-01-01T10:00:00+00:00", "arrival_scheduled": "2025-01-01T12:10:00+00:00"}
+PROMPT = build_flight_info_prompt(FLIGHT_INFO, "Why is AI202 late?")
+CALL_SITE = "bench"
+
+
+def run_provider(iterations: int) -> dict:
+    full, first_chunk, answered = [], [], 0
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        answered += bool(llm_layer.generate_llm_response(PROMPT, call_site=CALL_SITE))
+        full.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        for _chunk in llm_layer.stream_llm_response(PROMPT, call_site=CALL_SITE):
+            first_chunk.append(time.perf_counter() - t0)
+            break
+    return {"answered": answered, "complete": latency_summary(full),
+            "stream_first_chunk": latency_summary(first_chunk) if first_chunk else None}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="LLM provider latency benchmark")
+    parser.add_argument("--providers", default="echo,local,openai")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--openai-latency", default="fixed:50", help="Fake server latency spec (see LatencyModel)")
+    parser.add_argument("--openai-real", action="store_true", help="Use the configured OpenAI endpoint instead")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    saved_openai = llm_providers.PROVIDERS["openai"]
+    server = None
+    if not args.openai_real and "openai" in args.providers.split(","):
+        server = make_server(FakeOpenAIHandler, 0, LatencyModel(args.openai_latency), FaultModel())
+        start_in_background(server)
+        llm_providers.register_provider(OpenAIProvider(api_key="fake", model="gpt-4o-mini",
+                                                       base_url=f"http://127.0.0.1:{server.server_port}/v1"))
+
+    report = {"config": vars(args), "providers": {}}
+    try:
+        for name in args.providers.split(","):
+            previous = llm_providers.configure_providers(name)
+            try:
+                if not llm_layer.llm_available(CALL_SITE):
+                    print(f"[Bench] {name:<7} unavailable, skipped", file=sys.stderr)
+                    report["providers"][name] = None
+                    continue
+                llm_layer.generate_llm_response(PROMPT, call_site=CALL_SITE) # Warm up (client, model load)
+                result = report["providers"][name] = run_provider(args.iterations)
+                first = result["stream_first_chunk"]
+                print(f"[Bench] {name:<7} answered={result['answered']}/{args.iterations} "
+                      f"p50={result['complete']['p50_ms']:.2f}ms p95={result['complete']['p95_ms']:.2f}ms "
+                      f"first-chunk p50={first['p50_ms'] if first else float('nan'):.2f}ms", file=sys.stderr)
+            finally:
+                llm_providers.configure_providers(**previous)
+    finally:
+        llm_providers.register_provider(saved_openai)
+        if server:
+            server.shutdown()
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+# backend/benchmarks/bench_orchestrator.py
+"""
+End-to-end benchmark of process_user_query, one scenario per intent path.
+
+The LLM and AviationStack are replaced by deterministic local stubs (see stubs.py)
+and every run uses freshly generated synthetic databases (see synthetic_db.py).
+
+Usage (from the project root):
+    python -m backend.benchmarks.bench_orchestrator --sizes small,large --iterations 200 \
+        --output bench_results.json
+    python -m backend.benchmarks.bench_orchestrator --output new.json --compare bench_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from backend.benchmarks.stats import latency_summary
+from backend.benchmarks.stubs import StubLatency, stubbed_externals
+from backend.benchmarks.synthetic_db import SIZES, SyntheticDB, build_synthetic_db, restore_default_database, use_database
+from backend.query_processing import orchestrator
+from backend.query_processing.answer_router import llm_avoidance_stats
+from backend.query_processing.policy_digests import refresh_digests
+
+# Each scenario returns the list of turns one simulated user sends for iteration `i`.
+Scenario = Callable[[SyntheticDB, int], List[str]]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "seat_availability": lambda db, i: [f"How many seats are available on {db.flight_numbers[i % len(db.flight_numbers)]}?"],
+    "flight_status": lambda db, i: [f"What is the status of flight {db.flight_numbers[i % len(db.flight_numbers)]}?"],
+    "route_search": lambda db, i: ["Search flights from {} to {}".format(*db.routes[i % len(db.routes)])],
+    "cancel_flow": lambda db, i: ["I want to cancel my booking", db.pnrs[i % len(db.pnrs)], "yes"],
+    "booking_flow": lambda db, i: [
+        "I want to book a flight", *db.routes[i % len(db.routes)], "1", "yes", str(db.customer_ids[i % len(db.customer_ids)]),
+    ],
+    "rag_policy": lambda db, i: [["What is the baggage policy for Emirates?", "Can I bring my pet on Delta?",
+                                  "What is the refund policy?"][i % 3]],
+    "fallback": lambda db, i: ["Tell me something interesting about travelling"],
+}
+
+
+def summarize(latencies_s: List[float], wall_s: float) -> dict:
+    stats = latency_summary(latencies_s)
+    stats["turns"] = stats.pop("count")
+    stats["throughput_turns_per_s"] = round(stats["turns"] / wall_s, 2) if wall_s > 0 else 0.0
+    return stats
+
+
+def run_scenario(db: SyntheticDB, name: str, scenario: Scenario, iterations: int, warmup: int) -> dict:
+    """Runs `iterations` simulated users through `scenario` and times every turn."""
+    def run_user(i: int, latencies: List[float]) -> None:
+        user_id = f"bench-{name}-{i}"
+        for turn in scenario(db, i):
+            t0 = time.perf_counter()
+            orchestrator.process_user_query(user_id, turn)
+            latencies.append(time.perf_counter() - t0)
+        orchestrator.conversation_state.pop(user_id, None)
+
+    for i in range(warmup):
+        run_user(iterations + i, []) # Warm caches/connections without recording
+    latencies: List[float] = []
+    wall_start = time.perf_counter()
+    for i in range(iterations):
+        run_user(i, latencies)
+    return summarize(latencies, time.perf_counter() - wall_start)
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """Returns human-readable regressions where p50/p95 grew by more than `threshold` (fraction)."""
+    regressions = []
+    for size, paths in current["results"].items():
+        for path, stats in paths.items():
+            base = baseline.get("results", {}).get(size, {}).get(path)
+            if not base:
+                continue
+            for key in ("p50_ms", "p95_ms"):
+                if base[key] > 0 and stats[key] > base[key] * (1 + threshold):
+                    regressions.append(f"{size}/{path} {key}: {base[key]:.3f} -> {stats[key]:.3f} ms")
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Per-intent benchmark for process_user_query")
+    parser.add_argument("--sizes", default="small,large", help=f"Comma-separated DB sizes from {sorted(SIZES)}")
+    parser.add_argument("--paths", default=",".join(SCENARIOS), help="Comma-separated scenario names")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--api-latency-ms", type=float, default=0.0)
+    parser.add_argument("--api-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--skip-policy-digests", action="store_true",
+                        help="Don't precompute policy digests (every policy question goes through RAG)")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--compare", help="Baseline JSON to compare against; exits 1 on regression")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Allowed relative slowdown for --compare")
+    args = parser.parse_args(argv)
+
+    sizes = [SIZES[s.strip()] for s in args.sizes.split(",") if s.strip()]
+    paths = [p.strip() for p in args.paths.split(",") if p.strip()]
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "llm_latency_ms": [args.llm_latency_ms, args.llm_jitter_ms],
+            "api_latency_ms": [args.api_latency_ms, args.api_jitter_ms],
+            "policy_digests": not args.skip_policy_digests,
+        },
+        "results": {},
+    }
+
+    llm_latency = StubLatency(args.llm_latency_ms, args.llm_jitter_ms, seed=1)
+    api_latency = StubLatency(args.api_latency_ms, args.api_jitter_ms, seed=2)
+    with stubbed_externals(llm_latency, api_latency):
+        for size in sizes:
+            print(f"[Bench] Building synthetic '{size.name}' database...", file=sys.stderr)
+            db = build_synthetic_db(size)
+            use_database(db.engine)
+            if not args.skip_policy_digests:
+                refresh_digests() # Generic policy questions are then served without an LLM call
+            report["results"][size.name] = {}
+            try:
+                for path in paths:
+                    stats = run_scenario(db, path, SCENARIOS[path], args.iterations, args.warmup)
+                    report["results"][size.name][path] = stats
+                    print(f"[Bench] {size.name:>5} {path:<18} p50={stats['p50_ms']:.2f}ms "
+                          f"p95={stats['p95_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms "
+                          f"{stats['throughput_turns_per_s']:.1f} turns/s", file=sys.stderr)
+            finally:
+                restore_default_database()
+                db.engine.dispose()
+                os.remove(db.path)
+
+    # Share of flight-info/seat/route answers served by templates without an LLM call
+    report["llm_avoidance"] = llm_avoidance_stats()
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            regressions = compare(report, json.load(fh), args.threshold)
+        for line in regressions:
+            print(f"[Bench] REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
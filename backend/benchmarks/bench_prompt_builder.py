@@ -0,0 +1,93 @@
+# backend/benchmarks/bench_prompt_builder.py
+"""
+Prompt size for flight-info answers: the old prompt (whole flight_info dict,
+including the raw AviationStack record) vs the compact prompt builder.
+
+Uses a record shaped like a full AviationStack response (aircraft, codeshare and
+live position filled in) and a set of typical questions; reports estimated tokens
+and characters per question and overall.
+
+Usage (from the project root):
+    python -m backend.benchmarks.bench_prompt_builder --output prompts.json
+"""
+import argparse
+import json
+import sys
+from typing import List
+
+from backend.api_clients.aviationstack_api import _normalize_flight_data
+from backend.benchmarks.fake_servers import fake_aviationstack_record
+from backend.query_processing.prompt_builder import build_flight_info_prompt, count_tokens
+
+QUESTIONS = [
+    "What is the status of flight AI202?",
+    "When does AI202 arrive?",
+    "What's the departure gate for AI202?",
+    "Which terminal does AI202 arrive at?",
+    "Is AI202 delayed?",
+    "AI202",
+]
+
+
+def full_record() -> dict:
+    """A fake record with the nested sections real AviationStack responses carry."""
+    rec = fake_aviationstack_record("AI202")
+    rec["departure"].update({"timezone": "Asia/Kolkata", "icao": "VIDP", "delay": 10, "actual": None,
+                             "estimated_runway": None, "actual_runway": None})
+    rec["arrival"].update({"timezone": "Asia/Kolkata", "icao": "VABB", "baggage": "5", "delay": 5,
+                           "actual": None, "estimated_runway": None, "actual_runway": None})
+    rec["airline"]["icao"] = "AIC"
+    rec["flight"].update({"icao": "AIC202", "codeshared": {"airline_name": "Stub Partner", "airline_iata": "SP",
+                                                           "airline_icao": "SPX", "flight_number": "8202",
+                                                           "flight_iata": "SP8202", "flight_icao": "SPX8202"}})
+    rec["aircraft"] = {"registration": "VT-ANA", "iata": "B788", "icao": "B788", "icao24": "800BA1"}
+    rec["live"] = {"updated": "2025-01-01T10:00:00+00:00", "latitude": 25.1, "longitude": 74.2, "altitude": 11277.6,
+                   "direction": 213, "speed_horizontal": 851.9, "speed_vertical": 0, "is_ground": False}
+    return rec
+
+
+def legacy_prompt(flight_info: dict, question: str) -> str:
+    """The pre-builder prompt: the whole dict interpolated, raw record included."""
+    return (
+        f"You are an airline assistant. A user asked: '{question}'\n\n"
+        f"Here is the flight data I found: {flight_info}\n\n"
+        f"Please answer the user's *specific question* using *only* this data. "
+        f"For example, if they ask for 'arrival time', just give the arrival time. If they ask for 'status', just give the status. "
+        f"If the data doesn't contain the specific info (e.g., they ask for a 'gate' but it's not listed), "
+        f"state that you have the flight status but not that specific detail."
+    )
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Flight-info prompt size: legacy vs compact")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    flight_info = _normalize_flight_data(full_record())
+    rows = []
+    for question in QUESTIONS:
+        old, new = legacy_prompt(flight_info, question), build_flight_info_prompt(flight_info, question)
+        rows.append({"question": question,
+                     "legacy": {"tokens": count_tokens(old), "chars": len(old)},
+                     "compact": {"tokens": count_tokens(new), "chars": len(new)}})
+        print(f"[Bench] {question:<40} legacy={rows[-1]['legacy']['tokens']:>5} tok "
+              f"compact={rows[-1]['compact']['tokens']:>4} tok", file=sys.stderr)
+
+    total_old = sum(r["legacy"]["tokens"] for r in rows)
+    total_new = sum(r["compact"]["tokens"] for r in rows)
+    report = {"questions": rows, "total_tokens": {"legacy": total_old, "compact": total_new,
+                                                  "reduction": round(1 - total_new / total_old, 3)}}
+    print(f"[Bench] total legacy={total_old} compact={total_new} ({report['total_tokens']['reduction']:.0%} smaller)",
+          file=sys.stderr)
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# backend/benchmarks/bench_query_endpoint.py
+"""
+Per-call framework overhead of POST /query: request parsing plus response serialization.
+
+process_user_query is replaced by a constant answer, so only the endpoint's own
+work is measured, two ways:
+
+  * codec: in-process, no HTTP. legacy = json.loads + dict .get() + FastAPI's
+    jsonable_encoder + json.dumps (what JSONResponse did for a returned dict);
+    typed = QueryRequest.model_validate_json + QueryResponse validation + orjson.dumps
+  * http: the full ASGI round trip through TestClient, the legacy handler (raw
+    Request, default JSONResponse) vs the app's typed handler (ORJSONResponse)
+
+Usage (from the project root):
+    python -m backend.benchmarks.bench_query_endpoint --iterations 20000
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Callable, List
+
+import orjson
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from backend import main as api
+from backend.benchmarks.stats import latency_summary
+from backend.schemas import QueryRequest, QueryResponse
+
+BODY = json.dumps({"query": "What is the status of flight AI202?", "user_id": "bench-user",
+                   "request_id": "req-1", "deadline": 5.0}).encode()
+ANSWER = "Flight AI202 (Air India) is currently *scheduled*. It is flying from DEL International to BOM International."
+
+
+def legacy_codec(body: bytes) -> bytes:
+    data = json.loads(body)
+    user_query, user_id = data.get("query"), data.get("user_id", "default_user")
+    if not user_query:
+        return b'{"error": "Query text is required."}'
+    return json.dumps(jsonable_encoder({"response": ANSWER}), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def typed_codec(body: bytes) -> bytes:
+    request = QueryRequest.model_validate_json(body)
+    response = QueryResponse(response=ANSWER, user_id=request.user_id, request_id=request.request_id)
+    return orjson.dumps(response.model_dump())
+
+
+def legacy_app() -> FastAPI:
+    """The /query POST handler as it was before the typed models."""
+    app = FastAPI()
+
+    @app.post("/query")
+    async def handle_query(request: Request):
+        data = await request.json()
+        user_query = data.get("query")
+        user_id = data.get("user_id", "default_user")
+        if not user_query:
+            return {"error": "Query text is required."}
+        return {"response": ANSWER}
+
+    return app
+
+
+def measure(call: Callable[[], object], iterations: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        call()
+    latencies = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - t0)
+    stats = latency_summary(latencies)
+    stats["mean_us"] = round(sum(latencies) / len(latencies) * 1e6, 2) # latency_summary rounds to whole microseconds
+    return stats
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="/query request parse + response serialize overhead")
+    parser.add_argument("--iterations", type=int, default=20000, help="Calls per codec run")
+    parser.add_argument("--http-iterations", type=int, default=2000, help="Calls per HTTP run")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    saved = api.process_user_query
+    api.process_user_query = lambda user_id, query: ANSWER
+    try:
+        headers = {"Content-Type": "application/json"}
+        legacy_client, typed_client = TestClient(legacy_app()), TestClient(api.app)
+        runs = {
+            "codec/legacy": (lambda: legacy_codec(BODY), args.iterations),
+            "codec/typed": (lambda: typed_codec(BODY), args.iterations),
+            "http/legacy": (lambda: legacy_client.post("/query", content=BODY, headers=headers), args.http_iterations),
+            "http/typed": (lambda: typed_client.post("/query", content=BODY, headers=headers), args.http_iterations),
+        }
+        report = {"config": vars(args), "results": {}}
+        for name, (call, iterations) in runs.items():
+            stats = report["results"][name] = measure(call, iterations, warmup=min(200, iterations // 10))
+            print(f"[Bench] {name:<13} mean={stats['mean_us']:.1f}us p50={stats['p50_ms'] * 1000:.1f}us "
+                  f"p99={stats['p99_ms'] * 1000:.1f}us", file=sys.stderr)
+    finally:
+        api.process_user_query = saved
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+# backend/benchmarks/bench_read_api.py
+"""
+Throughput of the paginated read API (routers/data_router.py) on a synthetic database.
+
+For each resource and page size, walks --pages consecutive pages three ways:
+  * orm_offset: ORM objects -> pydantic schema -> JSON, paged with OFFSET
+    (what a naive endpoint using the schemas would do)
+  * core_keyset: the read API's path: Core select of the projected columns,
+    keyset cursor, plain dicts -> JSON (DB/pagination.py)
+  * http: GET /api/<resource> end to end through the FastAPI app (TestClient)
+
+Reports rows/s and per-page latency; the last page of the walk shows how OFFSET
+cost grows with depth while keyset pages stay flat.
+
+Usage (from the project root):
+    python -m backend.benchmarks.bench_read_api --size large --page-sizes 100,1000 --pages 50
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List, Tuple
+
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.stats import latency_summary
+from backend.benchmarks.synthetic_db import SIZES, build_synthetic_db, restore_default_database, use_database
+from backend.DB.database import SessionLocal
+from backend.DB.models import Booking, Flight, Seat
+from backend.DB.pagination import keyset_page
+from backend.main import app
+from backend.schemas import BookingResponse, FlightResponse, SeatResponse
+
+RESOURCES = {"flights": (Flight, FlightResponse), "bookings": (Booking, BookingResponse), "seats": (Seat, SeatResponse)}
+
+
+def walk_orm_offset(model, schema, page_size: int, pages: int) -> Tuple[List[float], int]:
+    key = model.__table__.primary_key.columns.values()[0]
+    latencies, total = [], 0
+    for page in range(pages):
+        t0 = time.perf_counter()
+        db = SessionLocal()
+        try:
+            rows = db.query(model).order_by(key).offset(page * page_size).limit(page_size).all()
+            json.dumps({"items": [schema.model_validate(r).model_dump(mode="json") for r in rows]})
+        finally:
+            db.close()
+        latencies.append(time.perf_counter() - t0)
+        total += len(rows)
+        if len(rows) < page_size:
+            break
+    return latencies, total
+
+
+def walk_core_keyset(model, schema, page_size: int, pages: int) -> Tuple[List[float], int]:
+    table = model.__table__
+    key = table.primary_key.columns.keys()[0]
+    fields, after, latencies, total = list(schema.model_fields), None, [], 0
+    for _ in range(pages):
+        t0 = time.perf_counter()
+        db = SessionLocal()
+        try:
+            items, after = keyset_page(db, table, key, fields, {}, after, page_size)
+            json.dumps({"items": items, "next_cursor": after})
+        finally:
+            db.close()
+        latencies.append(time.perf_counter() - t0)
+        total += len(items)
+        if after is None:
+            break
+    return latencies, total
+
+
+def walk_http(client: TestClient, resource: str, page_size: int, pages: int) -> Tuple[List[float], int]:
+    after, latencies, total = None, [], 0
+    for _ in range(pages):
+        params = {"limit": page_size, **({"after": after} if after else {})}
+        t0 = time.perf_counter()
+        body = client.get(f"/api/{resource}", params=params).json()
+        latencies.append(time.perf_counter() - t0)
+        total += len(body["items"])
+        after = body["next_cursor"]
+        if after is None:
+            break
+    return latencies, total
+
+
+def summarize(run: Tuple[List[float], int]) -> dict:
+    latencies, rows = run
+    stats = latency_summary(latencies)
+    stats["rows"] = rows
+    stats["rows_per_s"] = round(rows / sum(latencies), 1) if latencies else 0.0
+    stats["last_page_ms"] = round(latencies[-1] * 1000.0, 3) if latencies else 0.0
+    return stats
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Paginated read API throughput")
+    parser.add_argument("--size", default="large", choices=sorted(SIZES))
+    parser.add_argument("--resources", default="flights,bookings,seats")
+    parser.add_argument("--page-sizes", default="100,1000")
+    parser.add_argument("--pages", type=int, default=50, help="Consecutive pages walked per run")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    print(f"[Bench] Building synthetic '{args.size}' database...", file=sys.stderr)
+    db = build_synthetic_db(SIZES[args.size])
+    use_database(db.engine)
+    report = {"config": vars(args), "results": {}}
+    try:
+        client = TestClient(app)
+        for resource in args.resources.split(","):
+            model, schema = RESOURCES[resource]
+            for page_size in (int(p) for p in args.page_sizes.split(",")):
+                runs = {
+                    "orm_offset": walk_orm_offset(model, schema, page_size, args.pages),
+                    "core_keyset": walk_core_keyset(model, schema, page_size, args.pages),
+                    "http": walk_http(client, resource, page_size, args.pages),
+                }
+                result = report["results"][f"{resource}/{page_size}"] = {k: summarize(v) for k, v in runs.items()}
+                print(f"[Bench] {resource:<9} page={page_size:<5} " + "  ".join(
+                    f"{k}={r['rows_per_s']:>9.0f} rows/s (last page {r['last_page_ms']:.1f}ms)" for k, r in result.items()),
+                    file=sys.stderr)
+    finally:
+        restore_default_database()
+        db.engine.dispose()
+        os.remove(db.path)
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
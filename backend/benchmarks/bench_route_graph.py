@@ -0,0 +1,178 @@
+# backend/benchmarks/bench_route_graph.py
+"""
+Itinerary search over the in-memory route graph (DB/route_graph.py) on a large schedule.
+
+A seeded hub-and-spoke schedule (--flights over --days, --airports of which --hubs
+are hubs; most flights touch a hub, so spoke-to-spoke pairs need one or two stops)
+is built once in memory. Measured:
+  * build: RouteGraph construction time and its tracemalloc footprint
+  * load: load_route_graph() from a SQLite Flight table of the same size (skip with --skip-db),
+    and the periodic staleness check (flight_fingerprint()) on that table
+  * search: latency of --queries spoke-to-spoke searches from a random time, plus how
+    many found a connection and the stops of the fewest-stops / earliest-arrival answers
+  * update: per-flight upsert and remove latency (incremental), vs the full build
+
+Usage (from the project root):
+    python -m backend.benchmarks.bench_route_graph --flights 100000 --queries 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import create_engine, insert
+
+from backend.benchmarks.stats import latency_summary
+from backend.benchmarks.synthetic_db import restore_default_database, use_database
+from backend.DB.database import Base
+from backend.DB.models import Flight
+from backend.DB.route_graph import Leg, RouteGraph, flight_fingerprint, load_route_graph
+
+
+def airport_codes(n: int) -> List[str]:
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return [a + b + c for a in letters for b in letters for c in letters][:n]
+
+
+def synthetic_flights(args, rng: random.Random) -> List[dict]:
+    """Flight rows: ~70% spoke<->hub, the rest hub<->hub; block times grow with a fake distance."""
+    airports = airport_codes(args.airports)
+    hubs, spokes = airports[:args.hubs], airports[args.hubs:]
+    start = datetime(2030, 1, 1)
+    flights = []
+    for flight_id in range(1, args.flights + 1):
+        if rng.random() < 0.7:
+            src, dst = rng.choice(spokes), rng.choice(hubs)
+            if rng.random() < 0.5:
+                src, dst = dst, src
+        else:
+            src, dst = rng.sample(hubs, 2)
+        dep = start + timedelta(minutes=rng.randrange(0, 60 * 24 * args.days, 5))
+        flights.append({
+            "flight_id": flight_id, "airline_code": "SY", "flight_number": f"SY{flight_id}",
+            "source_airport_code": src, "destination_airport_code": dst,
+            "scheduled_departure": dep, "scheduled_arrival": dep + timedelta(minutes=rng.randrange(60, 720, 5)),
+            "current_status": "Scheduled",
+        })
+    return flights
+
+
+def as_legs(flights: List[dict]) -> List[Leg]:
+    class Row: # Leg.from_flight reads attributes, like ORM objects and result rows have
+        def __init__(self, values):
+            self.__dict__.update(values)
+    return [Leg.from_flight(Row(f)) for f in flights]
+
+
+def measure_db_load(flights: List[dict]) -> dict:
+    fd, path = tempfile.mkstemp(prefix="bench_route_graph_", suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(insert(Flight.__table__), flights)
+        use_database(engine)
+        t0 = time.perf_counter()
+        graph = load_route_graph()
+        load_s = time.perf_counter() - t0
+        checks = []
+        for _ in range(20):
+            t0 = time.perf_counter()
+            flight_fingerprint()
+            checks.append(time.perf_counter() - t0)
+        return {"load_s": round(load_s, 3), "flights": len(graph), "staleness_check": latency_summary(checks)}
+    finally:
+        restore_default_database()
+        engine.dispose()
+        os.remove(path)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Route graph build, search and update benchmark")
+    parser.add_argument("--flights", type=int, default=100_000)
+    parser.add_argument("--airports", type=int, default=300)
+    parser.add_argument("--hubs", type=int, default=12)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--skip-db", action="store_true", help="Don't measure loading from SQLite")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    flights = synthetic_flights(args, rng)
+    legs = as_legs(flights)
+    report = {"config": vars(args), "results": {}}
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    graph = RouteGraph(legs)
+    build_s = time.perf_counter() - t0
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    report["results"]["build"] = {"seconds": round(build_s, 3), "index_mb": round(used / 2**20, 1)}
+    print(f"[Bench] build  {len(graph)} flights in {build_s:.2f}s, index {used / 2**20:.1f}MB "
+          "(legs themselves not counted)", file=sys.stderr)
+
+    if not args.skip_db:
+        report["results"]["db_load"] = measure_db_load(flights)
+        print(f"[Bench] load   from SQLite in {report['results']['db_load']['load_s']:.2f}s, staleness check "
+              f"p50={report['results']['db_load']['staleness_check']['p50_ms']:.1f}ms", file=sys.stderr)
+
+    spokes = airport_codes(args.airports)[args.hubs:]
+    start = datetime(2030, 1, 1)
+    latencies, found, fewest, earliest = [], 0, Counter(), Counter()
+    for _ in range(args.queries):
+        src, dst = rng.sample(spokes, 2)
+        depart_after = start + timedelta(minutes=rng.randrange(0, 60 * 24 * (args.days - 5)))
+        t0 = time.perf_counter()
+        options = graph.search(src, dst, depart_after)
+        latencies.append(time.perf_counter() - t0)
+        if options:
+            found += 1
+            fewest[options[0].stops] += 1
+            earliest[options[-1].stops] += 1
+    search = latency_summary(latencies)
+    search.update(found=found, fewest_stops=dict(sorted(fewest.items())), earliest_arrival_stops=dict(sorted(earliest.items())))
+    report["results"]["search"] = search
+    print(f"[Bench] search p50={search['p50_ms']:.2f}ms p99={search['p99_ms']:.2f}ms max={search['max_ms']:.2f}ms "
+          f"found={found}/{args.queries} fewest={search['fewest_stops']} earliest={search['earliest_arrival_stops']}",
+          file=sys.stderr)
+
+    new_flights = synthetic_flights(argparse.Namespace(**{**vars(args), "flights": args.updates}), rng)
+    new_legs = [leg._replace(flight_id=args.flights + i + 1) for i, leg in enumerate(as_legs(new_flights))]
+    upserts, removes = [], []
+    for leg in new_legs:
+        t0 = time.perf_counter()
+        graph.upsert(leg)
+        upserts.append(time.perf_counter() - t0)
+    for leg in new_legs:
+        t0 = time.perf_counter()
+        graph.remove(leg.flight_id)
+        removes.append(time.perf_counter() - t0)
+    report["results"]["update"] = {"upsert": latency_summary(upserts), "remove": latency_summary(removes)}
+    print(f"[Bench] update upsert p50={report['results']['update']['upsert']['p50_ms']:.3f}ms "
+          f"remove p50={report['results']['update']['remove']['p50_ms']:.3f}ms (full build {build_s * 1000:.0f}ms)",
+          file=sys.stderr)
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+# backend/benchmarks/fake_servers.py
+"""
+Local stand-in servers for OpenAI and AviationStack, for load testing without
+network access or API quota.
+
+  * OpenAI:       GET /v1/models, POST /v1/chat/completions  (ChatCompletion-shaped JSON,
+                  or server-sent chunks when the request sets "stream": true)
+  * AviationStack: GET /v1/flights?flight_iata=... | dep_iata=...&arr_iata=...
+
+Each server has its own latency distribution, error rate (HTTP 500) and
+rate-limit behaviour (random 429s and/or a hard requests-per-minute cap).
+
+Usage (from the project root):
+    python -m backend.benchmarks.fake_servers --openai-port 8100 --aviationstack-port 8101 \
+        --openai-latency lognormal:400:0.4 --openai-rate-limit-rate 0.02 --openai-rpm 600
+
+Then start the backend with:
+    OPENAI_API_KEY=fake OPENAI_BASE_URL=http://127.0.0.1:8100/v1 \
+    AVIATIONSTACK_API_KEY=fake AVIATIONSTACK_BASE_URL=http://127.0.0.1:8101 \
+    uvicorn backend.main:app --port 8000
+"""
+import argparse
+import collections
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def fake_aviationstack_record(flight_iata: str, dep_iata: str = "DEL", arr_iata: str = "BOM") -> dict:
+    """Builds a raw record shaped like an AviationStack /v1/flights entry."""
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    return {
+        "flight_date": now.strftime("%Y-%m-%d"),
+        "flight_status": "scheduled",
+        "departure": {
+            "airport": f"{dep_iata} International", "iata": dep_iata, "terminal": "3", "gate": "22",
+            "scheduled": (now + timedelta(hours=2)).isoformat() + "+00:00",
+            "estimated": (now + timedelta(hours=2, minutes=10)).isoformat() + "+00:00",
+        },
+        "arrival": {
+            "airport": f"{arr_iata} International", "iata": arr_iata, "terminal": "1", "gate": "B7",
+            "scheduled": (now + timedelta(hours=4)).isoformat() + "+00:00",
+            "estimated": (now + timedelta(hours=4, minutes=5)).isoformat() + "+00:00",
+        },
+        "airline": {"name": "Stub Airways", "iata": flight_iata[:2]},
+        "flight": {"number": flight_iata[2:], "iata": flight_iata},
+        "aircraft": None,
+        "live": None,
+    }
+
+
+class LatencyModel:
+    """
+    Seeded latency distribution parsed from a spec string (all values in ms):
+      fixed:200 | uniform:100:400 | normal:300:50 | lognormal:<median>:<sigma> | exp:<mean>
+    """
+
+    def __init__(self, spec: str = "fixed:0", seed: int = 0):
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        self.spec = spec
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        if kind not in ("fixed", "uniform", "normal", "lognormal", "exp"):
+            raise ValueError(f"Unknown latency distribution '{spec}'")
+
+    def sample_ms(self) -> float:
+        p = self.params
+        with self._lock:
+            if self.kind == "fixed":
+                value = p[0]
+            elif self.kind == "uniform":
+                value = self._rng.uniform(p[0], p[1])
+            elif self.kind == "normal":
+                value = self._rng.gauss(p[0], p[1])
+            elif self.kind == "lognormal":
+                value = p[0] * self._rng.lognormvariate(0.0, p[1])
+            else:
+                value = self._rng.expovariate(1.0 / p[0]) if p[0] > 0 else 0.0
+        return max(0.0, value)
+
+
+class FaultModel:
+    """Decides, per request, whether to answer normally, with a 500, or with a 429."""
+
+    def __init__(self, error_rate: float = 0.0, rate_limit_rate: float = 0.0, rpm: int = 0, seed: int = 0):
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rpm = rpm
+        self._rng = random.Random(seed)
+        self._window = collections.deque() # Request timestamps within the last 60s
+        self._lock = threading.Lock()
+
+    def decide(self) -> str:
+        now = time.monotonic()
+        with self._lock:
+            if self.rpm:
+                while self._window and now - self._window[0] > 60.0:
+                    self._window.popleft()
+                if len(self._window) >= self.rpm:
+                    return "rate_limited"
+                self._window.append(now)
+            roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            return "rate_limited"
+        if roll < self.rate_limit_rate + self.error_rate:
+            return "error"
+        return "ok"
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    latency: LatencyModel = LatencyModel()
+    faults: FaultModel = FaultModel()
+    protocol_version = "HTTP/1.1" # Keep-alive so clients can pool connections
+
+    def log_message(self, format, *args): # Silence per-request stderr logging
+        pass
+
+    def _send_json(self, status: int, body: dict, headers: dict | None = None) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _simulate(self) -> str:
+        time.sleep(self.latency.sample_ms() / 1000.0)
+        return self.faults.decide()
+
+
+class FakeOpenAIHandler(_FakeHandler):
+    """Mimics the ChatCompletion endpoints used by llm_layer.generate_llm_response."""
+
+    def do_GET(self):
+        if urlparse(self.path).path.rstrip("/").endswith("/models"):
+            models = [{"id": m, "object": "model", "owned_by": "fake"} for m in ("gpt-4o-mini", "gpt-3.5-turbo")]
+            return self._send_json(200, {"object": "list", "data": models})
+        self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+        if not urlparse(self.path).path.rstrip("/").endswith("/chat/completions"):
+            return self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+
+        outcome = self._simulate()
+        if outcome == "rate_limited":
+            return self._send_json(429, {"error": {"message": "Rate limit reached for requests", "type": "requests",
+                                                   "code": "rate_limit_exceeded"}}, {"Retry-After": "1"})
+        if outcome == "error":
+            return self._send_json(500, {"error": {"message": "The server had an error processing your request.",
+                                                   "type": "server_error"}})
+
+        prompt = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+        prompt_tokens = max(1, len(prompt) // 4)
+        content = f"[fake-openai] Answer based on {prompt_tokens} prompt tokens."
+        if body.get("stream"):
+            return self._send_stream(body.get("model", "gpt-3.5-turbo"), content)
+        completion_tokens = max(1, len(content) // 4)
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-3.5-turbo"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+
+    def _send_stream(self, model: str, content: str) -> None:
+        """Sends `content` word by word as chat.completion.chunk events, then [DONE]."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        chunk_id, created = f"chatcmpl-{uuid.uuid4().hex[:24]}", int(time.time())
+        words = content.split(" ")
+        deltas = [{"role": "assistant", "content": ""}] + [{"content": w if i == 0 else " " + w} for i, w in enumerate(words)]
+        for i, delta in enumerate(deltas + [{}]):
+            event = {"id": chunk_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": None if i < len(deltas) else "stop"}]}
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True # No Content-Length: the stream ends with the connection
+
+
+class FakeAviationStackHandler(_FakeHandler):
+    """Mimics /v1/flights as consumed by aviationstack_api._normalize_flight_data."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/v1/flights":
+            return self._send_json(404, {"error": {"code": "not_found", "message": "Resource not found"}})
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if not params.get("access_key"):
+            return self._send_json(401, {"error": {"code": "missing_access_key", "message": "You have not supplied an API Access Key."}})
+
+        outcome = self._simulate()
+        if outcome == "rate_limited":
+            return self._send_json(429, {"error": {"code": "usage_limit_reached",
+                                                   "message": "Your monthly usage limit has been reached."}})
+        if outcome == "error":
+            return self._send_json(500, {"error": {"code": "internal_error", "message": "An internal error occurred."}})
+
+        if params.get("flight_iata"):
+            records = [fake_aviationstack_record(params["flight_iata"].upper())]
+        else:
+            dep, arr = params.get("dep_iata", "DEL").upper(), params.get("arr_iata", "BOM").upper()
+            limit = int(params.get("limit", 10))
+            records = [fake_aviationstack_record(f"FK{100 + i}", dep, arr) for i in range(min(limit, 5))]
+        self._send_json(200, {
+            "pagination": {"limit": int(params.get("limit", 100)), "offset": 0, "count": len(records), "total": len(records)},
+            "data": records,
+        })
+
+
+def make_server(handler: type, port: int, latency: LatencyModel, faults: FaultModel,
+                host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Builds (but does not start) a threaded server with its own latency/fault models."""
+    configured = type(handler.__name__, (handler,), {"latency": latency, "faults": faults})
+    server = ThreadingHTTPServer((host, port), configured)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_background(server: ThreadingHTTPServer) -> threading.Thread:
+    thread = threading.Thread(target=server.serve_forever, name=f"fake-server-{server.server_port}", daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Fake OpenAI and AviationStack servers for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--seed", type=int, default=0)
+    for name, port in (("openai", 8100), ("aviationstack", 8101)):
+        parser.add_argument(f"--{name}-port", type=int, default=port, help="0 disables this server")
+        parser.add_argument(f"--{name}-latency", default="fixed:0", help="Latency spec, see LatencyModel")
+        parser.add_argument(f"--{name}-error-rate", type=float, default=0.0, help="Fraction of HTTP 500 replies")
+        parser.add_argument(f"--{name}-rate-limit-rate", type=float, default=0.0, help="Fraction of random HTTP 429 replies")
+        parser.add_argument(f"--{name}-rpm", type=int, default=0, help="Hard requests-per-minute cap (429 above it)")
+    args = parser.parse_args(argv)
+
+    servers = []
+    for offset, (name, handler) in enumerate((("openai", FakeOpenAIHandler), ("aviationstack", FakeAviationStackHandler))):
+        opts = vars(args)
+        port = opts[f"{name}_port"]
+        if not port:
+            continue
+        seed = args.seed + offset
+        server = make_server(
+            handler, port,
+            LatencyModel(opts[f"{name}_latency"], seed=seed),
+            FaultModel(opts[f"{name}_error_rate"], opts[f"{name}_rate_limit_rate"], opts[f"{name}_rpm"], seed=seed),
+            host=args.host,
+        )
+        start_in_background(server)
+        servers.append(server)
+        print(f"[FakeServers] {name} listening on http://{args.host}:{server.server_port}")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for server in servers:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
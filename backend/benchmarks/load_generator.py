@@ -0,0 +1,125 @@
+# backend/benchmarks/load_generator.py
+"""
+Open-loop HTTP load generator for POST /query.
+
+Requests are scheduled at a fixed target rate regardless of how fast the server
+answers, and latency is measured from each request's *scheduled* send time, so
+server-side queueing shows up in the percentiles instead of being hidden.
+
+Usage (from the project root, with the backend and fake_servers running):
+    python -m backend.benchmarks.load_generator --url http://127.0.0.1:8000/query \
+        --rps 50 --duration 60 --output load_results.json
+"""
+import argparse
+import collections
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import requests
+
+from backend.benchmarks.stats import latency_summary
+
+DEFAULT_QUERIES = [
+    "What is the status of flight AI202?",
+    "How many seats are available on AI305?",
+    "Search flights from DEL to BOM",
+    "What is the baggage policy for Emirates?",
+    "Can I bring my pet on Delta?",
+    "I want to cancel my flight ticket",
+    "I want to book a flight",
+    "Hello, can you help me?",
+]
+
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    """One keep-alive session per worker thread."""
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def run_load(url: str, rps: float, duration_s: float, queries: List[str], users: int,
+             timeout_s: float, max_workers: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    total = int(rps * duration_s)
+    results = [] # (scheduled_latency_s, service_latency_s, outcome)
+    lock = threading.Lock()
+
+    def fire(scheduled_at: float, payload: dict) -> None:
+        sent_at = time.perf_counter()
+        try:
+            resp = _session().post(url, json=payload, timeout=timeout_s)
+            outcome = str(resp.status_code)
+        except requests.Timeout:
+            outcome = "timeout"
+        except requests.RequestException:
+            outcome = "connection_error"
+        done = time.perf_counter()
+        with lock:
+            results.append((done - scheduled_at, done - sent_at, outcome))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for i in range(total):
+            scheduled_at = start + i / rps
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            payload = {"query": rng.choice(queries), "user_id": f"load-user-{rng.randrange(users)}"}
+            pool.submit(fire, scheduled_at, payload)
+    wall = time.perf_counter() - start
+
+    outcomes = collections.Counter(outcome for _, _, outcome in results)
+    ok = [r for r in results if r[2] == "200"]
+    return {
+        "target_rps": rps,
+        "achieved_rps": round(len(results) / wall, 2) if wall > 0 else 0.0,
+        "requests": len(results),
+        "outcomes": dict(outcomes),
+        "error_rate": round(1 - len(ok) / len(results), 4) if results else 0.0,
+        "latency_from_schedule": latency_summary(r[0] for r in ok),
+        "service_latency": latency_summary(r[1] for r in ok),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Open-loop load generator for POST /query")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/query")
+    parser.add_argument("--rps", type=float, default=20.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load")
+    parser.add_argument("--users", type=int, default=100, help="Distinct user_ids to spread requests over")
+    parser.add_argument("--queries-file", help="Optional file with one query per line")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--max-workers", type=int, default=256, help="Max concurrent in-flight requests")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    queries = DEFAULT_QUERIES
+    if args.queries_file:
+        with open(args.queries_file) as fh:
+            queries = [line.strip() for line in fh if line.strip()]
+
+    report = run_load(args.url, args.rps, args.duration, queries, args.users, args.timeout, args.max_workers, args.seed)
+    lat = report["latency_from_schedule"]
+    print(f"[Load] {report['requests']} requests at {report['achieved_rps']}/s (target {args.rps}) "
+          f"p50={lat['p50_ms']:.1f}ms p95={lat['p95_ms']:.1f}ms p99={lat['p99_ms']:.1f}ms "
+          f"errors={report['error_rate']:.2%}", file=sys.stderr)
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
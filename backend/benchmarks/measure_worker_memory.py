@@ -0,0 +1,164 @@
+# backend/benchmarks/measure_worker_memory.py
+"""
+Total memory of a multi-worker API deployment, per way of starting the workers:
+
+  * preload:    python -m backend.server (models loaded once in the master, gc.freeze, fork)
+  * no_preload: python -m backend.server --no-preload (fork first, each worker loads its own)
+  * uvicorn:    uvicorn backend.main:app --workers N (fresh interpreter per worker)
+
+Each server is started at each worker count, warmed with --requests queries over
+fresh connections (so every worker handles some and touches its pages), then the
+master and all its descendants are read from /proc/<pid>/smaps_rollup. PSS splits
+every shared page evenly between the processes mapping it, so the PSS sum is the
+deployment's real footprint; RSS counts shared pages once per process.
+
+The servers use the project's airline.db; if there is none, a small synthetic one
+is created there for the run and removed afterwards. Linux only.
+
+Usage (from the project root):
+    python -m backend.benchmarks.measure_worker_memory --workers 1,4,8 --output worker_memory.json
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import requests
+
+from backend.benchmarks.bench_frontend_modes import free_port
+from backend.benchmarks.synthetic_db import SIZES, build_synthetic_db
+from backend.DB.database import DATABASE_PATH
+
+MODES = {
+    "preload": lambda port, n: [sys.executable, "-m", "backend.server", "--port", str(port), "--workers", str(n),
+                                "--log-level", "warning"],
+    "no_preload": lambda port, n: [sys.executable, "-m", "backend.server", "--port", str(port), "--workers", str(n),
+                                   "--log-level", "warning", "--no-preload"],
+    "uvicorn": lambda port, n: [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port),
+                                "--workers", str(n), "--log-level", "warning"],
+}
+QUERIES = [
+    "What is the status of flight {fn}?",
+    "How many seats are available on {fn}?",
+    "Show me flights from Delhi to Mumbai",
+    "What is the baggage policy for Air India?",
+]
+
+
+def descendants(root: int) -> List[int]:
+    """`root` and every process below it, from the ppid field of /proc/<pid>/stat."""
+    parents: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as fh:
+                    parents[int(entry)] = int(fh.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue # Exited while we were scanning
+    found, frontier = [root], [root]
+    while frontier:
+        children = [pid for pid, ppid in parents.items() if ppid in frontier]
+        found.extend(children)
+        frontier = children
+    return found
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    """Rss, Pss and private (clean + dirty) kB of one process."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as fh:
+        for line in fh:
+            name, _, rest = line.partition(":")
+            if rest.strip().endswith("kB"):
+                fields[name] = int(rest.split()[0])
+    return {"rss": fields["Rss"], "pss": fields["Pss"],
+            "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)}
+
+
+def wait_ready(proc: subprocess.Popen, base_url: str, processes: int, timeout_s: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Server exited with code {proc.returncode}")
+        try:
+            if requests.get(base_url + "/", timeout=1).ok and len(descendants(proc.pid)) >= processes:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+
+def measure(mode: str, workers: int, flight_numbers: List[str], requests_per_run: int) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    proc = subprocess.Popen(MODES[mode](port, workers), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        # uvicorn only runs a supervisor process when asked for more than one worker
+        wait_ready(proc, base_url, processes=1 if mode == "uvicorn" and workers == 1 else workers + 1)
+        for i in range(requests_per_run):
+            query = QUERIES[i % len(QUERIES)].format(fn=flight_numbers[i % len(flight_numbers)])
+            # A new connection per request, so the kernel spreads them over all workers
+            requests.post(base_url + "/query", json={"query": query, "user_id": f"mem-{i}"}, timeout=30)
+        time.sleep(1.0)
+        per_process = {pid: memory_kb(pid) for pid in descendants(proc.pid)}
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+    workers_only = [m for pid, m in per_process.items() if pid != proc.pid] or list(per_process.values())
+    return {
+        "processes": len(per_process),
+        "total_pss_mb": round(sum(m["pss"] for m in per_process.values()) / 1024, 1),
+        "total_rss_mb": round(sum(m["rss"] for m in per_process.values()) / 1024, 1),
+        "master_pss_mb": round(per_process[proc.pid]["pss"] / 1024, 1),
+        "worker_private_mb": round(sum(m["private"] for m in workers_only) / max(len(workers_only), 1) / 1024, 1),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Total PSS of N API workers: preload+fork vs per-worker loading")
+    parser.add_argument("--workers", default="1,4,8", help="Comma-separated worker counts")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--requests", type=int, default=200, help="Warm-up queries per run")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    created_db = not os.path.exists(DATABASE_PATH)
+    if created_db:
+        db = build_synthetic_db(SIZES["small"], path=DATABASE_PATH)
+        db.engine.dispose()
+        flight_numbers = db.flight_numbers
+    else:
+        flight_numbers = ["AI202", "6E123", "UK955"]
+    report = {"config": vars(args), "results": {}}
+    try:
+        for workers in (int(n) for n in args.workers.split(",")):
+            for mode in args.modes.split(","):
+                stats = report["results"][f"{mode}/{workers}"] = measure(mode, workers, flight_numbers, args.requests)
+                print(f"[Bench] {mode:<10} workers={workers:<2} total_pss={stats['total_pss_mb']:7.1f}MB "
+                      f"total_rss={stats['total_rss_mb']:7.1f}MB worker_private={stats['worker_private_mb']:.1f}MB",
+                      file=sys.stderr)
+    finally:
+        if created_db:
+            os.remove(DATABASE_PATH)
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+# backend/benchmarks/stats.py
+"""Small latency-statistics helpers shared by the benchmark and load-test scripts."""
+import math
+from typing import Iterable, List
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    # Smallest rank covering pct% of the values; pct * n first keeps whole results exact (7 * 100 / 100, not 0.07 * 100)
+    rank = max(1, math.ceil(pct * len(sorted_values) / 100.0))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(latencies_s: Iterable[float]) -> dict:
+    """p50/p95/p99/mean/max in milliseconds for a collection of durations in seconds."""
+    values = sorted(v * 1000.0 for v in latencies_s)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "mean_ms": round(sum(values) / len(values), 3) if values else 0.0,
+        "max_ms": round(values[-1], 3) if values else 0.0,
+    }
@@ -0,0 +1,97 @@
+# backend/benchmarks/stubs.py
+"""
+Deterministic local stand-ins for the LLM and AviationStack, used by the benchmarks.
+
+The stubs sleep for a configurable latency (base + seeded uniform jitter) so the
+numbers we measure include a realistic, but repeatable, external-call cost.
+"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from backend.api_clients.aviationstack_api import _normalize_flight_data
+from backend.benchmarks.fake_servers import fake_aviationstack_record
+from backend.query_processing import llm_providers, orchestrator
+from backend.query_processing.llm_providers import Completion, LLMProvider, ProviderError
+from backend.utils.deadline import stage_timeout
+
+
+class StubLatency:
+    """Seeded latency source: base_ms plus uniform jitter in [0, jitter_ms]."""
+
+    def __init__(self, base_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 42):
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sleep(self, timeout_s: float | None = None) -> bool:
+        """Sleeps for one latency sample, at most timeout_s; False if the call would have timed out."""
+        if self.base_ms <= 0 and self.jitter_ms <= 0:
+            return True
+        with self._lock: # random.Random is not thread-safe across calls
+            jitter = self._rng.uniform(0, self.jitter_ms) if self.jitter_ms > 0 else 0.0
+        latency_s = (self.base_ms + jitter) / 1000.0
+        if timeout_s is not None and latency_s > timeout_s:
+            time.sleep(timeout_s)
+            return False
+        time.sleep(latency_s)
+        return True
+
+
+class StubProvider(LLMProvider):
+    """LLM provider that sleeps for the stub latency and returns a fixed-shape answer."""
+    name = "stub"
+
+    def __init__(self, latency: StubLatency):
+        self.latency = latency
+
+    def complete(self, prompt: str, model: str | None, max_tokens: int, timeout_s: float) -> Completion:
+        if not self.latency.sleep(timeout_s):
+            raise ProviderError("stub provider timed out", retryable=True)
+        return Completion(f"[stub-llm] {len(prompt)} prompt chars answered.", None)
+
+
+@contextmanager
+def stubbed_externals(llm_latency: StubLatency | None = None,
+                      api_latency: StubLatency | None = None,
+                      route_results: int = 5) -> Iterator[None]:
+    """
+    Replaces the OpenAI and AviationStack calls used by the orchestrator with
+    deterministic local stubs for the duration of the context. Only the provider
+    call itself is stubbed: every call site is routed to StubProvider, while LLM
+    admission control (llm_gateway) and the provider retry/metrics layer still apply.
+    """
+    llm_latency = llm_latency or StubLatency()
+    api_latency = api_latency or StubLatency()
+
+    # Same timeouts as the real client: a call slower than its (deadline-capped) timeout returns None
+    def fake_live_flight_data(flight_number: str) -> dict | None:
+        if not api_latency.sleep(stage_timeout(8)):
+            return None
+        return _normalize_flight_data(fake_aviationstack_record(flight_number.upper()))
+
+    def fake_route_search(dep_iata: str, arr_iata: str) -> list[dict] | None:
+        if not api_latency.sleep(stage_timeout(10)):
+            return None
+        return [
+            _normalize_flight_data(fake_aviationstack_record(f"SB{100 + i}", dep_iata.upper(), arr_iata.upper()))
+            for i in range(route_results)
+        ]
+
+    saved = {
+        (orchestrator, "get_live_flight_data"): orchestrator.get_live_flight_data,
+        (orchestrator, "search_flights_by_route"): orchestrator.search_flights_by_route,
+    }
+    llm_providers.register_provider(StubProvider(llm_latency))
+    saved_selection = llm_providers.configure_providers("stub")
+    orchestrator.get_live_flight_data = fake_live_flight_data
+    orchestrator.search_flights_by_route = fake_route_search
+    try:
+        yield
+    finally:
+        for (module, attr), value in saved.items():
+            setattr(module, attr, value)
+        llm_providers.configure_providers(**saved_selection)
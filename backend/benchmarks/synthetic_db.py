@@ -0,0 +1,141 @@
+# backend/benchmarks/synthetic_db.py
+"""
+Builds seeded synthetic airline databases of configurable size and points the
+app's SessionLocal at them, so benchmarks never touch the real airline.db.
+"""
+import os
+import random
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Engine
+
+from backend.DB.database import Base, SessionLocal, engine as default_engine
+from backend.DB.models import Booking, Customer, Flight, Policy, Seat
+from backend.DB.route_graph import reset_route_graph
+
+AIRLINES = ["AI", "EK", "UA", "DL", "BA", "LH", "QR", "SQ"]
+AIRPORTS = [
+    "DEL", "BOM", "BLR", "MAA", "HYD", "CCU", "COK", "GOI", "DXB", "DOH",
+    "LHR", "CDG", "FRA", "AMS", "JFK", "EWR", "SFO", "LAX", "ORD", "ATL",
+    "SIN", "HKG", "NRT", "SYD",
+]
+SEAT_COLUMNS = ["A", "B", "C", "D", "E", "F"]
+POLICY_TYPES = ["Baggage", "Pet Travel", "Cancellation", "Refund", "Check-in"]
+
+
+@dataclass
+class DBSize:
+    """How many rows of each kind a synthetic database gets."""
+    name: str
+    flights: int
+    seat_rows: int
+    customers: int
+    bookings: int
+
+
+SIZES = {
+    "small": DBSize("small", flights=50, seat_rows=5, customers=20, bookings=40),
+    "large": DBSize("large", flights=5000, seat_rows=10, customers=2000, bookings=20000),
+}
+
+
+@dataclass
+class SyntheticDB:
+    """Handle to a generated database plus the keys the benchmark scenarios need."""
+    size: DBSize
+    path: str
+    engine: Engine
+    flight_numbers: List[str] = field(default_factory=list)
+    routes: List[Tuple[str, str]] = field(default_factory=list)
+    pnrs: List[str] = field(default_factory=list)
+    customer_ids: List[int] = field(default_factory=list)
+
+
+def build_synthetic_db(size: DBSize, path: str | None = None, seed: int = 7) -> SyntheticDB:
+    """Creates and fills a fresh SQLite file with `size` rows. Uses Core bulk inserts."""
+    rng = random.Random(seed)
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix=f"bench_{size.name}_", suffix=".db")
+        os.close(fd)
+    elif os.path.exists(path):
+        os.remove(path)
+
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = SyntheticDB(size=size, path=path, engine=engine)
+
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    flights, seats = [], []
+    seat_id = 0
+    for flight_id in range(1, size.flights + 1):
+        airline = AIRLINES[flight_id % len(AIRLINES)]
+        src, dst = rng.sample(AIRPORTS, 2)
+        dep = start + timedelta(minutes=rng.randrange(0, 60 * 24 * 30, 5))
+        flight_number = f"{airline}{1000 + flight_id}"
+        flights.append({
+            "flight_id": flight_id, "airline_code": airline, "flight_number": flight_number,
+            "source_airport_code": src, "destination_airport_code": dst,
+            "scheduled_departure": dep, "scheduled_arrival": dep + timedelta(minutes=rng.randrange(60, 600, 5)),
+            "current_status": rng.choice(["Scheduled", "On Time", "Delayed"]),
+        })
+        db.flight_numbers.append(flight_number)
+        db.routes.append((src, dst))
+        for row in range(1, size.seat_rows + 1):
+            for col_idx, col in enumerate(SEAT_COLUMNS):
+                seat_id += 1
+                seats.append({
+                    "seat_id": seat_id, "flight_id": flight_id, "row_number": row, "column_letter": col,
+                    "seat_class": "Business" if row <= 2 else "Economy",
+                    "price": 5000 + row * 50 + col_idx * 10, "is_booked": False,
+                })
+
+    customers = [
+        {"customer_id": i, "name": f"Customer {i}", "email": f"customer{i}@example.com",
+         "phone": f"+9190000{i:05d}", "created_at": start}
+        for i in range(1, size.customers + 1)
+    ]
+    db.customer_ids = [c["customer_id"] for c in customers]
+
+    bookings = []
+    booked_seats = rng.sample(range(len(seats)), min(size.bookings, len(seats)))
+    for i, seat_idx in enumerate(booked_seats):
+        seat = seats[seat_idx]
+        seat["is_booked"] = True
+        pnr = f"PNR{100000 + i}"
+        bookings.append({
+            "pnr": pnr, "customer_id": rng.choice(db.customer_ids), "flight_id": seat["flight_id"],
+            "booking_date": start, "assigned_seat": f"{seat['row_number']}{seat['column_letter']}",
+            "fare_amount": seat["price"], "payment_status": "Paid", "booking_status": "Confirmed",
+        })
+        db.pnrs.append(pnr)
+
+    policies = [
+        {"policy_type": ptype, "airline_code": airline,
+         "policy_text": f"{airline}: synthetic {ptype.lower()} policy text for benchmarking. " * 4,
+         "source_url": "synthetic", "last_updated": start}
+        for airline in AIRLINES for ptype in POLICY_TYPES
+    ]
+
+    with engine.begin() as conn:
+        conn.execute(insert(Flight.__table__), flights)
+        conn.execute(insert(Seat.__table__), seats)
+        conn.execute(insert(Customer.__table__), customers)
+        if bookings:
+            conn.execute(insert(Booking.__table__), bookings)
+        conn.execute(insert(Policy.__table__), policies)
+    return db
+
+
+def use_database(engine: Engine) -> None:
+    """Re-binds the app-wide SessionLocal so every DB helper uses `engine`."""
+    SessionLocal.configure(bind=engine)
+    reset_route_graph()
+
+
+def restore_default_database() -> None:
+    SessionLocal.configure(bind=default_engine)
+    reset_route_graph()
@@ -1,12 +1,33 @@
 # <<<<<<< HEAD
-from fastapi import FastAPI, Request, Query
+import os
+from fastapi import FastAPI, Query
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from backend.DB.database import engine
+from backend.DB.models import ensure_indexes
 from backend.query_processing.orchestrator import process_user_query
+from backend.query_processing.policy_digests import start_refresh_thread
+from backend.routers.admin_router import admin_router
+from backend.routers.data_router import data_router
+from backend.schemas import QueryRequest, QueryResponse
+from backend.utils import memory_diagnostics
+from backend.utils.config import MEMORY_DIAGNOSTICS, REQUEST_DEADLINE_S
+from backend.utils.deadline import request_deadline
+from backend.utils.logger import get_logger
+from backend.utils.metrics import render_prometheus
+
+log = get_logger(__name__)
 
 app = FastAPI(
     title="Trip Assistant API",
     description="An intelligent assistant for flight bookings, cancellations, and flight status queries.",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse, # orjson: several times faster than the stdlib encoder
 )
+# Paginated read endpoints for ops tooling: /api/flights, /api/bookings, /api/seats, /api/policies
+app.include_router(data_router)
+# Opt-in: GET /admin/memory (top allocators, component sizes); absent unless MEMORY_DIAGNOSTICS=1
+if MEMORY_DIAGNOSTICS:
+    app.include_router(admin_router)
 # # =======
 # # backend/main.py
 # from fastapi import FastAPI
@@ -23,24 +44,47 @@ app = FastAPI(
 # # >>>>>>> 77dab488017b2f362bf74e5cf0da616a701b9545
 
 
+@app.on_event("startup")
+def start_background_jobs():
+    if MEMORY_DIAGNOSTICS:
+        memory_diagnostics.start() # Per worker (after any fork): traces what the worker allocates while serving
+    # Databases created before the read API lack its filter indexes
+    created = ensure_indexes(engine)
+    if created:
+        log.info("Created %d missing database indexes", created)
+    # Precomputed policy answers: regenerated in the background when source policies change.
+    # Digests live in the database, so under backend/server.py only worker 0 runs the refresher
+    if os.getenv("TRIP_ASSISTANT_WORKER_ID", "0") == "0":
+        start_refresh_thread()
+
+
 @app.get("/")
 def home():
     return {"message": "Welcome to the Trip Assistant API!"}
 
 
+# Prometheus scrape target: per-stage latency histograms labelled by intent and stage
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 # ✅ GET endpoint for quick browser testing
-@app.get("/query")
+@app.get("/query", response_model=QueryResponse)
 def ask(
-    query: str = Query(..., description="Enter your question here, e.g. 'What is the status of flight AI202?'"),
-    user_id: str = Query("default_user", description="Optional user ID for session tracking")
+    query: str = Query(..., min_length=1, description="Enter your question here, e.g. 'What is the status of flight AI202?'"),
+    user_id: str = Query("default_user", description="Optional user ID for session tracking"),
+    deadline: float | None = Query(None, gt=0, description="Seconds you will wait for the answer"),
 ):
-    result = process_user_query(user_id, query)
-    return {"response": result}
+    # Every stage of the turn sizes its timeout from this budget and degrades near its end
+    with request_deadline(deadline or REQUEST_DEADLINE_S):
+        result = process_user_query(user_id, query)
+    return {"response": result, "user_id": user_id}
 
 
 # ✅ POST endpoint for structured requests (Swagger UI)
-@app.post("/query")
-async def handle_query(request: Request):
+@app.post("/query", response_model=QueryResponse)
+def handle_query(request: QueryRequest):
     """
     POST endpoint for chatbot-like queries.
     Example:
@@ -48,17 +92,15 @@ async def handle_query(request: Request):
       "query": "I want to cancel my flight ticket",
       "user_id": "user123"
     }
+    The body is validated by FastAPI (an empty query gets a 422). The handler is sync
+    so process_user_query runs in the threadpool instead of blocking the event loop.
+    The turn answers within `deadline` (default REQUEST_DEADLINE_S), degrading to
+    DB/template answers when the live API or LLM would not fit.
     """
-    data = await request.json()
-    user_query = data.get("query")
-    user_id = data.get("user_id", "default_user")
-
 # <<<<<<< HEAD
-    if not user_query:
-        return {"error": "Query text is required."}
-
-    response = process_user_query(user_id, user_query)
-    return {"response": response}
+    with request_deadline(request.deadline or REQUEST_DEADLINE_S):
+        response = process_user_query(request.user_id, request.query)
+    return {"response": response, "user_id": request.user_id, "request_id": request.request_id}
 # =======
 # @app.get("/")
 # def root():
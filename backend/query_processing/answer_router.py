@@ -0,0 +1,100 @@
+# backend/query_processing/answer_router.py
+"""
+Template-first answers for flight info, seat availability and route search.
+
+The deterministic templates (templates.py) exactly answer arrival, departure,
+gate, terminal, plain status, seat count and route listing questions, so those
+never pay for an LLM round trip. A flight-info question goes to the template only
+when it matched the detail asked for (templates.FLIGHT_DETAILS); other wordings and
+open-ended questions ("why is it late?", "which of these is best?") go to the LLM,
+with the compact prompts from prompt_builder.py. The full template remains the
+fallback if the LLM is unavailable or shed.
+
+Every answer is counted by kind and route (template | llm | template_fallback);
+the LLM-avoidance rate is template / all.
+"""
+import re
+from typing import Callable, Dict, List
+
+from backend.query_processing import llm_layer
+from backend.query_processing.prompt_builder import build_data_prompt, build_flight_info_prompt, format_fields
+from backend.query_processing.templates import (
+    flight_info_template, matched_flight_info_template, route_search_template, seat_availability_template,
+)
+from backend.utils.metrics import counter
+
+ANSWER_ROUTES = counter(
+    "trip_assistant_answer_route_total",
+    "Answers by kind (flight_info, seat_availability, route_search) and route (template, llm, template_fallback).",
+    ("kind", "route"),
+)
+KINDS = ("flight_info", "seat_availability", "route_search")
+
+# Questions templates can't answer: reasons, advice, comparisons, hypotheticals.
+# Polite forms ("could you tell me the gate") are not on the list: they ask for plain facts.
+_OPEN_ENDED_RE = re.compile(
+    r"\b(why|should|best|cheapest|earliest|fastest|shortest|compare|recommend|suggest|explain|"
+    r"how long|what if|worth|chance|likely)\b"
+)
+
+
+def is_open_ended(question: str) -> bool:
+    return bool(_OPEN_ENDED_RE.search(question.lower()))
+
+
+def _route(kind: str, question: str, template: str, build_prompt: Callable[[], str], answered: bool = True) -> str:
+    """
+    Template if it `answered` the question and the question isn't open-ended; else the
+    LLM, with the template as fallback. The prompt is only built for the LLM.
+    """
+    if answered and not is_open_ended(question):
+        ANSWER_ROUTES.inc(kind, "template")
+        return template
+    reply = llm_layer.generate_llm_response(build_prompt(), call_site=kind)
+    if reply:
+        ANSWER_ROUTES.inc(kind, "llm")
+        return reply
+    ANSWER_ROUTES.inc(kind, "template_fallback")
+    return template
+
+
+def answer_flight_info(flight_info: dict, question: str) -> str:
+    if not flight_info:
+        return flight_info_template(flight_info, question)
+    matched = matched_flight_info_template(flight_info, question)
+    return _route("flight_info", question, matched or flight_info_template(flight_info, question),
+                  lambda: build_flight_info_prompt(flight_info, question), answered=matched is not None)
+
+
+def answer_seat_availability(flight_number: str, available: int, total: int, question: str) -> str:
+    return _route("seat_availability", question, seat_availability_template(flight_number, available, total),
+                  lambda: build_data_prompt(question, format_fields({
+                      "flight_number": flight_number, "available_seats": str(available), "total_seats": str(total),
+                  })))
+
+
+def answer_route_search(source_code: str, dest_code: str, flights_data: List[dict] | None, question: str,
+                        live: bool = True) -> str:
+    template = route_search_template(source_code, dest_code, flights_data, live)
+    if not flights_data: # Errors and empty results are fully answered by the template
+        ANSWER_ROUTES.inc("route_search", "template")
+        return template
+    rows = "\n".join(
+        f"{f.get('flight_number')}|{f.get('airline')}|{f.get('departure_scheduled')}|{f.get('arrival_scheduled')}|{f.get('status')}"
+        for f in flights_data
+    )
+    return _route("route_search", question, template, lambda: build_data_prompt(
+        question, f"route:{source_code}-{dest_code}\nflight|airline|departs|arrives|status\n{rows}"))
+
+
+def llm_avoidance_stats() -> Dict[str, float]:
+    """Share of answers per kind (and overall) that skipped the LLM by design."""
+    stats, total_template, total = {}, 0.0, 0.0
+    for kind in KINDS:
+        template = ANSWER_ROUTES.value(kind, "template")
+        answered = template + ANSWER_ROUTES.value(kind, "llm") + ANSWER_ROUTES.value(kind, "template_fallback")
+        stats[kind] = template / answered if answered else 0.0
+        total_template += template
+        total += answered
+    stats["overall"] = total_template / total if total else 0.0
+    return stats
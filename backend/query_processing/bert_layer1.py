@@ -1,12 +1,14 @@
-from transformers import pipeline
-
-classifier = pipeline("text-classification", model="distilbert-base-uncased")
+from backend.query_processing.intent_classifier import classify_intent
 
 def classify_domain(query: str):
     """
     Returns 'airline' or 'generic' based on domain classification.
     """
-    # In practice, you'd fine-tune this
+    # Any intent other than 'unknown' from the trained classifier is an airline query
+    prediction = classify_intent(query)
+    if prediction is not None:
+        return "generic" if prediction[0] == "unknown" else "airline"
+    # Keyword fallback if the classifier artifact is missing
     keywords = ["flight", "ticket", "airline", "cancel", "refund", "baggage"]
     if any(k in query.lower() for k in keywords):
         return "airline"
@@ -1,7 +1,23 @@
+from backend.query_processing.intent_classifier import classify_intent
+
+# Orchestrator intents -> query_router data sources
+INTENT_SOURCES = {
+    "check_seat_availability": "mockdb",
+    "cancel_booking": "mockdb",
+    "create_booking": "mockdb",
+    "api_flight_info": "api",
+    "search_flights_by_route": "api",
+    "rag_policy": "rag",
+}
+
 def classify_airline_intent(query: str):
     """
     Classify airline-related queries into mockdb/api/rag.
     """
+    prediction = classify_intent(query)
+    if prediction is not None:
+        return INTENT_SOURCES.get(prediction[0], "mockdb")
+    # Keyword fallback if the classifier artifact is missing
     if any(k in query.lower() for k in ["book", "cancel", "pnr", "seat", "refund"]):
         return "mockdb"
     elif any(k in query.lower() for k in ["status", "live", "track"]):
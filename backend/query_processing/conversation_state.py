@@ -0,0 +1,124 @@
+# backend/query_processing/conversation_state.py
+"""
+Per-user conversation state for the orchestrator's multi-turn flows.
+
+One small slotted object per active user instead of a dict of ad-hoc flags:
+  * step: a single FlowStep instead of one boolean per awaiting_* flag
+  * details: a slotted FlowDetails, only while a flow is active (most users are idle)
+  * history: the last HISTORY_TURNS (user, bot) turns in a ring buffer that is
+    overwritten in place, instead of a list of "USER: ..." strings re-sliced every turn
+
+Message text is most of the footprint, so each turn is stored packed as one UTF-8
+bytes object (user and bot text joined by a unit separator): one object header per
+turn instead of a tuple and two str headers (~100 bytes less), and one "₹" in a
+reply doesn't widen the whole string to UCS-2. history() unpacks to Turn tuples.
+
+collections.deque(maxlen=N) would be the textbook ring buffer, but CPython allocates
+deques in 64-slot blocks (760 bytes each, even when empty), more than the whole
+state; a list of at most HISTORY_TURNS entries plus a write index is a few dozen.
+See backend/benchmarks/bench_conversation_state.py for bytes per user.
+"""
+from enum import IntEnum
+from typing import List, NamedTuple, Optional
+
+import orjson
+
+HISTORY_TURNS = 5 # User message + bot reply pairs kept per user (the old history kept 10 lines)
+_SEP = "\x1f" # ASCII unit separator between the user and bot text of a packed turn
+
+
+class FlowStep(IntEnum):
+    NONE = 0
+    AWAITING_PNR = 1
+    AWAITING_CANCEL_CONFIRMATION = 2
+    AWAITING_BOOKING_SOURCE = 3
+    AWAITING_BOOKING_DEST = 4
+    AWAITING_BOOKING_CONFIRMATION = 5
+    AWAITING_BOOKING_CUSTOMER_ID = 6
+    AWAITING_SEARCH_SOURCE = 7
+    AWAITING_SEARCH_DEST = 8
+    AWAITING_BOOKING_CHOICE = 9
+
+
+class Turn(NamedTuple):
+    user: str
+    bot: str
+
+
+def pack_turn(user: str, bot: str) -> bytes:
+    return f"{user.replace(_SEP, ' ')}{_SEP}{bot.replace(_SEP, ' ')}".encode()
+
+
+def unpack_turn(packed: bytes) -> Turn:
+    return Turn(*packed.decode().split(_SEP, 1))
+
+
+class FlowDetails:
+    """
+    What a flow has collected so far: the PNR to cancel, or the route/flight/seat being
+    booked or searched. A connecting itinerary keeps its first flight in flight_id,
+    assigned_seat and fare_amount, and the later ones in onward. choices holds the
+    flights offered for booking until the user picks one.
+    """
+    __slots__ = ("pnr", "source", "destination", "flight_id", "assigned_seat", "fare_amount", "onward", "choices")
+
+    def __init__(self, pnr: Optional[str] = None, source: Optional[str] = None, destination: Optional[str] = None,
+                 flight_id: Optional[int] = None, assigned_seat: Optional[str] = None,
+                 fare_amount: Optional[float] = None, onward: Optional[list] = None, choices: Optional[list] = None):
+        self.pnr = pnr
+        self.source = source
+        self.destination = destination
+        self.flight_id = flight_id
+        self.assigned_seat = assigned_seat
+        self.fare_amount = fare_amount
+        self.onward = onward # [flight_id, seat, fare] per later flight; None for a direct flight
+        self.choices = choices # [flight_id, flight_number, [[seat_class, seat, fare], ...]] per offered flight
+
+    def as_list(self) -> list:
+        return [getattr(self, field) for field in self.__slots__]
+
+
+class ConversationState:
+    __slots__ = ("step", "details", "_turns", "_next")
+
+    def __init__(self):
+        self.step = FlowStep.NONE
+        self.details: Optional[FlowDetails] = None
+        self._turns: List[bytes] = [] # Packed turns, see pack_turn
+        self._next = 0 # Slot the next turn overwrites once the ring is full
+
+    def start(self, step: FlowStep) -> FlowDetails:
+        """Enters a flow at `step` with empty details."""
+        self.step, self.details = step, FlowDetails()
+        return self.details
+
+    def reset(self) -> None:
+        """Leaves any flow; history is kept."""
+        self.step, self.details = FlowStep.NONE, None
+
+    def add_turn(self, user: str, bot: str) -> None:
+        turn = pack_turn(user, bot)
+        if len(self._turns) < HISTORY_TURNS:
+            self._turns.append(turn)
+        else:
+            self._turns[self._next] = turn
+            self._next = (self._next + 1) % HISTORY_TURNS
+
+    def history(self) -> List[Turn]:
+        """Turns oldest first."""
+        return [unpack_turn(t) for t in self._turns[self._next:] + self._turns[:self._next]]
+
+    def to_bytes(self) -> bytes:
+        """Compact JSON array: [step, details fields or null, [[user, bot], ...]]."""
+        details = self.details.as_list() if self.details is not None else None
+        return orjson.dumps([int(self.step), details, [[t.user, t.bot] for t in self.history()]])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ConversationState":
+        step, details, turns = orjson.loads(data)
+        state = cls()
+        state.step = FlowStep(step)
+        state.details = FlowDetails(*details) if details is not None else None
+        for user, bot in turns[-HISTORY_TURNS:]:
+            state.add_turn(user, bot)
+        return state
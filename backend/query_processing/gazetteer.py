@@ -0,0 +1,184 @@
+# backend/query_processing/gazetteer.py
+"""
+Reference-data index for airports and airlines.
+
+Names, cities and codes from data/gazetteer.tsv are compiled into one Aho-Corasick
+automaton, so every mention in a query is found in a single pass over its
+characters, whatever the number of entries. Matches must sit on word boundaries;
+overlaps keep the longest mention ("singapore airlines" over "singapore").
+Codes (DEL, EK) only match when written in uppercase or right after from/to, so
+words like "sin" or "sea" in running text are not mistaken for airports.
+"""
+import os
+import re
+from collections import deque
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+from backend.utils.logger import get_logger
+from backend.utils.memory_diagnostics import deep_sizeof, register_component
+
+log = get_logger(__name__)
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.tsv")
+
+# A mention directly after one of these words is the origin / the destination
+_ROLE_RE = re.compile(r"\b(from|to|into)\s+$")
+
+
+class Entry(NamedTuple):
+    kind: str # "airport" | "airline"
+    code: str
+    case_sensitive: bool # True for codes: matched in uppercase, or in any case after from/to
+
+
+class Mention(NamedTuple):
+    start: int
+    end: int
+    entry: Entry
+
+
+class GazetteerResult(NamedTuple):
+    airports: List[str] # IATA codes, origin ("from X") first, destination ("to Y") last
+    airlines: List[str] # Airline codes in order of mention
+
+
+class Gazetteer:
+    """Aho-Corasick automaton over lowercase patterns (goto tables, failure links, outputs)."""
+
+    def __init__(self, entries: List[Tuple[str, Entry]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Entry]]] = [[]]
+        for pattern, entry in entries:
+            self._add(pattern, entry)
+        self._build()
+        self.size = len(entries)
+        # Code -> kind ("airport" | "airline"), for callers that normalize text around codes
+        self.codes: Dict[str, str] = {entry.code: entry.kind for _, entry in entries if entry.case_sensitive}
+
+    def _add(self, pattern: str, entry: Entry) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][ch] = nxt
+            node = nxt
+        self._out[node].append((len(pattern), entry))
+
+    def _build(self) -> None:
+        """Breadth-first failure links; each node's outputs also include those of its failure target."""
+        queue = deque(self._goto[0].values()) # Depth-1 nodes fail to the root
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+                queue.append(child)
+
+    def _scan(self, text: str) -> Iterator[Mention]:
+        """All word-bounded matches, in one pass over the lowered text."""
+        lowered = text.lower()
+        if len(lowered) != len(text): # Rare non-ASCII case changes that alter length
+            lowered = "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(lowered):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, entry in out[node]:
+                start, end = i - length + 1, i + 1
+                if start > 0 and lowered[start - 1].isalnum():
+                    continue
+                if end < len(lowered) and lowered[end].isalnum():
+                    continue
+                # Codes count in any case right after from/to ("from del to bom"), else only in uppercase
+                if entry.case_sensitive and not self.reads_as_code(text[start:end], lowered[:start]):
+                    continue
+                yield Mention(start, end, entry)
+
+    def mentions(self, text: str) -> List[Mention]:
+        """Non-overlapping mentions, longest first at each position, in text order."""
+        chosen: List[Mention] = []
+        for m in sorted(self._scan(text), key=lambda m: (m.start, m.start - m.end)):
+            if not chosen or m.start >= chosen[-1].end:
+                chosen.append(m)
+        return chosen
+
+    def resolve(self, text: str) -> GazetteerResult:
+        origins, unmarked, destinations, airlines = [], [], [], []
+        for m in self.mentions(text):
+            code = m.entry.code
+            if m.entry.kind == "airline":
+                if code not in airlines:
+                    airlines.append(code)
+                continue
+            role = _ROLE_RE.search(text[:m.start].lower())
+            bucket = unmarked if role is None else (origins if role.group(1) == "from" else destinations)
+            bucket.append(code)
+        airports: List[str] = []
+        for code in origins + unmarked + destinations:
+            if code not in airports:
+                airports.append(code)
+        return GazetteerResult(airports, airlines)
+
+    @staticmethod
+    def reads_as_code(token: str, text_before: str) -> bool:
+        """Whether a code token is read as a code here: written in uppercase or right after from/to."""
+        return token.isupper() or after_role_word(text_before)
+
+    def airport_code(self, text: str) -> str | None:
+        """The single airport a short answer like "Bengaluru" or "bom" refers to, if any."""
+        stripped = text.strip()
+        if len(stripped) == 3 and stripped.isalpha(): # Bare code answer in any case
+            stripped = stripped.upper()
+        airports = self.resolve(stripped).airports
+        return airports[0] if len(airports) == 1 else None
+
+
+def load_gazetteer(path: str = GAZETTEER_PATH) -> Gazetteer:
+    """Reads `kind<TAB>code<TAB>name|name...` lines (# comments allowed) into an automaton."""
+    entries: List[Tuple[str, Entry]] = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip() or line.startswith("#"):
+                continue
+            kind, code, names = line.rstrip("\n").split("\t")
+            entries.append((code.lower(), Entry(kind, code, True)))
+            entries.extend((name, Entry(kind, code, False)) for name in names.split("|") if name)
+    return Gazetteer(entries)
+
+
+gazetteer = load_gazetteer()
+log.info("Loaded gazetteer with %d patterns", gazetteer.size)
+register_component("gazetteer", lambda: {"patterns": gazetteer.size, "bytes": deep_sizeof(gazetteer)})
+
+
+def resolve_mentions(text: str) -> GazetteerResult:
+    return gazetteer.resolve(text)
+
+
+def airport_code(text: str) -> str | None:
+    return gazetteer.airport_code(text)
+
+
+def code_kind(token: str) -> str | None:
+    """"airport" / "airline" if `token` (any case) is a known code, else None."""
+    return gazetteer.codes.get(token.upper())
+
+
+def reads_as_code(token: str, text_before: str) -> bool:
+    return Gazetteer.reads_as_code(token, text_before)
+
+
+def after_role_word(text_before: str) -> bool:
+    """Whether the text so far ends in from/to/into, i.e. what comes next is an origin or destination."""
+    return bool(_ROLE_RE.search(text_before.lower()))
@@ -0,0 +1,177 @@
+# backend/query_processing/intent_classifier.py
+"""
+Compact, CPU-cheap intent classifier: hashed word/char n-gram features into a
+multinomial logistic regression.
+
+The model is trained offline by intent_training.py and stored as a small binary
+artifact (data/intent_model.bin) that loads in milliseconds: a JSON header
+followed by int32 bucket ids and a float32 weight matrix.
+
+Selected as an alternative intent source for process_user_query via config:
+    INTENT_SOURCE=rules       keyword/regex hints from spacy_processor (default)
+    INTENT_SOURCE=classifier  always use this model
+    INTENT_SOURCE=hybrid      use this model when its probability >= INTENT_CONFIDENCE_THRESHOLD,
+                              otherwise keep the rule-based hint
+"""
+import json
+import math
+import os
+import re
+import struct
+import zlib
+from array import array
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from backend.utils.config import INTENT_CONFIDENCE_THRESHOLD, INTENT_SOURCE
+from backend.utils.logger import get_logger
+from backend.utils.memory_diagnostics import deep_sizeof, register_component
+
+log = get_logger(__name__)
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "intent_model.bin")
+MAGIC = b"TAIC1" # Trip Assistant Intent Classifier, format v1
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+(?:['-][A-Za-z]+)?")
+_DIGITS_RE = re.compile(r"\d")
+
+
+def _shape(token: str) -> str | None:
+    """Coarse shape for tokens whose form matters more than their value (IATA codes, flight numbers, PNRs)."""
+    if len(token) == 3 and token.isalpha() and token.isupper():
+        return "AAA"
+    if re.fullmatch(r"[A-Za-z]{2,3}\d{2,4}", token):
+        return "AA0"
+    if re.fullmatch(r"PNR\d+", token, re.IGNORECASE):
+        return "PNR"
+    if token.isdigit():
+        return "0"
+    return None
+
+
+def extract_features(text: str, n_buckets: int) -> Dict[int, float]:
+    """Hashed word unigrams/bigrams, char 3-grams and token shapes -> {bucket: value} (L2-normalised)."""
+    tokens = _TOKEN_RE.findall(text)
+    words = [_DIGITS_RE.sub("0", t.lower()) for t in tokens]
+    feats: List[str] = []
+    feats.extend("w:" + w for w in words)
+    feats.extend(f"b:{a}_{b}" for a, b in zip(words, words[1:]))
+    for w in words:
+        padded = f"<{w}>"
+        feats.extend("c:" + padded[i:i + 3] for i in range(len(padded) - 2))
+    feats.extend("s:" + s for s in map(_shape, tokens) if s)
+
+    vec: Dict[int, float] = {}
+    for f in feats:
+        bucket = zlib.crc32(f.encode()) % n_buckets # Stable across processes, unlike hash()
+        vec[bucket] = vec.get(bucket, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+    return {k: v / norm for k, v in vec.items()}
+
+
+def _softmax(scores: List[float]) -> List[float]:
+    top = max(scores)
+    exps = [math.exp(s - top) for s in scores]
+    total = sum(exps)
+    return [e / total for e in exps]
+
+
+class IntentClassifier:
+    """Sparse multinomial logistic regression over hashed n-gram features."""
+
+    def __init__(self, labels: Sequence[str], n_buckets: int, weights: Dict[int, List[float]], bias: List[float]):
+        self.labels = list(labels)
+        self.n_buckets = n_buckets
+        self.weights = weights # bucket -> per-label weights; buckets never seen in training are absent
+        self.bias = bias
+
+    def predict_proba(self, text: str) -> List[float]:
+        scores = list(self.bias)
+        n_labels = len(self.labels)
+        for bucket, value in extract_features(text, self.n_buckets).items():
+            row = self.weights.get(bucket)
+            if row is not None:
+                for c in range(n_labels):
+                    scores[c] += row[c] * value
+        return _softmax(scores)
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Returns (label, probability) for one query."""
+        probs = self.predict_proba(text)
+        best = max(range(len(probs)), key=probs.__getitem__)
+        return self.labels[best], probs[best]
+
+    def predict_many(self, texts: Iterable[str]) -> List[Tuple[str, float]]:
+        """
+        predict() over several queries. Not batched: each query is featurised and scored on
+        its own, since scoring a batch in one pass over shared weight rows measured no faster
+        for this sparse pure-Python model.
+        """
+        return [self.predict(text) for text in texts]
+
+    # --- Artifact I/O ---
+    def save(self, path: str = MODEL_PATH) -> None:
+        buckets = sorted(self.weights)
+        header = json.dumps({"labels": self.labels, "n_buckets": self.n_buckets, "bias": self.bias,
+                             "rows": len(buckets)}).encode()
+        ids = array("i", buckets)
+        matrix = array("f", (w for b in buckets for w in self.weights[b]))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fh:
+            fh.write(MAGIC + struct.pack("<I", len(header)) + header)
+            fh.write(zlib.compress(ids.tobytes() + matrix.tobytes(), 9))
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> "IntentClassifier":
+        with open(path, "rb") as fh:
+            blob = fh.read()
+        if not blob.startswith(MAGIC):
+            raise ValueError(f"{path} is not an intent classifier artifact")
+        (header_len,) = struct.unpack_from("<I", blob, len(MAGIC))
+        offset = len(MAGIC) + 4
+        header = json.loads(blob[offset:offset + header_len])
+        payload = zlib.decompress(blob[offset + header_len:])
+        rows, n_labels = header["rows"], len(header["labels"])
+        ids = array("i")
+        ids.frombytes(payload[:rows * ids.itemsize])
+        matrix = array("f")
+        matrix.frombytes(payload[rows * ids.itemsize:])
+        weights = {b: matrix[i * n_labels:(i + 1) * n_labels].tolist() for i, b in enumerate(ids)}
+        return cls(header["labels"], header["n_buckets"], weights, header["bias"])
+
+
+_model: IntentClassifier | None = None
+_model_failed = False
+register_component("intent_classifier", lambda: {
+    "loaded": _model is not None, "bytes": deep_sizeof(_model.weights) if _model else 0,
+})
+
+
+def get_classifier() -> IntentClassifier | None:
+    """Loads the artifact once; returns None (rules stay in charge) if it is missing or unreadable."""
+    global _model, _model_failed
+    if _model is None and not _model_failed:
+        try:
+            _model = IntentClassifier.load()
+            log.info("Loaded intent classifier (%d labels, %d weight rows)", len(_model.labels), len(_model.weights))
+        except (OSError, ValueError, zlib.error) as e:
+            _model_failed = True
+            log.warning("Intent classifier unavailable, using rule-based intents: %s", e)
+    return _model
+
+
+def classify_intent(text: str) -> Tuple[str, float] | None:
+    model = get_classifier()
+    return model.predict(text) if model else None
+
+
+def choose_intent(text: str, rule_intent: str | None, source: str = INTENT_SOURCE) -> str | None:
+    """Picks the intent for process_user_query according to INTENT_SOURCE."""
+    if source == "rules":
+        return rule_intent
+    prediction = classify_intent(text)
+    if prediction is None:
+        return rule_intent
+    label, prob = prediction
+    if source == "classifier" or prob >= INTENT_CONFIDENCE_THRESHOLD:
+        return label
+    return rule_intent
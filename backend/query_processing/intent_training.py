@@ -0,0 +1,194 @@
+# backend/query_processing/intent_training.py
+"""
+Offline training for the intent classifier (intent_classifier.py).
+
+The labelled corpus is generated from templates for the intents process_user_query
+understands, with slots filled from flight numbers, airports, cities, airlines and
+policy topics. Training is plain SGD on a multinomial logistic regression with L2
+decay; the held-out split accuracy is printed and the artifact written to
+data/intent_model.bin.
+
+Usage (from the project root):
+    python -m backend.query_processing.intent_training
+    python -m backend.query_processing.intent_training --per-intent 600 --epochs 12 --dump-corpus corpus.jsonl
+"""
+import argparse
+import json
+import math
+import random
+import sys
+from typing import Dict, List, Tuple
+
+from backend.query_processing.intent_classifier import MODEL_PATH, IntentClassifier, extract_features
+
+LABELS = [
+    "check_seat_availability", "api_flight_info", "cancel_booking", "create_booking",
+    "search_flights_by_route", "rag_policy", "unknown",
+]
+
+SLOTS = {
+    "flight": ["AI202", "AI 202", "EK510", "UA123", "6E 2345", "DL45", "BA117", "SQ421", "LH761", "AI305",
+               "QR570", "AF225", "ai202", "ek 510", "UK817", "AA100"],
+    "iata": ["DEL", "BOM", "BLR", "MAA", "CCU", "HYD", "DXB", "LHR", "JFK", "EWR", "SIN", "CDG", "FRA", "DOH"],
+    "city": ["Delhi", "Mumbai", "Bangalore", "Chennai", "Kolkata", "Hyderabad", "Dubai", "London", "New York",
+             "Singapore", "Paris", "Frankfurt", "Doha", "Goa", "Pune"],
+    "airline": ["Air India", "Emirates", "United", "Delta", "IndiGo", "Lufthansa", "Qatar Airways",
+                "British Airways", "Singapore Airlines", "Vistara"],
+    "when": ["today", "tomorrow", "next Friday", "on Monday", "this weekend", "on 12 March", "tonight", ""],
+    "pnr": ["PNR12345", "PNR67890", "PNR00042", "PNR55511"],
+    "topic": ["baggage", "refund", "pet", "check-in", "cancellation", "cabin baggage", "infant", "excess baggage",
+              "seat selection", "meal"],
+    "cls": ["economy", "business", "first class", "premium economy"],
+}
+
+TEMPLATES: Dict[str, List[str]] = {
+    "check_seat_availability": [
+        "How many seats are available on {flight}?", "Are there any empty seats on {flight}",
+        "seat availability for {flight} please", "any vacant seats on {flight} {when}",
+        "Is there a free seat on flight {flight}?", "check seats on {flight}",
+        "how many {cls} seats are left on {flight}", "is {flight} full?", "show available seats for {flight}",
+        "do you have seats on {flight} {when}", "seats left {flight}", "are seats still open on {flight}",
+        "what seats are empty on {flight}", "availability of seats on {flight}",
+    ],
+    "api_flight_info": [
+        "What is the status of flight {flight}?", "status of {flight}", "Is {flight} on time?",
+        "When does {flight} depart?", "What's the departure gate for {flight}?",
+        "Which terminal does {flight} arrive at?", "Has {flight} been delayed? What's the new ETA?",
+        "where is {flight} right now", "track {flight}", "arrival time of {flight}", "{flight}",
+        "is flight {flight} delayed {when}", "live status {flight}", "when will {flight} land",
+        "gate number for {flight}", "what time does {flight} leave {when}", "{flight} status",
+        "has {flight} taken off yet", "estimated arrival for {flight}",
+    ],
+    "cancel_booking": [
+        "I want to cancel my booking", "Please cancel my flight ticket, my PNR is {pnr}", "cancel my booking",
+        "cancel {pnr}", "I need to cancel my reservation", "can you cancel my ticket",
+        "please cancel the booking {pnr}", "I won't be travelling, cancel my seat",
+        "cancel my flight {when}", "drop my reservation {pnr}", "I'd like to cancel my trip to {city}",
+        "how do I cancel my booking {pnr}", "cancel it", "get rid of my booking",
+    ],
+    "create_booking": [
+        "I want to book a flight", "Book me a flight from {city} to {city} {when}",
+        "Can you book a seat for me on a flight to {city}?", "book a ticket to {city}",
+        "I'd like to book a flight from {iata} to {iata}", "reserve a seat from {city} to {city} {when}",
+        "make a booking for me", "book {flight} for me", "I need a ticket to {city} {when}",
+        "can I book {cls} to {city}", "please book me on the next flight to {city}",
+        "new booking from {city}", "book a flight",
+    ],
+    "search_flights_by_route": [
+        "Search flights from {iata} to {iata}", "Find flights from {iata} to {iata} {when}",
+        "Look for flights to {city}", "Are there flights flying from {iata} to {iata} today?",
+        "flights from {city} to {city}", "what flights go from {city} to {city} {when}",
+        "show me flights between {city} and {city}", "any flights to {city} {when}",
+        "options from {iata} to {iata}", "which airlines fly from {city} to {city}",
+        "list flights {iata} to {iata}", "What's the schedule for flights between {city} and {city} {when}?",
+        "flights {city} {city}", "find me a flight to {city}",
+    ],
+    "rag_policy": [
+        "What is the {topic} policy?", "What is the baggage allowance on {airline} for {cls}?",
+        "Can I bring my pet on {airline}?", "Do you allow animals in the cabin on {airline} flights?",
+        "What is the refund policy for {airline}?", "When does online check-in open?",
+        "How early should I check in at the airport for an international flight?",
+        "What is the cancellation policy for {airline}?", "{airline} {topic} rules",
+        "how many bags can I take on {airline}", "what are the {topic} terms for {cls}",
+        "is there a fee for {topic} on {airline}", "tell me about the {topic} policy",
+        "can I get a refund if I cancel", "what's the weight limit for checked bags",
+        "policy on travelling with an infant", "do I get my money back if my flight is cancelled",
+    ],
+    "unknown": [
+        "Hi there!", "hello", "Thanks, that's all", "thank you", "Tell me something interesting about travelling",
+        "Can you help me plan a trip to {city} in December?", "Is there wifi on board?", "what can you do?",
+        "good morning", "who are you", "what's the weather in {city}", "recommend a hotel in {city}",
+        "tell me a joke", "ok", "bye", "what should I pack for {city}", "best restaurants near {iata} airport",
+        "how do I get to the airport in {city}", "do I need a visa for {city}", "help",
+    ],
+}
+
+
+def _fill(template: str, rng: random.Random) -> str:
+    """Fills each {slot} independently (so "{city} to {city}" gets two cities) and tidies whitespace."""
+    out = template
+    while "{" in out:
+        start = out.index("{")
+        end = out.index("}", start)
+        out = out[:start] + rng.choice(SLOTS[out[start + 1:end]]) + out[end + 1:]
+    out = " ".join(out.split())
+    # Casing noise: users type lowercase a lot
+    return out.lower() if rng.random() < 0.25 else out
+
+
+def generate_corpus(per_intent: int = 400, seed: int = 13) -> List[Tuple[str, str]]:
+    """Returns shuffled (text, label) pairs, `per_intent` of each label."""
+    rng = random.Random(seed)
+    corpus = [(_fill(rng.choice(TEMPLATES[label]), rng), label) for label in LABELS for _ in range(per_intent)]
+    rng.shuffle(corpus)
+    return corpus
+
+
+def train(corpus: List[Tuple[str, str]], n_buckets: int = 1 << 14, epochs: int = 10, lr: float = 0.5,
+          l2: float = 1e-5, seed: int = 13) -> IntentClassifier:
+    """SGD on softmax cross-entropy over sparse hashed features."""
+    rng = random.Random(seed)
+    n_labels = len(LABELS)
+    label_index = {label: i for i, label in enumerate(LABELS)}
+    examples = [(extract_features(text, n_buckets), label_index[label]) for text, label in corpus]
+    weights: Dict[int, List[float]] = {}
+    bias = [0.0] * n_labels
+
+    for epoch in range(epochs):
+        rng.shuffle(examples)
+        step = lr / (1 + epoch) # Simple decay
+        decay = 1 - step * l2
+        for feats, y in examples:
+            scores = list(bias)
+            for f, v in feats.items():
+                row = weights.get(f)
+                if row is not None:
+                    for c in range(n_labels):
+                        scores[c] += row[c] * v
+            top = max(scores)
+            exps = [math.exp(s - top) for s in scores]
+            total = sum(exps)
+            grad = [e / total for e in exps]
+            grad[y] -= 1.0
+            for c in range(n_labels):
+                bias[c] -= step * grad[c]
+            for f, v in feats.items():
+                row = weights.setdefault(f, [0.0] * n_labels)
+                for c in range(n_labels):
+                    row[c] = row[c] * decay - step * grad[c] * v
+    return IntentClassifier(LABELS, n_buckets, weights, bias)
+
+
+def accuracy(model: IntentClassifier, corpus: List[Tuple[str, str]]) -> float:
+    predictions = model.predict_many(text for text, _ in corpus)
+    return sum(p == label for (p, _), (_, label) in zip(predictions, corpus)) / len(corpus)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Train the hashed n-gram intent classifier")
+    parser.add_argument("--per-intent", type=int, default=400, help="Generated examples per intent")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--buckets", type=int, default=1 << 14, help="Hash space size")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction held out for evaluation")
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--output", default=MODEL_PATH)
+    parser.add_argument("--dump-corpus", help="Also write the generated corpus as JSON lines")
+    args = parser.parse_args(argv)
+
+    corpus = generate_corpus(args.per_intent, args.seed)
+    if args.dump_corpus:
+        with open(args.dump_corpus, "w") as fh:
+            for text, label in corpus:
+                fh.write(json.dumps({"text": text, "label": label}) + "\n")
+
+    split = int(len(corpus) * (1 - args.holdout))
+    model = train(corpus[:split], n_buckets=args.buckets, epochs=args.epochs, seed=args.seed)
+    print(f"[Train] {len(corpus[:split])} train / {len(corpus[split:])} held out, "
+          f"{len(model.weights)} weight rows, held-out accuracy {accuracy(model, corpus[split:]):.3f}", file=sys.stderr)
+    model.save(args.output)
+    print(f"[Train] Wrote {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
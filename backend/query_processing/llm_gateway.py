@@ -0,0 +1,184 @@
+# backend/query_processing/llm_gateway.py
+"""
+Admission control for LLM calls.
+
+Every call to the provider goes through one process-wide gateway that enforces:
+  * a concurrency limit (LLM_MAX_CONCURRENCY in-flight calls),
+  * a tokens-per-minute budget (LLM_TOKENS_PER_MINUTE, token bucket refilled continuously),
+  * priority order: interactive chat turns are admitted ahead of background work
+    such as policy digest precomputation, FIFO within a priority.
+
+A caller with a deadline is shed (acquire returns None and the caller uses its
+template fallback) when the predicted queue wait already exceeds the deadline, or
+when it is still queued once the deadline passes. The prediction only depends on
+the queue state (calls ahead, mean call time, token deficit), so the same load
+sheds the same requests instead of failing at random on provider rate limits.
+
+Usage:
+    ticket = gateway.acquire(Priority.INTERACTIVE, estimated_tokens, deadline_s=2.0)
+    if ticket is None:
+        return None # Shed -> template
+    try:
+        ... call the provider ...
+    finally:
+        gateway.release(ticket, used_tokens)
+"""
+import heapq
+import itertools
+import threading
+import time
+from enum import IntEnum
+from typing import List, NamedTuple
+
+from backend.utils.config import LLM_MAX_CONCURRENCY, LLM_MIN_BUDGET_S, LLM_QUEUE_DEADLINE_S, LLM_TOKENS_PER_MINUTE
+from backend.utils.deadline import remaining as deadline_remaining
+from backend.utils.logger import get_logger
+from backend.utils.metrics import counter, gauge, histogram
+
+log = get_logger(__name__)
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0 # A user is waiting on this turn
+    BACKGROUND = 1 # Precomputation; may wait indefinitely
+
+
+QUEUE_WAIT = histogram(
+    "trip_assistant_llm_queue_wait_seconds",
+    "Time LLM calls spent waiting for admission (concurrency slot and token budget).",
+    ("priority",),
+)
+ADMISSIONS = counter(
+    "trip_assistant_llm_admissions_total",
+    "LLM admission decisions (outcome = admitted | shed_predicted | shed_timeout).",
+    ("priority", "outcome"),
+)
+IN_FLIGHT = gauge("trip_assistant_llm_in_flight", "LLM calls currently running.")
+QUEUE_DEPTH = gauge("trip_assistant_llm_queue_depth", "LLM calls waiting for admission.", ("priority",))
+
+
+class Ticket(NamedTuple):
+    priority: Priority
+    tokens: int
+    admitted_at: float
+
+
+class LLMGateway:
+    """Priority admission queue in front of the LLM provider; 0 disables a limit."""
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, tokens_per_minute: int = LLM_TOKENS_PER_MINUTE,
+                 expected_call_s: float = 1.0):
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self._cond = threading.Condition()
+        self._waiting: List[list] = [] # heap of [priority, seq, tokens]
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._tokens = float(tokens_per_minute) # Bucket starts full
+        self._refilled_at = time.monotonic()
+        self._mean_call_s = expected_call_s # EWMA of call durations, for wait prediction
+
+    # --- Token bucket ---
+    def _refill(self) -> None:
+        if self.tokens_per_minute <= 0:
+            return
+        now = time.monotonic()
+        self._tokens = min(self.tokens_per_minute, self._tokens + (now - self._refilled_at) * self.tokens_per_minute / 60.0)
+        self._refilled_at = now
+
+    def _token_wait(self, tokens: float) -> float:
+        """Seconds until `tokens` are available (a request larger than the bucket waits for a full bucket)."""
+        if self.tokens_per_minute <= 0:
+            return 0.0
+        needed = min(tokens, self.tokens_per_minute) - self._tokens
+        return max(0.0, needed * 60.0 / self.tokens_per_minute)
+
+    # --- Admission ---
+    def _predicted_wait(self, priority: Priority, tokens: int) -> float:
+        ahead = [w for w in self._waiting if w[0] <= priority]
+        slot_wait = 0.0
+        if self.max_concurrency > 0:
+            excess = self._in_flight + len(ahead) - self.max_concurrency
+            if excess >= 0:
+                slot_wait = (excess // self.max_concurrency + 1) * self._mean_call_s
+        return max(slot_wait, self._token_wait(tokens + sum(w[2] for w in ahead)))
+
+    def _can_admit(self, entry: list) -> bool:
+        if self._waiting[0] is not entry:
+            return False
+        if self.max_concurrency > 0 and self._in_flight >= self.max_concurrency:
+            return False
+        self._refill()
+        return self._token_wait(entry[2]) == 0.0
+
+    def acquire(self, priority: Priority = Priority.INTERACTIVE, tokens: int = 0,
+                deadline_s: float | None = None) -> Ticket | None:
+        """Blocks until admitted; returns None if the request is shed against `deadline_s`."""
+        label = priority.name.lower()
+        enqueued = time.monotonic()
+        with self._cond:
+            self._refill()
+            if deadline_s is not None and self._predicted_wait(priority, tokens) > deadline_s:
+                ADMISSIONS.inc(label, "shed_predicted")
+                log.debug("LLM call shed: predicted wait exceeds %.2fs", deadline_s)
+                return None
+            entry = [int(priority), next(self._seq), tokens]
+            heapq.heappush(self._waiting, entry)
+            QUEUE_DEPTH.inc(label)
+            try:
+                while not self._can_admit(entry):
+                    timeout = self._token_wait(entry[2]) if self._waiting[0] is entry else None
+                    if deadline_s is not None:
+                        remaining = deadline_s - (time.monotonic() - enqueued)
+                        if remaining <= 0:
+                            ADMISSIONS.inc(label, "shed_timeout")
+                            log.debug("LLM call shed: still queued after %.2fs", deadline_s)
+                            return None
+                        timeout = remaining if timeout is None else min(timeout, remaining)
+                    self._cond.wait(timeout or None)
+                self._in_flight += 1
+                IN_FLIGHT.inc()
+                if self.tokens_per_minute > 0:
+                    self._tokens -= min(tokens, self.tokens_per_minute)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                QUEUE_DEPTH.dec(label)
+                self._cond.notify_all() # The next head may now be admissible
+        waited = time.monotonic() - enqueued
+        QUEUE_WAIT.observe(waited, label)
+        ADMISSIONS.inc(label, "admitted")
+        return Ticket(priority, tokens, time.monotonic())
+
+    def release(self, ticket: Ticket, used_tokens: int | None = None) -> None:
+        """Frees the slot; refunds (or charges) the difference between estimated and actual tokens."""
+        duration = time.monotonic() - ticket.admitted_at
+        with self._cond:
+            self._in_flight -= 1
+            IN_FLIGHT.dec()
+            self._mean_call_s = 0.8 * self._mean_call_s + 0.2 * duration
+            if used_tokens is not None and self.tokens_per_minute > 0:
+                self._tokens = min(self.tokens_per_minute, self._tokens + ticket.tokens - used_tokens)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            self._refill()
+            return {"in_flight": self._in_flight, "queued": len(self._waiting),
+                    "tokens_available": round(self._tokens, 1), "mean_call_s": round(self._mean_call_s, 4)}
+
+
+gateway = LLMGateway()
+
+
+def deadline_for(priority: Priority) -> float | None:
+    """
+    Interactive turns are shed after LLM_QUEUE_DEADLINE_S of queueing; background work never is.
+    Inside a request deadline no call queues for longer than leaves LLM_MIN_BUDGET_S for the call itself.
+    """
+    deadline = LLM_QUEUE_DEADLINE_S if priority == Priority.INTERACTIVE and LLM_QUEUE_DEADLINE_S > 0 else None
+    left = deadline_remaining()
+    if left is not None:
+        queue_budget = max(0.0, left - LLM_MIN_BUDGET_S)
+        deadline = queue_budget if deadline is None else min(deadline, queue_budget)
+    return deadline
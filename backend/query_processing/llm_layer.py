@@ -1,112 +1,80 @@
 # backend/query_processing/llm_layer.py
-import os
-import openai
-from backend.utils.config import OPENAI_API_KEY
-
-# Set up OpenAI key
-if OPENAI_API_KEY:
-    openai.api_key = OPENAI_API_KEY
-    # Check for gpt-4o-mini availability once
-    try:
-        models = openai.Model.list()
-        DEFAULT_MODEL = "gpt-4o-mini" if "gpt-4o-mini" in [m.id for m in models] else "gpt-3.5-turbo"
-        print(f"[LLM] OpenAI key found. Using model: {DEFAULT_MODEL}")
-    except Exception as e:
-        print(f"[LLM] Warning: OpenAI key provided but API check failed. {e}")
-        DEFAULT_MODEL = "gpt-3.5-turbo"
-else:
-    print("[LLM] Warning: OPENAI_API_KEY not set. LLM features will be disabled.")
-    DEFAULT_MODEL = None
+from typing import Iterator
+
+from backend.query_processing import llm_providers
+from backend.query_processing.llm_gateway import Priority, deadline_for, gateway
+from backend.query_processing.prompt_builder import record_prompt
+from backend.utils.config import LLM_MIN_BUDGET_S, LLM_PROVIDER, OPENAI_API_KEY
+from backend.utils.deadline import has_budget
+from backend.utils.metrics import timed
+from backend.utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Providers (OpenAI, local CPU model, echo) are selected per call site, see llm_providers.py
+if LLM_PROVIDER == "openai" and not OPENAI_API_KEY:
+    log.warning("OPENAI_API_KEY not set. LLM features will be disabled.")
+
 
+MAX_COMPLETION_TOKENS = 250
 
-def generate_llm_response(prompt: str, model: str = None) -> str | None:
-    """Helper function to call OpenAI API."""
-    if not OPENAI_API_KEY or not DEFAULT_MODEL:
+
+def llm_available(call_site: str = "other") -> bool:
+    return llm_providers.provider_for(call_site).available()
+
+
+def _chat_completion(prompt: str, model: str | None, call_site: str = "other") -> tuple[str, int | None]:
+    """One call to the call site's provider (with its timeout/retry policy); returns (content, total tokens if reported)."""
+    provider = llm_providers.provider_for(call_site)
+    content, total_tokens = llm_providers.complete(provider, prompt, model, MAX_COMPLETION_TOKENS, call_site)
+    return content, total_tokens
+
+
+@timed("llm")
+def generate_llm_response(prompt: str, model: str = None, priority: Priority = Priority.INTERACTIVE,
+                          call_site: str = "other") -> str | None:
+    """Helper function to call the call site's LLM provider through the admission gateway (see llm_gateway.py)."""
+    if not llm_available(call_site):
         return None  # Fallback to template
-    
+    if not has_budget(LLM_MIN_BUDGET_S, "llm"):
+        return None # Too little of the request deadline left for a call: template is the fastest answer
+
+    # Local prompt token estimate plus the completion cap; reconciled with actual usage on release
+    prompt_tokens = record_prompt(call_site, prompt)
+    ticket = gateway.acquire(priority, prompt_tokens + MAX_COMPLETION_TOKENS, deadline_for(priority))
+    if ticket is None:
+        return None # Shed under load: caller uses its template fallback
+    used_tokens = None
     try:
-        resp = openai.ChatCompletion.create(
-            model=model or DEFAULT_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1, # Low temperature for factual responses
-            max_tokens=250,
-        )
-        content = resp.choices[0].message.content.strip()
+        content, used_tokens = _chat_completion(prompt, model, call_site)
         return content
     except Exception as e:
-        print(f"[LLM] Error: {e}")
+        log.error("Error: %s", e)
         return None # Fallback to template
+    finally:
+        gateway.release(ticket, used_tokens)
 
 
-def craft_flight_info_response(flight_info: dict, user_question: str = "") -> str:
+def stream_llm_response(prompt: str, model: str = None, priority: Priority = Priority.INTERACTIVE,
+                        call_site: str = "other") -> Iterator[str]:
     """
-    If OPENAI_KEY available, call the API to create a natural response.
-    Otherwise, return a templated response using available fields.
+    Like generate_llm_response, but yields the answer in chunks as the provider
+    produces them. Yields nothing when the LLM is unavailable or the call is shed
+    (caller uses its template); a failure mid-stream ends the stream early.
     """
-    # 1. Try to use LLM for a natural response
-    if OPENAI_API_KEY:
-        # --- REFINED PROMPT ---
-        # Instruct the LLM to be specific to the user's question.
-        prompt = (
-            f"You are an airline assistant. A user asked: '{user_question}'\n\n"
-            f"Here is the flight data I found: {flight_info}\n\n"
-            f"Please answer the user's *specific question* using *only* this data. "
-            f"For example, if they ask for 'arrival time', just give the arrival time. If they ask for 'status', just give the status. "
-            f"If the data doesn't contain the specific info (e.g., they ask for a 'gate' but it's not listed), "
-            f"state that you have the flight status but not that specific detail."
-        )
-        llm_response = generate_llm_response(prompt)
-        if llm_response:
-            return llm_response
-
-    # 2. Template fallback if LLM fails or no key
-    print("[LLM] Fallback: Using template response for flight info.")
-    if not flight_info:
-        return "I couldn't find any live information for that flight right now."
-
-    status = flight_info.get("status", "Unknown")
-    airline = flight_info.get("airline", "")
-    fn = flight_info.get("flight_number")
-    q_lower = user_question.lower()
-
-    # --- REFINED TEMPLATE FALLBACK ---
-    # Try to answer the specific question first.
-    if "arrival" in q_lower or "eta" in q_lower:
-        arr_time = flight_info.get("arrival_estimated") or flight_info.get("arrival_scheduled")
-        if arr_time:
-            return f"The estimated arrival time for {fn} is {arr_time}."
-    
-    if "departure" in q_lower:
-        dep_time = flight_info.get("departure_estimated") or flight_info.get("departure_scheduled")
-        if dep_time:
-            return f"The estimated departure time for {fn} is {dep_time}."
-
-    if "gate" in q_lower:
-        arr_gate = flight_info.get("arrival_gate")
-        dep_gate = flight_info.get("departure_gate")
-        if arr_gate:
-            return f"Flight {fn} is scheduled to arrive at gate {arr_gate}."
-        if dep_gate:
-            return f"Flight {fn} is scheduled to depart from gate {dep_gate}."
-            
-    if "terminal" in q_lower:
-        arr_terminal = flight_info.get("arrival_terminal")
-        dep_terminal = flight_info.get("departure_terminal")
-        if arr_terminal:
-            return f"Flight {fn} is scheduled to arrive at terminal {arr_terminal}."
-        if dep_terminal:
-            return f"Flight {fn} is scheduled to depart from terminal {dep_terminal}."
-
-    # If no specific question was matched, build the generic response
-    base_response = f"Flight {fn} ({airline}) is currently *{status}*."
-    template = [base_response]
-    dep = flight_info.get("departure_airport")
-    arr = flight_info.get("arrival_airport")
-
-    if dep and arr:
-        template.append(f"It is flying from {dep} to {arr}.")
-
-    return " ".join(template)
+    if not llm_available(call_site) or not has_budget(LLM_MIN_BUDGET_S, "llm"):
+        return
+    prompt_tokens = record_prompt(call_site, prompt)
+    ticket = gateway.acquire(priority, prompt_tokens + MAX_COMPLETION_TOKENS, deadline_for(priority))
+    if ticket is None:
+        return
+    try:
+        provider = llm_providers.provider_for(call_site)
+        yield from llm_providers.stream(provider, prompt, model, MAX_COMPLETION_TOKENS, call_site)
+    except Exception as e:
+        log.error("Error: %s", e)
+    finally:
+        gateway.release(ticket, None) # Streams don't report usage; the estimate stands
 
 
 def call_llm_for_rag(user_query: str, policy_docs: list[str]) -> str:
@@ -117,7 +85,7 @@ def call_llm_for_rag(user_query: str, policy_docs: list[str]) -> str:
         return "I couldn't find any specific policies on that topic."
 
     # 1. Try to use LLM for RAG response
-    if OPENAI_API_KEY:
+    if llm_available("rag"):
         context = "\n\n".join(policy_docs)
         prompt = (
             f"You are an airline policy assistant.\n"
@@ -128,12 +96,12 @@ def call_llm_for_rag(user_query: str, policy_docs: list[str]) -> str:
             f"--- END OF DOCUMENTS ---\n\n"
             f"Answer:"
         )
-        llm_response = generate_llm_response(prompt)
+        llm_response = generate_llm_response(prompt, call_site="rag")
         if llm_response:
             return llm_response
 
     # 2. Template fallback (just return the first doc)
-    print("[LLM] Fallback: Using template response for RAG.")
+    log.debug("Fallback: Using template response for RAG.")
     return f"Here is the policy I found:\n{policy_docs[0]}"
 
 
@@ -142,13 +110,13 @@ def get_conversational_fallback(user_query: str) -> str:
     Provides a generic, conversational fallback if no intent is matched.
     """
     # 1. Try to use LLM
-    if OPENAI_API_KEY:
+    if llm_available("fallback"):
         prompt = (
             f"You are a helpful airline assistant. The user said: '{user_query}'\n"
             "This query didn't match any specific tools (like booking, cancellation, or flight status).\n"
             "Respond conversationally (1-2 sentences). Ask for clarification or gently guide them towards tasks you *can* do (like check flight status, book a flight, or look up policies)."
         )
-        llm_response = generate_llm_response(prompt)
+        llm_response = generate_llm_response(prompt, call_site="fallback")
         if llm_response:
             return llm_response
             
@@ -0,0 +1,374 @@
+# backend/query_processing/llm_providers.py
+"""
+Pluggable LLM providers behind generate_llm_response.
+
+  * openai: the OpenAI (>=1.0) client, honouring OPENAI_BASE_URL (e.g. the fake server)
+  * local:  an in-process CPU model via transformers (optional dependency, LOCAL_LLM_MODEL)
+  * echo:   deterministic, network-free: repeats the data the prompt carries
+
+The provider is chosen per call site (flight_info, rag, fallback, policy_digest, ...)
+from LLM_PROVIDER and LLM_PROVIDER_OVERRIDES, e.g. "policy_digest=local,fallback=echo".
+
+Every provider gets the same semantics from complete()/stream() here:
+  * a per-attempt timeout (LLM_TIMEOUT_S, capped by the request deadline), passed
+    down to the provider,
+  * retries with jittered exponential backoff on retryable errors (timeouts, rate
+    limits, 5xx), never after a stream has produced its first chunk and never once
+    the request deadline leaves less than LLM_MIN_BUDGET_S,
+  * metrics per provider and call site: calls by outcome, latency, time to first chunk.
+"""
+import os
+import random
+import threading
+import time
+from typing import Dict, Iterator, List, NamedTuple
+
+from backend.utils.config import (
+    LLM_ECHO_LATENCY_MS, LLM_MAX_RETRIES, LLM_PROVIDER, LLM_PROVIDER_OVERRIDES, LLM_RETRY_BACKOFF_S,
+    LLM_MIN_BUDGET_S, LLM_TIMEOUT_S, LOCAL_LLM_MODEL, OPENAI_API_KEY, OPENAI_BASE_URL, OPENAI_MODEL,
+)
+from backend.utils.deadline import has_budget, remaining, stage_timeout
+from backend.utils.logger import get_logger
+from backend.utils.memory_diagnostics import register_component
+from backend.utils.metrics import counter, histogram
+
+log = get_logger(__name__)
+
+PROVIDER_CALLS = counter(
+    "trip_assistant_llm_provider_calls_total",
+    "LLM provider attempts by provider, call site and outcome (ok, retry, error).",
+    ("provider", "call_site", "outcome"),
+)
+PROVIDER_LATENCY = histogram(
+    "trip_assistant_llm_provider_seconds",
+    "Provider time per LLM call including retries, by provider and call site.",
+    ("provider", "call_site"),
+)
+FIRST_CHUNK_LATENCY = histogram(
+    "trip_assistant_llm_first_chunk_seconds",
+    "Time to the first streamed chunk, by provider and call site.",
+    ("provider", "call_site"),
+)
+
+
+class ProviderError(Exception):
+    """A failed provider call; `retryable` marks transient failures worth another attempt."""
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class Completion(NamedTuple):
+    text: str
+    total_tokens: int | None # As reported by the provider; None when it doesn't count
+
+
+class LLMProvider:
+    """Base provider: subclasses implement complete(); stream() defaults to one chunk."""
+    name = "base"
+
+    def available(self) -> bool:
+        return True
+
+    def default_model(self) -> str | None:
+        return None
+
+    def after_fork(self) -> None:
+        """Drops per-process state (network clients, locks) in a forked child; loaded weights stay shared."""
+
+    def complete(self, prompt: str, model: str | None, max_tokens: int, timeout_s: float) -> Completion:
+        raise NotImplementedError
+
+    def stream(self, prompt: str, model: str | None, max_tokens: int, timeout_s: float) -> Iterator[str]:
+        yield self.complete(prompt, model, max_tokens, timeout_s).text
+
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+
+    def __init__(self, api_key: str = OPENAI_API_KEY, base_url: str = OPENAI_BASE_URL, model: str = OPENAI_MODEL):
+        self.api_key = api_key
+        self.base_url = base_url
+        self._model = model or None
+        self._client = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def _get_client(self):
+        with self._lock:
+            if self._client is None:
+                import openai
+                # Retries are done by complete()/stream() below so every provider behaves the same
+                self._client = openai.OpenAI(api_key=self.api_key, base_url=self.base_url or None,
+                                             timeout=LLM_TIMEOUT_S, max_retries=0)
+                if self.base_url:
+                    log.info("Using OpenAI base URL override: %s", self.base_url)
+            return self._client
+
+    def after_fork(self) -> None:
+        # The parent's httpx pool (sockets, locks) must not be shared across processes
+        self._client = None
+        self._lock = threading.Lock()
+
+    def default_model(self) -> str | None:
+        if self._model is None and self.available():
+            # Check for gpt-4o-mini availability once, on first use instead of at import
+            try:
+                ids = [m.id for m in self._get_client().models.list()]
+                self._model = "gpt-4o-mini" if "gpt-4o-mini" in ids else "gpt-3.5-turbo"
+            except Exception as e:
+                log.warning("OpenAI model check failed. %s", e)
+                self._model = "gpt-3.5-turbo"
+            log.info("OpenAI provider using model: %s", self._model)
+        return self._model
+
+    def _create(self, prompt: str, model: str | None, max_tokens: int, timeout_s: float, stream: bool):
+        import openai
+        try:
+            return self._get_client().chat.completions.create(
+                model=model or self.default_model(),
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.1, # Low temperature for factual responses
+                max_tokens=max_tokens,
+                timeout=timeout_s,
+                stream=stream,
+            )
+        except (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError,
+                openai.InternalServerError) as e:
+            raise ProviderError(str(e), retryable=True) from e
+        except openai.OpenAIError as e:
+            raise ProviderError(str(e)) from e
+
+    def complete(self, prompt: str, model: str | None, max_tokens: int, timeout_s: float) -> Completion:
+        resp = self._create(prompt, model, max_tokens, timeout_s, stream=False)
+        usage = getattr(resp, "usage", None)
+        return Completion((resp.choices[0].message.content or "").strip(), getattr(usage, "total_tokens", None))
+
+    def stream(self, prompt: str, model: str | None, max_tokens: int, timeout_s: float) -> Iterator[str]:
+        with self._create(prompt, model, max_tokens, timeout_s, stream=True) as chunks: # Closes the response if abandoned
+            for chunk in chunks:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+
+class LocalProvider(LLMProvider):
+    """
+    Runs LOCAL_LLM_MODEL in-process on CPU with transformers. The model is loaded on
+    first use; without transformers (or the model files) the provider is unavailable
+    and callers use their template fallback.
+    """
+    name = "local"
+
+    def __init__(self, model: str = LOCAL_LLM_MODEL):
+        self.model_name = model
+        self._model = None
+        self._tokenizer = None
+        self._failed = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> bool:
+        with self._lock:
+            if self._model is None and not self._failed:
+                try:
+                    from transformers import AutoModelForCausalLM, AutoTokenizer
+                    self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                    self._model = AutoModelForCausalLM.from_pretrained(self.model_name)
+                    self._model.eval()
+                    log.info("Loaded local LLM %s", self.model_name)
+                except Exception as e: # ImportError, missing weights, no network for a download...
+                    log.warning("Local LLM %s unavailable. %s", self.model_name, e)
+                    self._failed = True
+            return self._model is not None
+
+    def available(self) -> bool:
+        return self._load()
+
+    def after_fork(self) -> None:
+        self._lock = threading.Lock() # Could have been held by another thread at fork time
+
+    def memory_stats(self) -> Dict[str, object]:
+        if self._model is None:
+            return {"loaded": False, "bytes": 0}
+        return {"loaded": True, "model": self.model_name,
+                "bytes": sum(p.numel() * p.element_size() for p in self._model.parameters())}
+
+    def default_model(self) -> str | None:
+        return self.model_name
+
+    def _generate_kwargs(self, prompt: str, max_tokens: int, timeout_s: float) -> dict:
+        inputs = self._tokenizer(prompt, return_tensors="pt")
+        return dict(inputs, max_new_tokens=max_tokens, max_time=timeout_s, do_sample=False,
+                    pad_token_id=self._tokenizer.eos_token_id)
+
+    def complete(self, prompt: str, model: str | None, max_tokens: int, timeout_s: float) -> Completion:
+        if not self._load():
+            raise ProviderError(f"Local LLM {self.model_name} is not loaded")
+        kwargs = self._generate_kwargs(prompt, max_tokens, timeout_s)
+        prompt_len = kwargs["input_ids"].shape[-1]
+        output = self._model.generate(**kwargs)[0]
+        text = self._tokenizer.decode(output[prompt_len:], skip_special_tokens=True)
+        return Completion(text.strip(), int(output.shape[-1]))
+
+    def stream(self, prompt: str, model: str | None, max_tokens: int, timeout_s: float) -> Iterator[str]:
+        if not self._load():
+            raise ProviderError(f"Local LLM {self.model_name} is not loaded")
+        from transformers import TextIteratorStreamer
+        streamer = TextIteratorStreamer(self._tokenizer, skip_prompt=True, skip_special_tokens=True,
+                                        timeout=timeout_s)
+        kwargs = self._generate_kwargs(prompt, max_tokens, timeout_s)
+        worker = threading.Thread(target=self._model.generate, kwargs=dict(kwargs, streamer=streamer), daemon=True)
+        worker.start()
+        for text in streamer:
+            if text:
+                yield text
+        worker.join()
+
+
+class EchoProvider(LLMProvider):
+    """
+    Deterministic and network-free: answers with the `key:value` data lines the
+    prompt carries (compact prompts, see prompt_builder.py), or the user's question.
+    Optional fixed latency (LLM_ECHO_LATENCY_MS) stands in for a real model in benchmarks.
+    """
+    name = "echo"
+
+    def __init__(self, latency_ms: float = LLM_ECHO_LATENCY_MS):
+        self.latency_ms = latency_ms
+
+    def default_model(self) -> str | None:
+        return "echo"
+
+    def complete(self, prompt: str, model: str | None, max_tokens: int, timeout_s: float) -> Completion:
+        if self.latency_ms > 0:
+            if self.latency_ms / 1000.0 > timeout_s:
+                time.sleep(timeout_s)
+                raise ProviderError("echo provider timed out", retryable=True)
+            time.sleep(self.latency_ms / 1000.0)
+        data = [line for line in prompt.splitlines() if ":" in line and " " not in line.split(":", 1)[0]]
+        text = "; ".join(data) if data else prompt.splitlines()[0] if prompt else ""
+        words = text.split()[:max_tokens] # Roughly honour the completion cap
+        return Completion(f"[echo] {' '.join(words)}", None)
+
+    def stream(self, prompt: str, model: str | None, max_tokens: int, timeout_s: float) -> Iterator[str]:
+        text = self.complete(prompt, model, max_tokens, timeout_s).text
+        for i, word in enumerate(text.split(" ")):
+            yield word if i == 0 else " " + word
+
+
+PROVIDERS: Dict[str, LLMProvider] = {p.name: p for p in (OpenAIProvider(), LocalProvider(), EchoProvider())}
+register_component("local_llm", PROVIDERS["local"].memory_stats)
+
+
+def register_provider(provider: LLMProvider) -> None:
+    PROVIDERS[provider.name] = provider
+
+
+def parse_overrides(spec: str) -> Dict[str, str]:
+    """'policy_digest=local, fallback=echo' -> {"policy_digest": "local", "fallback": "echo"}"""
+    overrides = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        site, _, name = item.partition("=")
+        overrides[site.strip()] = name.strip().lower()
+    return overrides
+
+
+_selection = {"default": LLM_PROVIDER, "overrides": parse_overrides(LLM_PROVIDER_OVERRIDES)}
+
+
+def configure_providers(default: str, overrides: Dict[str, str] | None = None) -> dict:
+    """Sets the provider selection; returns the previous one (for restoring in benchmarks)."""
+    previous = dict(_selection)
+    _selection.update(default=default, overrides=dict(overrides or {}))
+    return previous
+
+
+def provider_for(call_site: str) -> LLMProvider:
+    name = _selection["overrides"].get(call_site, _selection["default"])
+    try:
+        return PROVIDERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown LLM provider '{name}' for call site '{call_site}'") from None
+
+
+def selected_providers() -> List[LLMProvider]:
+    """The providers the current selection can route to (default first), e.g. for preloading."""
+    names = dict.fromkeys([_selection["default"], *_selection["overrides"].values()])
+    return [PROVIDERS[name] for name in names if name in PROVIDERS]
+
+
+def _after_fork_in_child() -> None:
+    for provider in PROVIDERS.values():
+        provider.after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def _backoff(attempt: int) -> None:
+    # Full jitter: uniform in [0, base * 2^attempt], never sleeping into the budget the retry itself needs
+    delay = random.uniform(0, LLM_RETRY_BACKOFF_S * (2 ** attempt))
+    left = remaining()
+    if left is not None:
+        delay = max(0.0, min(delay, left - LLM_MIN_BUDGET_S))
+    time.sleep(delay)
+
+
+def _can_retry(attempt: int) -> bool:
+    return attempt < LLM_MAX_RETRIES and has_budget(LLM_MIN_BUDGET_S, "llm_retry")
+
+
+def complete(provider: LLMProvider, prompt: str, model: str | None, max_tokens: int,
+             call_site: str = "other") -> Completion:
+    """One completion with the shared timeout/retry/metrics semantics; raises the last error."""
+    t0 = time.perf_counter()
+    try:
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            try:
+                result = provider.complete(prompt, model, max_tokens, stage_timeout(LLM_TIMEOUT_S))
+                PROVIDER_CALLS.inc(provider.name, call_site, "ok")
+                return result
+            except ProviderError as e:
+                if not e.retryable or not _can_retry(attempt):
+                    PROVIDER_CALLS.inc(provider.name, call_site, "error")
+                    raise
+                PROVIDER_CALLS.inc(provider.name, call_site, "retry")
+                log.warning("LLM provider %s failed (%s), retrying", provider.name, e)
+                _backoff(attempt)
+            except Exception:
+                PROVIDER_CALLS.inc(provider.name, call_site, "error")
+                raise
+    finally:
+        PROVIDER_LATENCY.observe(time.perf_counter() - t0, provider.name, call_site)
+
+
+def stream(provider: LLMProvider, prompt: str, model: str | None, max_tokens: int,
+           call_site: str = "other") -> Iterator[str]:
+    """Streams chunks with the same semantics as complete(); retries only before the first chunk."""
+    t0 = time.perf_counter()
+    try:
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            started = False
+            try:
+                for chunk in provider.stream(prompt, model, max_tokens, stage_timeout(LLM_TIMEOUT_S)):
+                    if not started:
+                        started = True
+                        FIRST_CHUNK_LATENCY.observe(time.perf_counter() - t0, provider.name, call_site)
+                    yield chunk
+                PROVIDER_CALLS.inc(provider.name, call_site, "ok")
+                return
+            except ProviderError as e:
+                if started or not e.retryable or not _can_retry(attempt):
+                    PROVIDER_CALLS.inc(provider.name, call_site, "error")
+                    raise
+                PROVIDER_CALLS.inc(provider.name, call_site, "retry")
+                log.warning("LLM provider %s stream failed (%s), retrying", provider.name, e)
+                _backoff(attempt)
+            except Exception:
+                PROVIDER_CALLS.inc(provider.name, call_site, "error")
+                raise
+    finally:
+        PROVIDER_LATENCY.observe(time.perf_counter() - t0, provider.name, call_site)
@@ -0,0 +1,159 @@
+# backend/query_processing/policy_digests.py
+"""
+Precomputed policy answers ("digests") per (airline_code, policy_type).
+
+Generic questions such as "what is the baggage policy for Emirates?" are answered
+from a stored digest instead of a DB + LLM round trip per request. A refresh job
+compares each group's source version (max Policy.last_updated, row count) with
+the stored digest and regenerates only groups that changed.
+
+Run once (e.g. after loading policies):
+    python -m backend.query_processing.policy_digests [--force]
+The API also refreshes in a background thread every POLICY_DIGEST_REFRESH_S seconds.
+"""
+import argparse
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func
+
+from backend.DB.database import SessionLocal
+from backend.DB.models import Policy, PolicyDigest
+from backend.query_processing import llm_layer
+from backend.query_processing.llm_gateway import Priority
+from backend.utils.config import POLICY_DIGEST_REFRESH_S
+from backend.utils.logger import get_logger
+from backend.utils.metrics import counter, span
+
+log = get_logger(__name__)
+
+POLICY_ANSWERS = counter(
+    "trip_assistant_policy_answers_total",
+    "Policy questions by how they were answered (digest or rag).",
+    ("source",),
+)
+
+# Markers of a specific follow-up ("can I bring two bags if...", "my", numbers) that needs the LLM over the raw text
+_SPECIFIC_RE = re.compile(
+    r"\b(can|could|may|might|if|my|mine|i'm|i am|i have|will|would|should|how much|how many|allowed to|what if|\d+)\b"
+)
+
+
+def is_generic_policy_question(query: str) -> bool:
+    """True for "what is the X policy (for Y)"-style questions a stored digest fully answers."""
+    return not _SPECIFIC_RE.search(query.lower())
+
+
+def _ensure_table(bind) -> None:
+    # Only this table, so the job works on databases created before digests existed
+    PolicyDigest.__table__.create(bind=bind, checkfirst=True)
+
+
+def build_digest(airline_code: str, policy_type: str, texts: List[str]) -> Tuple[str, str]:
+    """Returns (digest_text, generator): an LLM summary if available, else the policy text itself."""
+    prompt = (
+        f"Summarise the following {policy_type} policy for airline {airline_code} for a traveller "
+        f"in at most 3 short sentences. Use only this text and keep every limit, fee and deadline.\n\n"
+        + "\n\n".join(texts)
+    )
+    # Queued behind chat turns
+    summary = llm_layer.generate_llm_response(prompt, priority=Priority.BACKGROUND, call_site="policy_digest")
+    if summary:
+        return summary, "llm"
+    return "\n".join(texts), "extract"
+
+
+def refresh_digests(force: bool = False) -> Dict[str, int]:
+    """Regenerates digests whose source policies changed (or all with force); drops orphaned ones."""
+    stats = {"groups": 0, "regenerated": 0, "unchanged": 0, "removed": 0}
+    session = SessionLocal()
+    try:
+        _ensure_table(session.get_bind())
+        groups = session.query(
+            Policy.airline_code, Policy.policy_type, func.max(Policy.last_updated), func.count(Policy.policy_id)
+        ).group_by(Policy.airline_code, Policy.policy_type).all()
+        existing = {(d.airline_code, d.policy_type): d for d in session.query(PolicyDigest).all()}
+        stats["groups"] = len(groups)
+
+        for airline_code, policy_type, version, count in groups:
+            digest = existing.pop((airline_code, policy_type), None)
+            if digest and not force and digest.source_version == version and digest.source_count == count:
+                stats["unchanged"] += 1
+                continue
+            texts = [text for text, in session.query(Policy.policy_text).filter(
+                Policy.airline_code == airline_code, Policy.policy_type == policy_type
+            ).order_by(Policy.policy_id).all()]
+            text, generator = build_digest(airline_code, policy_type, texts)
+            if digest is None:
+                digest = PolicyDigest(airline_code=airline_code, policy_type=policy_type)
+                session.add(digest)
+            digest.digest_text = text
+            digest.source_version = version
+            digest.source_count = count
+            digest.generator = generator
+            digest.generated_at = datetime.utcnow()
+            stats["regenerated"] += 1
+
+        for orphan in existing.values(): # Groups whose policies were all deleted
+            session.delete(orphan)
+            stats["removed"] += 1
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        log.exception("Policy digest refresh failed: %s", e)
+        raise
+    finally:
+        session.close()
+    log.info("Policy digests refreshed", extra=stats)
+    return stats
+
+
+def get_policy_digest(airline_code: str, policy_type: str) -> str | None:
+    """The stored digest for exactly this airline/type, or None (caller falls back to RAG)."""
+    session = SessionLocal()
+    try:
+        with span("db.policy_digest"):
+            row = session.query(PolicyDigest.digest_text).filter(
+                PolicyDigest.airline_code == airline_code, PolicyDigest.policy_type == policy_type
+            ).first()
+        return row[0] if row else None
+    except Exception as e: # e.g. table not created yet
+        log.debug("Policy digest lookup failed for %s/%s: %s", airline_code, policy_type, e)
+        return None
+    finally:
+        session.close()
+
+
+def start_refresh_thread(interval_s: float = POLICY_DIGEST_REFRESH_S) -> threading.Thread | None:
+    """Refreshes now and then every `interval_s` seconds in a daemon thread (None if disabled)."""
+    if interval_s <= 0:
+        return None
+
+    def loop():
+        while True:
+            try:
+                refresh_digests()
+            except Exception:
+                pass # Already logged; keep serving existing digests and retry next interval
+            time.sleep(interval_s)
+
+    thread = threading.Thread(target=loop, name="policy-digest-refresh", daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Precompute policy answer digests")
+    parser.add_argument("--force", action="store_true", help="Regenerate every digest, changed or not")
+    args = parser.parse_args(argv)
+    stats = refresh_digests(force=args.force)
+    print(f"[Digests] {stats}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
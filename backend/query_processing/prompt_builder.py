@@ -0,0 +1,91 @@
+# backend/query_processing/prompt_builder.py
+"""
+Compact LLM prompts and prompt-size accounting.
+
+Flight-info prompts carry only the normalized fields relevant to the user's
+question, as `key:value` lines. The raw AviationStack record (flight_info["raw"])
+is never included: fields are taken from an allow-list, not copied from the dict.
+
+Token counts are a local estimate (no tokenizer download or network call): words
+are split like a BPE tokenizer roughly would, about 4 characters per token for
+long words, 1 token per punctuation mark. Every prompt sent through
+generate_llm_response is recorded per call site in a Prometheus histogram.
+"""
+import math
+import re
+from typing import Dict, List
+
+from backend.query_processing.templates import FLIGHT_DETAILS
+from backend.utils.metrics import histogram
+
+PROMPT_TOKENS = histogram(
+    "trip_assistant_llm_prompt_tokens",
+    "Estimated prompt size in tokens per LLM call site.",
+    ("call_site",),
+    buckets=(16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192),
+)
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text: str) -> int:
+    """Local token estimate: ceil(len/4) per word piece, 1 per punctuation character."""
+    return sum(math.ceil(len(piece) / 4) if piece[0].isalnum() or piece[0] == "_" else 1
+               for piece in _TOKEN_RE.findall(text))
+
+
+def record_prompt(call_site: str, prompt: str) -> int:
+    """Counts and records the prompt's size for `call_site`; returns the token estimate."""
+    tokens = count_tokens(prompt)
+    PROMPT_TOKENS.observe(tokens, call_site)
+    return tokens
+
+
+# Always sent: identifies the flight and its overall state
+BASE_FIELDS = ("flight_number", "airline", "status")
+
+# Question keywords -> the extra normalized fields that answer them: the details the
+# templates answer (templates.FLIGHT_DETAILS), plus wordings only the LLM handles
+QUESTION_FIELDS = tuple((pattern, fields) for _, pattern, fields in FLIGHT_DETAILS) + (
+    (re.compile(r"\b(schedule\w*|when)\b"), ("departure_scheduled", "departure_estimated", "arrival_scheduled", "arrival_estimated")),
+    (re.compile(r"\b(where|from|route|airport)\b"), ("departure_airport", "arrival_airport")),
+)
+
+# Generic questions ("status of AI202") get the route and times, but no gates/terminals
+DEFAULT_FIELDS = ("departure_airport", "arrival_airport", "departure_scheduled", "arrival_scheduled")
+
+
+def select_flight_fields(flight_info: dict, question: str) -> Dict[str, str]:
+    """Allow-listed, non-empty fields relevant to `question`, in a stable order."""
+    q_lower = question.lower()
+    wanted: List[str] = list(BASE_FIELDS)
+    matched = False
+    for pattern, fields in QUESTION_FIELDS:
+        if pattern.search(q_lower):
+            matched = True
+            wanted.extend(f for f in fields if f not in wanted)
+    if not matched:
+        wanted.extend(DEFAULT_FIELDS)
+    return {f: str(flight_info[f]) for f in wanted if flight_info.get(f) not in (None, "")}
+
+
+def format_fields(fields: Dict[str, str]) -> str:
+    return "\n".join(f"{k}:{v}" for k, v in fields.items())
+
+
+def build_flight_info_prompt(flight_info: dict, question: str) -> str:
+    return (
+        f"You are an airline assistant. A user asked: '{question}'\n"
+        f"Flight data:\n{format_fields(select_flight_fields(flight_info, question))}\n"
+        "Answer the user's specific question using only this data (e.g. only the arrival time if they ask for it). "
+        "If the data lacks the detail they asked for, say you have the flight status but not that detail."
+    )
+
+
+def build_data_prompt(question: str, data: str) -> str:
+    """Prompt for answers over already compact data (seat counts, route listings)."""
+    return (
+        f"You are an airline assistant. A user asked: '{question}'\n"
+        f"Data:\n{data}\n"
+        "Answer briefly using only this data. If it doesn't contain the answer, say so."
+    )
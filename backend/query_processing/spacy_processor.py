@@ -1,15 +1,45 @@
 # backend/query_processing/spacy_processor.py
 import re
+import time
 import spacy
-from typing import Dict, List, Optional # Added typing imports
+from typing import Dict, List, Mapping, Optional # Added typing imports
+from backend.utils.cache import LRUCache, freeze
+from backend.utils.config import ENTITY_CACHE_SIZE
+from backend.query_processing.gazetteer import (
+    after_role_word, airport_code, code_kind, reads_as_code, resolve_mentions,
+)
+from backend.utils.logger import get_logger
+from backend.utils.memory_diagnostics import register_component
+from backend.utils.metrics import counter, histogram
+
+log = get_logger(__name__)
+
+# Only NER is used below, so the tagger/parser/lemmatizer stages are never loaded
+UNUSED_PIPES = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter", "morphologizer"]
+
+
+def load_ner_pipeline(model: str = "en_core_web_sm"):
+    """Loads `model` with only the components NER needs."""
+    pipeline = spacy.load(model, exclude=UNUSED_PIPES)
+    # The shared tok2vec only matters if NER listens to it (in some models NER embeds its own)
+    if "tok2vec" in pipeline.pipe_names and "ner" not in pipeline.get_pipe("tok2vec").listening_components:
+        pipeline.disable_pipe("tok2vec")
+    return pipeline
+
 
 # Load spacy model
 try:
-    nlp = spacy.load("en_core_web_sm")
+    nlp = load_ner_pipeline()
+    log.info("Loaded spaCy pipeline components: %s", nlp.pipe_names)
 except OSError:
-    print("Spacy model 'en_core_web_sm' not found. Run 'python -m spacy download en_core_web_sm'")
+    log.warning("Spacy model 'en_core_web_sm' not found. Run 'python -m spacy download en_core_web_sm'")
     nlp = spacy.blank("en")
 
+# The vocab and string store grow with every new token seen and are never pruned
+register_component("spacy_nlp", lambda: {
+    "pipes": nlp.pipe_names, "lexemes": len(nlp.vocab), "strings": len(nlp.vocab.strings),
+})
+
 
 # Updated regex to be more flexible:
 # Handles 2-3 letters (e.g., AI, DAL)
@@ -17,17 +47,65 @@ except OSError:
 # Handles 2-4 digits (e.g., 92, 202, 1070)
 FLIGHT_RE = re.compile(r"\b([A-Z]{2,3})\s?(\d{2,4})\b")
 
+# IATA code regex (e.g., "from DEL to BOM")
+IATA_RE = re.compile(r"\b(from|to|flying from|flying to)\s+([A-Z]{3})\b", re.IGNORECASE) # Added IGNORECASE and more phrases
 
-def extract_entities_and_keywords(text: str) -> Dict[str, Optional[str | List[str]]]:
-    """
-    Extracts flight numbers, locations, dates, keywords, and provides an intent hint.
+KEYWORDS = frozenset({
+    "status", "arrival", "depart", "departure", "eta", "delay", "gate", "terminal",
+    "schedule", "on time", "cancel", "book", "pnr", "seat", "seats", # Added plural 'seats'
+    "baggage", "refund", "policy", "pet", "animal", "check-in", "check in",
+    "available", "availability", "how many", "empty", "vacant", # Added seat availability keywords
+    "search", "find", "look for", "flights" # Added search keywords
+})
 
-    Returns:
-      Dict with keys like "flight_number", "airline_code", "flight_digits",
-      "locations", "dates", "keywords", "intent_hint".
-    """
+# One alternation for all keywords, scanned in a single pass over the lowered text.
+# Longest first so e.g. "departure" wins over "depart" at the same position.
+KEYWORD_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(kw) for kw in sorted(KEYWORDS, key=len, reverse=True)) + r")\b"
+)
+
+
+# Intents whose handling needs free-text locations (or dates) that only NER can find.
+# Every other intent is fully decided by the regex/keyword rules, so NER is skipped.
+# Known airports come from the gazetteer, so NER only runs when it found none.
+NER_INTENTS = frozenset({"search_flights_by_route", "unknown"})
+
+EXTRACTION_TIER = counter(
+    "trip_assistant_extraction_tier_total",
+    "Entity extractions by the tier that decided the intent (rules or ner).",
+    ("tier",),
+)
+NER_SECONDS_SAVED = counter(
+    "trip_assistant_ner_seconds_saved_total",
+    "Estimated spaCy NER time avoided by deciding on rules alone (running mean NER time per skip).",
+)
+NER_LATENCY = histogram(
+    "trip_assistant_ner_seconds",
+    "spaCy NER pass time per extraction that needed it.",
+)
+
+
+def extraction_tier_stats() -> Dict[str, float]:
+    """Counts per deciding tier plus the estimated NER time saved, for diagnostics/benchmarks."""
+    return {
+        "rules": EXTRACTION_TIER.value("rules"),
+        "ner": EXTRACTION_TIER.value("ner"),
+        "ner_mean_ms": 1000.0 * NER_LATENCY.mean(),
+        "ner_seconds_saved": NER_SECONDS_SAVED.value(),
+    }
+
+
+def _dedupe(values: List[str]) -> List[str]:
+    """Removes duplicates preserving order."""
+    seen = set()
+    return [v for v in values if not (v in seen or seen.add(v))]
+
+
+def _apply_ner(text: str, entities: Dict[str, Optional[str | List[str]]]) -> None:
+    """Runs the spaCy pass and merges GPE/LOC, DATE/TIME and ORG entities into `entities`."""
+    start = time.perf_counter()
     doc = nlp(text)
-    entities: Dict[str, Optional[str | List[str]]] = {"keywords": []}
+    NER_LATENCY.observe(time.perf_counter() - start)
 
     # Named entities
     locations: List[str] = []
@@ -49,96 +127,198 @@ def extract_entities_and_keywords(text: str) -> Dict[str, Optional[str | List[st
             # Basic filtering for potential airlines if needed
             orgs.append(ent.text)
 
-    # IATA code regex (e.g., "from DEL to BOM")
-    iata_re = re.compile(r"\b(from|to|flying from|flying to)\s+([A-Z]{3})\b", re.IGNORECASE) # Added IGNORECASE and more phrases
-    for match in iata_re.finditer(text): # Use text directly
-        locations.append(match.group(2).upper()) # Ensure uppercase
-
+    # NER locations go first, as they did before rules-first extraction
+    locations = _dedupe(locations + entities.get("locations", []))
     if locations:
-        # Remove duplicates preserving order (roughly)
-        seen_loc = set()
-        entities["locations"] = [loc for loc in locations if not (loc in seen_loc or seen_loc.add(loc))]
-
+        entities["locations"] = locations
     if dates:
         entities["dates"] = dates
     if orgs:
         entities["orgs"] = orgs # Store detected organizations
 
-    # Flight number via regex (most reliable)
-    m = FLIGHT_RE.search(text.upper())
-    if m:
-        entities["flight_number"] = f"{m.group(1)}{m.group(2)}"
-        entities["airline_code"] = m.group(1)
-        entities["flight_digits"] = m.group(2)
-
-    # Keywords detection
-    keyword_set = {
-        "status", "arrival", "depart", "departure", "eta", "delay", "gate", "terminal",
-        "schedule", "on time", "cancel", "book", "pnr", "seat", "seats", # Added plural 'seats'
-        "baggage", "refund", "policy", "pet", "animal", "check-in", "check in",
-        "available", "availability", "how many", "empty", "vacant", # Added seat availability keywords
-        "search", "find", "look for", "flights" # Added search keywords
-    }
-    text_lower = text.lower()
-    detected_keywords: List[str] = [] # Start fresh list for keywords
-
-    for kw in keyword_set:
-        # Use regex word boundaries for more precise matching
-        if re.search(r'\b' + re.escape(kw) + r'\b', text_lower):
-            detected_keywords.append(kw)
 
-    # Simple deduplication
-    entities["keywords"] = sorted(list(set(detected_keywords)))
-
-    # --- Intent Hint Logic (Order matters - more specific first) ---
-    keywords = entities.get("keywords", []) # Get the final list
+def _infer_intent(entities: Dict[str, Optional[str | List[str]]], text_lower: str) -> str:
+    """Intent hint from keywords, flight number and locations (order matters - more specific first)."""
+    keywords = entities.get("keywords", [])
+    locations = entities.get("locations", [])
+    intent = None
 
     # Check seat availability intent
     if any(k in keywords for k in ("seat", "seats")) and \
        any(k in keywords for k in ("available", "availability", "empty", "vacant", "how many")) and \
        "book" not in keywords:
-         entities["intent_hint"] = "check_seat_availability"
+         intent = "check_seat_availability"
     # Check flight status/info intent (keywords + potentially flight number)
     elif entities.get("flight_number") and \
          any(k in keywords for k in ("status", "arrival", "departure", "eta", "delay", "gate", "terminal", "schedule", "on time")):
-        entities["intent_hint"] = "api_flight_info"
+        intent = "api_flight_info"
     # Check cancellation intent
     elif "cancel" in keywords and "book" not in keywords and "policy" not in keywords: # Avoid conflict with policy
-        entities["intent_hint"] = "cancel_booking"
+        intent = "cancel_booking"
     # Check booking intent
     elif "book" in keywords:
-        entities["intent_hint"] = "create_booking"
+        intent = "create_booking"
     # Check flight search intent (based on locations and search keywords)
     # Require at least two locations OR one location and search keywords
-    elif (len(entities.get("locations", [])) >= 2 or \
-          (len(entities.get("locations", [])) >= 1 and any(k in keywords for k in ("search", "find", "look for", "flights")))):
-         entities["intent_hint"] = "search_flights_by_route"
+    elif (len(locations) >= 2 or \
+          (len(locations) >= 1 and any(k in keywords for k in ("search", "find", "look for", "flights")))):
+         intent = "search_flights_by_route"
     # Check policy intent (RAG)
     elif any(k in keywords for k in ("policy", "baggage", "refund", "pet", "animal", "check-in", "check in")) or "policy" in text_lower:
          # Refine policy check to avoid triggering on general words like 'check'
          if any(k in keywords for k in ("baggage", "refund", "pet", "animal", "check-in", "check in", "policy", "cancel")) or "policy" in text_lower:
-              entities["intent_hint"] = "rag_policy"
+              intent = "rag_policy"
          else: # Fallback if only ambiguous keywords like 'check' were found without policy context
-              entities["intent_hint"] = "unknown"
+              intent = "unknown"
     # Fallback check for flight status if only flight number and maybe generic words are present
-    elif entities.get("flight_number") and not entities["intent_hint"]: # Check if intent hasn't been set yet
-         entities["intent_hint"] = "api_flight_info"
+    elif entities.get("flight_number"):
+         intent = "api_flight_info"
     # Default/Fallback intent
     else:
-         if not entities.get("intent_hint"): # Only set unknown if nothing else matched
-            entities["intent_hint"] = "unknown"
+         intent = "unknown"
 
     # Post-processing: If locations detected but no search intent, maybe ask clarification?
     # Example: User says "flights to DEL" - locations=['DEL'], keywords=[] -> intent='unknown'
-    if entities["intent_hint"] == "unknown" and entities.get("locations"):
+    if intent == "unknown" and locations:
          # More robust check: if they mention 'flights' and have a location, likely a search
          if 'flights' in keywords:
-              entities["intent_hint"] = "search_flights_by_route"
+              intent = "search_flights_by_route"
          # Could optionally add logic here to ask "Are you trying to search for flights?"
-         pass # Keep it simple for now
+    return intent
+
+
+def extract_entities_uncached(text: str) -> Dict[str, Optional[str | List[str]]]:
+    """
+    Extracts flight numbers, locations, dates, keywords, and provides an intent hint.
+
+    Tiered: the cheap regex/keyword rules run first and decide the intent. The spaCy
+    NER pass only runs when that intent needs free-text locations (see NER_INTENTS)
+    and the rules found none; the intent is then re-derived with NER's entities.
+
+    Returns:
+      Dict with keys like "flight_number", "airline_code", "flight_digits",
+      "locations", "airlines", "dates", "keywords", "intent_hint".
+    """
+    entities = extract_rule_entities(text)
+    if needs_ner(entities):
+        return add_ner_entities(text, entities)
+    _count_rules_tier()
+    return entities
+
+
+def needs_ner(entities: Mapping) -> bool:
+    return entities["intent_hint"] in NER_INTENTS and not entities.get("locations")
+
+
+def _count_rules_tier() -> None:
+    EXTRACTION_TIER.inc("rules")
+    ner_mean_s = NER_LATENCY.mean()
+    if ner_mean_s:
+        NER_SECONDS_SAVED.inc(amount=ner_mean_s)
+
+
+def add_ner_entities(text: str, entities: Dict[str, Optional[str | List[str]]]) -> Dict[str, Optional[str | List[str]]]:
+    """The NER tier: merges spaCy's entities into the rules' and re-derives the intent."""
+    _apply_ner(text, entities)
+    entities["intent_hint"] = _infer_intent(entities, text.lower())
+    EXTRACTION_TIER.inc("ner")
+    return entities
+
+
+def extract_rule_entities(text: str) -> Dict[str, Optional[str | List[str]]]:
+    """The rules tier: gazetteer, regexes and keywords, with the intent they decide."""
+    entities: Dict[str, Optional[str | List[str]]] = {"keywords": []}
+
+    # Airports (names, cities, codes) and airline names from the gazetteer, in one pass
+    mentions = resolve_mentions(text)
+    # Plus codes after from/to that the gazetteer doesn't know (e.g., "from DEL to XYZ"): only
+    # ones written as a code, in uppercase, so words like "to fly" or "from Goa" are not airports
+    locations = mentions.airports + [code for code in (match.group(2) for match in IATA_RE.finditer(text))
+                                     if code.isupper() and airport_code(code) is None]
+    if locations:
+        entities["locations"] = _dedupe(locations)
+    if mentions.airlines:
+        entities["airlines"] = mentions.airlines
+
+    # Flight number via regex (most reliable)
+    m = FLIGHT_RE.search(text.upper())
+    if m:
+        entities["flight_number"] = f"{m.group(1)}{m.group(2)}"
+        entities["airline_code"] = m.group(1)
+        entities["flight_digits"] = m.group(2)
+        # "EK202" names its airline too, however the number was spaced
+        if code_kind(m.group(1)) == "airline" and m.group(1) not in entities.get("airlines", []):
+            entities["airlines"] = [*entities.get("airlines", []), m.group(1)]
+
+    # Keywords detection (word-boundary matches, deduplicated and sorted)
+    text_lower = text.lower()
+    entities["keywords"] = sorted({m.group(0) for m in KEYWORD_RE.finditer(text_lower)})
+    entities["intent_hint"] = _infer_intent(entities, text_lower)
 
     # Debug print (optional)
-    # print(f"[SpaCy Processor] Text: '{text}' -> Entities: {entities}")
+    # log.debug("Text: '%s' -> Entities: %s", text, entities)
 
     return entities
 
+
+# Memoization for repeated queries (quick-action buttons, canned prompts)
+_entity_cache = LRUCache("entities", ENTITY_CACHE_SIZE)
+_SPACE_RE = re.compile(r"\s+")
+_FLIGHT_KEY_RE = re.compile(r"\b([A-Za-z]{2,3}) ?(\d{2,4})\b")
+_WORD_RE = re.compile(r"\b[A-Za-z]+\b")
+
+
+def canonical_query(text: str) -> str:
+    """
+    Cache key, and the text the rules tier runs on: whitespace collapsed, flight numbers
+    joined and uppercased ("ai 202" -> "AI202"), codes kept uppercase where the gazetteer
+    reads them as codes (written so, or right after from/to: "from del"), other words
+    lowercased. The rules read the same entities from it as from the query as typed.
+    """
+    spaced = _SPACE_RE.sub(" ", text).strip()
+    # Not airport codes: "BOM 15 May" is an airport and a date
+    spaced = _FLIGHT_KEY_RE.sub(
+        lambda m: m.group(0) if code_kind(m.group(1)) == "airport" else (m.group(1) + m.group(2)).upper(), spaced,
+    )
+
+    def fold(m: re.Match) -> str:
+        word = m.group(0)
+        before = spaced[:m.start()]
+        if code_kind(word) and reads_as_code(word, before):
+            return word.upper()
+        if len(word) == 3 and word.isupper() and after_role_word(before):
+            return word # Unknown code after from/to (IATA_RE), e.g. "from DEL to XYZ"
+        return word.lower()
+
+    return _WORD_RE.sub(fold, spaced)
+
+
+def _rules_for_cache(key: str) -> Mapping:
+    entities = extract_rule_entities(key)
+    if not needs_ner(entities):
+        _count_rules_tier()
+    return freeze(entities)
+
+
+def extract_entities_and_keywords(text: str) -> Mapping[str, Optional[str | tuple]]:
+    """
+    Memoized extract_entities_uncached. The rules tier runs on canonical_query(text) and
+    is cached under it, so "AI 202", "ai202" and "ai 202" share one entry. NER reads
+    case ("Springfield" vs "springfield"), so when it is needed its result is cached
+    under the query as typed (whitespace collapsed).
+
+    Results are frozen (read-only mapping, tuples instead of lists) because the same
+    object is handed to every caller with an equivalent query.
+    """
+    key = canonical_query(text)
+    rules = _entity_cache.get_or_compute(key, lambda: _rules_for_cache(key))
+    if not needs_ner(rules):
+        return rules
+    typed = _SPACE_RE.sub(" ", text).strip()
+    return _entity_cache.get_or_compute(("ner", typed), lambda: freeze(add_ner_entities(
+        typed, {k: list(v) if isinstance(v, tuple) else v for k, v in rules.items()},
+    )))
+
+
+def entity_cache_stats() -> Dict[str, float]:
+    return _entity_cache.stats()
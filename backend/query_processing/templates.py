@@ -0,0 +1,142 @@
+# backend/query_processing/templates.py
+"""
+Deterministic answer templates for flight info, seat availability and route search.
+
+Used directly when a template fully answers the question (see answer_router.py)
+and as the fallback whenever the LLM is unavailable or fails.
+"""
+import re
+from typing import List, Optional, Tuple
+
+
+def _hhmm(timestamp) -> str:
+    """'2025-01-01T10:05:00+00:00' -> '10:05'; 'N/A' for anything else."""
+    if isinstance(timestamp, str) and "T" in timestamp:
+        return timestamp.split("T")[-1].split("+")[0][:5]
+    return "N/A"
+
+
+# Flight details a question can ask for: (detail, question pattern, normalized fields that
+# answer it). Shared with prompt_builder, which sends the LLM the fields of the details asked.
+FLIGHT_DETAILS: Tuple[Tuple[str, "re.Pattern[str]", Tuple[str, ...]], ...] = (
+    ("gate", re.compile(r"\bgates?\b"), ("departure_gate", "arrival_gate")),
+    ("terminal", re.compile(r"\bterminals?\b"), ("departure_terminal", "arrival_terminal")),
+    ("arrival", re.compile(r"\b(arriv\w*|eta|land\w*|get(s|ting)? in|reach\w*|touch(es)? down)\b"),
+     ("arrival_airport", "arrival_scheduled", "arrival_estimated")),
+    ("departure", re.compile(r"\b(depart\w*|leav\w*|left|tak(e|es|ing) ?off|takeoff|board\w*)\b"),
+     ("departure_airport", "departure_scheduled", "departure_estimated")),
+    ("status", re.compile(r"\b(status|on time|delay\w*|late|cancel\w*)\b"),
+     ("departure_scheduled", "departure_estimated", "arrival_scheduled", "arrival_estimated")),
+)
+
+
+def asked_details(question: str) -> List[str]:
+    """The FLIGHT_DETAILS names `question` asks about, in table order."""
+    q_lower = question.lower()
+    return [detail for detail, pattern, _ in FLIGHT_DETAILS if pattern.search(q_lower)]
+
+
+def flight_info_template(flight_info: dict, user_question: str = "") -> str:
+    """Answers arrival/departure/gate/terminal/status questions; a status summary for anything else."""
+    return matched_flight_info_template(flight_info, user_question) or _flight_summary(flight_info)
+
+
+def matched_flight_info_template(flight_info: dict, user_question: str) -> Optional[str]:
+    """
+    The template answer when it covers the detail the question asks for (including
+    "I don't have gate information" when the data lacks it); None when the question
+    asks for none of them, or for a time the data doesn't have.
+    """
+    if not flight_info:
+        return "I couldn't find any live information for that flight right now."
+
+    fn = flight_info.get("flight_number")
+    details = asked_details(user_question)
+
+    # Gate/terminal before times, since "which terminal does it arrive at" also mentions arriving
+    missing = None # Asked-for detail the data doesn't have
+    if "gate" in details:
+        arr_gate = flight_info.get("arrival_gate")
+        dep_gate = flight_info.get("departure_gate")
+        if arr_gate:
+            return f"Flight {fn} is scheduled to arrive at gate {arr_gate}."
+        if dep_gate:
+            return f"Flight {fn} is scheduled to depart from gate {dep_gate}."
+        missing = "gate"
+
+    if "terminal" in details:
+        arr_terminal = flight_info.get("arrival_terminal")
+        dep_terminal = flight_info.get("departure_terminal")
+        if arr_terminal:
+            return f"Flight {fn} is scheduled to arrive at terminal {arr_terminal}."
+        if dep_terminal:
+            return f"Flight {fn} is scheduled to depart from terminal {dep_terminal}."
+        missing = "terminal"
+
+    if not missing and "arrival" in details:
+        arr_time = flight_info.get("arrival_estimated") or flight_info.get("arrival_scheduled")
+        if arr_time:
+            return f"The estimated arrival time for {fn} is {arr_time}."
+        return None # No time to give: the LLM can say so from the rest of the data
+
+    if not missing and "departure" in details:
+        dep_time = flight_info.get("departure_estimated") or flight_info.get("departure_scheduled")
+        if dep_time:
+            return f"The estimated departure time for {fn} is {dep_time}."
+        return None
+
+    if missing or "status" in details:
+        return _flight_summary(flight_info, missing)
+    return None
+
+
+def _flight_summary(flight_info: dict, missing: Optional[str] = None) -> str:
+    """Status and route, plus a note on the asked-for detail the data doesn't have."""
+    fn = flight_info.get("flight_number")
+    airline = flight_info.get("airline", "")
+    status = flight_info.get("status", "Unknown")
+    template = [f"Flight {fn} ({airline}) is currently *{status}*."]
+    dep = flight_info.get("departure_airport")
+    arr = flight_info.get("arrival_airport")
+
+    if dep and arr:
+        template.append(f"It is flying from {dep} to {arr}.")
+    if missing:
+        template.append(f"I don't have {missing} information for it yet.")
+
+    return " ".join(template)
+
+
+def seat_availability_template(flight_number: str, available: int, total: int) -> str:
+    if total == 0:
+        return f"It seems flight {flight_number} doesn't have any seats listed in our system."
+    if available == 0:
+        return f"Flight {flight_number} currently has no available seats listed in our mock database ({total} total seats)."
+    if available == 1:
+        return f"Flight {flight_number} currently has only 1 available seat out of {total} total seats listed in our mock database."
+    return f"Flight {flight_number} currently has {available} available seats out of {total} total seats listed in our mock database."
+
+
+def route_search_template(source_code: str, dest_code: str, flights_data: List[dict] | None, live: bool = True) -> str:
+    """
+    Lists flights for a route; flights_data None means the API call failed. live=False: the
+    flights come from our own schedule because there was no time left for the live API.
+    """
+    if flights_data is None:
+        return "Sorry, I encountered an error trying to search for flights using the live API. Please try again later."
+    if not live:
+        if not flights_data:
+            return f"Live flight data isn't available right now, and our schedule has no upcoming flights from {source_code} to {dest_code}."
+        response_lines = [f"Live flight data isn't available right now. From our schedule, {len(flights_data)} upcoming flight(s) from {source_code} to {dest_code}:"]
+    elif not flights_data:
+        return f"Sorry, I couldn't find any live flights listed from {source_code} to {dest_code} for today in the API."
+    else:
+        response_lines = [f"Okay, I found {len(flights_data)} live flight(s) from {source_code} to {dest_code} for today via the API:"]
+    for flight in flights_data:
+        dep_time = _hhmm(flight.get('departure_scheduled', 'N/A'))
+        arr_time = _hhmm(flight.get('arrival_scheduled', 'N/A'))
+        fn = flight.get('flight_number', 'N/A')
+        airline = flight.get('airline', 'Unknown Airline')
+        status = flight.get('status', 'Unknown')
+        response_lines.append(f"• {fn} ({airline}): Departs: {dep_time}, Arrives: {arr_time} (Status: {status})")
+    return "\n".join(response_lines)
@@ -0,0 +1,25 @@
+# backend/routers/admin_router.py
+"""
+Admin diagnostics, mounted only when MEMORY_DIAGNOSTICS=1 (see main.py).
+
+GET /admin/memory: top allocation sites (tracemalloc, diffed against the baseline
+taken at startup or the previous snapshot), per-component sizes and live object
+counts of the worker that answers. Building the report walks the heap, so it takes
+from milliseconds to seconds; the handler is sync and runs in the threadpool.
+"""
+from fastapi import APIRouter, Query
+
+from backend.utils.memory_diagnostics import memory_report
+
+admin_router = APIRouter(prefix="/admin", tags=["admin"], include_in_schema=False)
+
+
+@admin_router.get("/memory")
+def memory(
+    limit: int = Query(25, ge=1, le=500, description="Allocation sites and object types to return"),
+    group_by: str = Query("backend", pattern="^(backend|lineno|filename)$",
+                          description="backend = innermost backend/ frame of each allocation"),
+    compare: str = Query("baseline", pattern="^(baseline|previous|none)$"),
+    objects: bool = Query(True, description="Count live objects per type"),
+):
+    return memory_report(limit, group_by, compare, objects)
@@ -0,0 +1,123 @@
+# backend/routers/data_router.py
+"""
+Read API for ops tooling: flights, bookings, seats and policies, plus booking
+candidates (bookable flights on a route with their free seats per class).
+
+Every endpoint pages by primary key (`after` = the previous page's next_cursor),
+projects to `fields` (any subset of the resource's response schema) and filters on
+indexed columns only. Pages are read with Core selects and returned as plain JSON
+(see DB/pagination.py); the schemas in schemas.py define the fields and the docs.
+"""
+from datetime import datetime
+from typing import Dict, Optional, Type
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from backend.DB.database import SessionLocal
+from backend.DB.mockdb_utils import find_booking_candidates
+from backend.DB.models import Booking, Flight, Policy, Seat
+from backend.DB.pagination import keyset_page
+from backend.schemas import BookingCandidate, BookingResponse, FlightResponse, Page, PolicyResponse, SeatResponse
+
+data_router = APIRouter(prefix="/api", tags=["data"])
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_CANDIDATES_PAGE_SIZE = 100 # Each candidate carries its seat classes
+
+_FIELDS_HELP = "Comma-separated fields to return (default: all fields of the schema)"
+_AFTER_HELP = "next_cursor of the previous page"
+
+
+def _page(model, schema: Type[BaseModel], fields: Optional[str], filters: Dict[str, object],
+          after: Optional[str], limit: int) -> ORJSONResponse:
+    allowed = list(schema.model_fields)
+    selected = [f.strip() for f in fields.split(",") if f.strip()] if fields else allowed
+    unknown = [f for f in selected if f not in allowed]
+    if unknown:
+        raise HTTPException(400, f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    table = model.__table__
+    key = table.primary_key.columns.keys()[0]
+    filters = {col: value for col, value in filters.items() if value is not None}
+    db = SessionLocal()
+    try:
+        items, next_cursor = keyset_page(db, table, key, selected, filters, after, limit)
+    except ValueError:
+        raise HTTPException(400, f"Invalid cursor: {after}")
+    finally:
+        db.close()
+    return ORJSONResponse({"items": items, "next_cursor": next_cursor})
+
+
+@data_router.get("/flights", responses={200: {"model": Page[FlightResponse]}})
+def list_flights(
+    source: Optional[str] = Query(None, description="Source airport code, e.g. DEL"),
+    destination: Optional[str] = Query(None, description="Destination airport code, e.g. BOM"),
+    flight_number: Optional[str] = None,
+    status: Optional[str] = Query(None, description="current_status, e.g. Delayed"),
+    fields: Optional[str] = Query(None, description=_FIELDS_HELP),
+    after: Optional[str] = Query(None, description=_AFTER_HELP),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    return _page(Flight, FlightResponse, fields, {
+        "source_airport_code": source.upper() if source else None,
+        "destination_airport_code": destination.upper() if destination else None,
+        "flight_number": flight_number.upper() if flight_number else None,
+        "current_status": status,
+    }, after, limit)
+
+
+@data_router.get("/bookings", responses={200: {"model": Page[BookingResponse]}})
+def list_bookings(
+    customer_id: Optional[int] = None,
+    flight_id: Optional[int] = None,
+    status: Optional[str] = Query(None, description="booking_status, e.g. Confirmed"),
+    fields: Optional[str] = Query(None, description=_FIELDS_HELP),
+    after: Optional[str] = Query(None, description=_AFTER_HELP),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    return _page(Booking, BookingResponse, fields,
+                 {"customer_id": customer_id, "flight_id": flight_id, "booking_status": status}, after, limit)
+
+
+@data_router.get("/seats", responses={200: {"model": Page[SeatResponse]}})
+def list_seats(
+    flight_id: Optional[int] = None,
+    is_booked: Optional[bool] = None,
+    fields: Optional[str] = Query(None, description=_FIELDS_HELP),
+    after: Optional[str] = Query(None, description=_AFTER_HELP),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    return _page(Seat, SeatResponse, fields, {"flight_id": flight_id, "is_booked": is_booked}, after, limit)
+
+
+@data_router.get("/policies", responses={200: {"model": Page[PolicyResponse]}})
+def list_policies(
+    airline_code: Optional[str] = None,
+    policy_type: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=_FIELDS_HELP),
+    after: Optional[str] = Query(None, description=_AFTER_HELP),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    return _page(Policy, PolicyResponse, fields,
+                 {"airline_code": airline_code.upper() if airline_code else None, "policy_type": policy_type},
+                 after, limit)
+
+
+@data_router.get("/booking-candidates", responses={200: {"model": Page[BookingCandidate]}})
+def list_booking_candidates(
+    source: str = Query(..., description="Source airport code, e.g. DEL"),
+    destination: str = Query(..., description="Destination airport code, e.g. BOM"),
+    depart_after: Optional[datetime] = Query(None, description="Earliest scheduled departure (inclusive)"),
+    depart_before: Optional[datetime] = Query(None, description="Latest scheduled departure (exclusive)"),
+    after: Optional[str] = Query(None, description=_AFTER_HELP),
+    limit: int = Query(10, ge=1, le=MAX_CANDIDATES_PAGE_SIZE),
+):
+    """Bookable flights with free seats, earliest first, with free seats and the cheapest seat per class."""
+    try:
+        items, next_cursor = find_booking_candidates(source, destination, depart_after, depart_before, limit, after)
+    except ValueError:
+        raise HTTPException(400, f"Invalid cursor: {after}")
+    return ORJSONResponse({"items": items, "next_cursor": next_cursor})
@@ -1,7 +1,7 @@
 # schemas.py
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Generic, List, Optional, TypeVar
 
 class CustomerBase(BaseModel):
     name: str
@@ -12,7 +12,7 @@ class CustomerResponse(CustomerBase):
     customer_id: int
     created_at: datetime
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class FlightBase(BaseModel):
@@ -27,7 +27,7 @@ class FlightBase(BaseModel):
 class FlightResponse(FlightBase):
     flight_id: int
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class BookingBase(BaseModel):
@@ -42,7 +42,7 @@ class BookingBase(BaseModel):
 class BookingResponse(BookingBase):
     booking_date: datetime
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class PolicyBase(BaseModel):
@@ -54,4 +54,49 @@ class PolicyResponse(PolicyBase):
     policy_id: int
     last_updated: datetime
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+
+class SeatBase(BaseModel):
+    flight_id: int
+    row_number: int
+    column_letter: str
+    seat_class: str
+    price: float
+    is_booked: bool
+
+class SeatResponse(SeatBase):
+    seat_id: int
+    class Config:
+        from_attributes = True
+
+
+class SeatClassOffer(BaseModel):
+    seat_class: str
+    free_seats: int
+    cheapest_seat: str = Field(..., description="Cheapest free seat of the class, e.g. 12A")
+    price: float
+
+class BookingCandidate(FlightResponse):
+    free_seats: int
+    classes: List[SeatClassOffer] = Field(..., description="Per seat_class, cheapest first")
+
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    """One keyset page of a read endpoint; pass next_cursor as `after` for the next one."""
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+class QueryRequest(BaseModel):
+    query: str = Field(..., min_length=1, description="The user's message, e.g. 'What is the status of flight AI202?'")
+    user_id: str = Field("default_user", description="Conversation key: reuse it to continue a multi-turn flow")
+    request_id: Optional[str] = Field(None, description="Echoed back, for client-side correlation")
+    deadline: Optional[float] = Field(None, gt=0, description="Seconds the client will wait for the answer (default REQUEST_DEADLINE_S)")
+
+class QueryResponse(BaseModel):
+    response: str
+    user_id: str
+    request_id: Optional[str] = None
@@ -0,0 +1,161 @@
+# backend/server.py
+"""
+Production entry point: load the heavy read-only resources once, then fork workers.
+
+`uvicorn backend.main:app --workers N` starts N fresh interpreters, and each one
+imports the app and loads its own spaCy pipeline, gazetteer automaton, intent
+classifier and (if selected) local LLM weights. Here the master does that once:
+
+  1. gc.disable(), import backend.main and warm every heavy resource (preload())
+  2. gc.freeze(): move everything loaded so far to the permanent generation, so a
+     collection in a worker never writes to those objects' GC headers (which would
+     copy their pages into the worker)
+  3. bind the listening socket, fork N workers; each re-enables GC and runs uvicorn
+     on the inherited socket (the kernel spreads connections across them)
+
+Pages stay shared copy-on-write until a worker writes to them. Per-process state is
+re-created in the child by os.register_at_fork hooks next to what owns it: the DB
+connection pool (DB/database.py), the OpenAI client (llm_providers.py), the
+AviationStack session (api_clients/aviationstack_api.py) and the log listener
+(utils/logger.py). Worker 0 also runs the policy digest refresher (main.py).
+
+The master restarts workers that die and forwards SIGTERM/SIGINT to them. Metrics
+(/metrics) are per worker. Linux/macOS only (fork).
+
+Usage (from the project root):
+    python -m backend.server --workers 8 --host 0.0.0.0 --port 8000
+    python -m backend.server --workers 8 --no-preload   # each worker loads its own copy
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List
+
+import uvicorn
+
+from backend.utils.config import SERVER_PRELOAD, SERVER_WORKERS
+from backend.utils.logger import get_logger
+
+log = get_logger(__name__)
+
+RESTART_DELAY_S = 1.0 # Between a worker's death and its replacement, so a crash loop can't spin
+
+
+def preload() -> None:
+    """Imports the app and loads everything workers would otherwise load per process."""
+    from backend import main # noqa: F401 (app, orchestrator, spaCy pipeline and gazetteer load at import)
+    from backend.DB.database import engine
+    from backend.DB.models import ensure_indexes
+    from backend.query_processing.intent_classifier import get_classifier
+    from backend.query_processing.llm_providers import selected_providers
+    from backend.query_processing.spacy_processor import nlp
+
+    # Once here rather than only in each worker's startup hook, where the workers would race
+    created = ensure_indexes(engine)
+    if created:
+        log.info("Created %d missing database indexes", created)
+    get_classifier()
+    # The first call fills lazily built tables (lexemes, tokenizer caches) in the shared copy
+    nlp("Is flight AI202 from Delhi to Mumbai on time?")
+    for provider in selected_providers():
+        provider.available() # Loads local model weights; a no-op check for remote providers
+
+
+def listen(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(worker_id: int, sock: socket.socket, log_level: str) -> int:
+    """Body of a forked child: serve on the inherited socket until told to stop."""
+    os.environ["TRIP_ASSISTANT_WORKER_ID"] = str(worker_id)
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, signal.SIG_DFL) # uvicorn installs its own graceful handlers
+    gc.enable()
+    from backend.main import app # Already imported when the master preloaded
+
+    server = uvicorn.Server(uvicorn.Config(app, log_level=log_level))
+    server.run(sockets=[sock])
+    return 0
+
+
+def serve(host: str, port: int, workers: int, preload_models: bool = True, log_level: str = "info") -> int:
+    if preload_models:
+        gc.disable() # No collections while loading: they'd leave freed holes in pages the workers share
+        t0 = time.perf_counter()
+        preload()
+        gc.freeze()
+        log.info("Preloaded app and models in %.1fs (%d objects frozen)", time.perf_counter() - t0,
+                 gc.get_freeze_count())
+
+    sock = listen(host, port)
+    children: Dict[int, int] = {} # pid -> worker id
+    stopping = False
+
+    def spawn(worker_id: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = run_worker(worker_id, sock, log_level)
+            except BaseException:
+                log.exception("Worker %d crashed", worker_id)
+            finally:
+                os._exit(code) # Never return into the master's loop
+        children[pid] = worker_id
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for worker_id in range(workers):
+        spawn(worker_id)
+    log.info("Serving on %s:%d with %d workers (preload=%s)", host, port, workers, preload_models)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        worker_id = children.pop(pid, None)
+        if worker_id is None or stopping:
+            continue
+        log.warning("Worker %d (pid %d) exited with code %d; restarting", worker_id, pid,
+                    os.waitstatus_to_exitcode(status))
+        time.sleep(RESTART_DELAY_S)
+        if not stopping:
+            spawn(worker_id)
+
+    sock.close()
+    return 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Trip Assistant API: preloaded master + forked uvicorn workers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS)
+    parser.add_argument("--no-preload", dest="preload", action="store_false", default=SERVER_PRELOAD,
+                        help="Fork first; every worker then imports the app and loads its own models")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+    return serve(args.host, args.port, args.workers, args.preload, args.log_level)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
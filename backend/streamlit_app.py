@@ -1,19 +1,30 @@
 import streamlit as st
-import requests
+import os
+import sys
 import uuid
 import sqlite3
+import threading
 import pandas as pd
 from pathlib import Path
 from typing import Optional
 
-# -----------------------
-# Config
-# -----------------------
-DEFAULT_BACKEND = "http://127.0.0.1:8000/query"
-
 # We'll try two likely DB locations (project root and backend/DB)
 THIS_FILE = Path(__file__).resolve()
 PROJECT_ROOT = THIS_FILE.parent.parent  # Trip-Assistant/
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))  # `streamlit run` only puts backend/ on the path
+
+from backend.utils.http_session import pooled_session
+
+# -----------------------
+# Config
+# -----------------------
+# "remote": POST to the API over a pooled keep-alive session
+# "inprocess": call process_user_query directly (single-box deployments, no API process needed)
+BACKEND_MODE = os.getenv("TRIP_ASSISTANT_BACKEND_MODE", "remote").lower()
+DEFAULT_BACKEND = os.getenv("TRIP_ASSISTANT_BACKEND_URL", "http://127.0.0.1:8000/query")
+REMOTE_TIMEOUT = (3.05, 12)  # (connect, read) seconds
+REMOTE_RETRIES = 2  # Connection failures and 502/503/504 only
 CANDIDATE_DB_PATHS = [
     PROJECT_ROOT / "airline.db",
     THIS_FILE.parent / "DB" / "airline.db",
@@ -117,26 +128,50 @@ st.markdown(APP_CSS, unsafe_allow_html=True)
 def build_backend_url() -> str:
     return st.session_state.get("backend_url", DEFAULT_BACKEND)
 
+@st.cache_resource
+def get_http_session():
+    # One connection pool per Streamlit server, shared by all browser sessions
+    return pooled_session(retries=REMOTE_RETRIES)
+
+@st.cache_resource(show_spinner="Loading the assistant models...")
+def load_inprocess_backend():
+    """
+    Imports the orchestrator once per Streamlit server, so spaCy, the intent classifier
+    and the gazetteer are loaded once and shared by all sessions (like the API process would).
+    """
+    from backend.query_processing.orchestrator import process_user_query
+    from backend.query_processing.policy_digests import start_refresh_thread
+    start_refresh_thread()  # Same background jobs as the API's startup hook
+    return process_user_query
+
 def backend_query(payload: dict) -> dict:
+    if BACKEND_MODE == "inprocess":
+        try:
+            process_user_query = load_inprocess_backend()
+            return {"response": process_user_query(payload.get("user_id", "default_user"), payload["query"])}
+        except Exception as e:
+            return {"error": f"Backend call failed: {e}"}
     url = build_backend_url()
     try:
-        resp = requests.post(url, json=payload, timeout=12)
+        resp = get_http_session().post(url, json=payload, timeout=REMOTE_TIMEOUT)
         resp.raise_for_status()
         return resp.json()
     except Exception as e:
         return {"error": f"Backend request failed: {e}"}
 
+CHAT_WINDOW = 20  # Messages rendered per rerun; older ones are expanded on demand
+MAX_STORED_MESSAGES = 500  # Oldest messages are dropped beyond this
+
+WELCOME_TEXT = "Hey there! I'm your Trip Assistant. I can help with flight info, bookings, cancellations, and more. Just let me know what you need!"
+
 def ensure_session_state():
     # Must create keys BEFORE any widget with same key is instantiated
     if "messages" not in st.session_state:
-        # **FIX (Feature):** Added 'data' key to support tables
-        st.session_state["messages"] = [
-            {
-                "role": "assistant",
-                "text": "Hey there! I'm your Trip Assistant. I can help with flight info, bookings, cancellations, and more. Just let me know what you need!",
-                "data": None,
-            }
-        ]
+        st.session_state["messages"] = []
+        st.session_state["message_seq"] = 0
+        append_message("assistant", WELCOME_TEXT)
+    if "visible_messages" not in st.session_state:
+        st.session_state["visible_messages"] = CHAT_WINDOW
     if "user_id" not in st.session_state:
         st.session_state["user_id"] = str(uuid.uuid4())
     if "input_text" not in st.session_state:
@@ -146,36 +181,150 @@ def ensure_session_state():
     if "backend_url" not in st.session_state:
         st.session_state["backend_url"] = DEFAULT_BACKEND
 
-# **FIX (Feature):** Added 'data' parameter to store DataFrames
-def append_message(role: str, text: str, data: Optional[pd.DataFrame] = None):
-    st.session_state.messages.append({"role": role, "text": text, "data": data})
+def append_message(role: str, text: str, data_ref: Optional[dict] = None):
+    """
+    Stores one chat message. Tables are kept as a reference to their page (the /view
+    query plus a short summary), never as a DataFrame: the page is re-read through the
+    fetch_page cache when it is displayed. The bubble HTML is built once, here.
+    """
+    seq = st.session_state.get("message_seq", 0) + 1
+    st.session_state["message_seq"] = seq
+    align, bubble = ("flex-end", "bubble-user") if role == "user" else ("flex-start", "bubble-assistant")
+    html = f"<div style='display:flex; justify-content:{align}; margin-bottom:10px'><div class='{bubble}'>{text}</div></div>"
+    messages = st.session_state.messages
+    messages.append({"id": seq, "role": role, "text": text, "html": html, "data": data_ref})
+    if len(messages) > MAX_STORED_MESSAGES:
+        del messages[:len(messages) - MAX_STORED_MESSAGES]
 
 def clear_chat():
     st.session_state["messages"] = []
+    st.session_state["visible_messages"] = CHAT_WINDOW
     # **FIX 1:** Replaced 'experimental_rerun'
     st.rerun()
 
-def read_table(table_name: str) -> pd.DataFrame:
+# -----------------------
+# Table browsing: one page at a time, keyset-paginated, cached
+# -----------------------
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+PAGE_CACHE_TTL_S = 30  # Pages are reused across reruns/widget interactions for this long
+
+@st.cache_resource
+def get_db_connection() -> sqlite3.Connection:
+    # One read-only connection per Streamlit server, shared by all sessions (queries are one page each)
+    con = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False)
+    return con
+
+def _ident(name: str) -> str:
+    return f'"{name}"'  # Only ever called with names validated against the schema
+
+_db_lock = threading.Lock()  # sqlite3 connections must not run statements concurrently
+
+def _query(sql: str, params: tuple = ()) -> list:
+    with _db_lock:
+        return get_db_connection().execute(sql, params).fetchall()
+
+@st.cache_data(ttl=300)
+def table_schema(table_name: str) -> Optional[dict]:
+    """Columns and keyset key of a table, or None if it doesn't exist. Names come from SQLite, never from user input."""
     if not DB_PATH.exists():
-        return pd.DataFrame()
-    # Basic protection against SQL injection
-    if not table_name.isalnum():
-        return pd.DataFrame()
-    try:
-        con = sqlite3.connect(str(DB_PATH))
-        df = pd.read_sql_query(f"SELECT * FROM {table_name}", con)
-        return df
-    except Exception:
-        return pd.DataFrame()
-    finally:
-        try:
-            con.close()
-        except Exception:
-            pass
+        return None
+    tables = {row[0] for row in _query("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if table_name not in tables:
+        return None
+    info = _query(f"PRAGMA table_info({_ident(table_name)})")  # (cid, name, type, notnull, default, pk)
+    pks = [row[1] for row in info if row[5]]
+    # Keyset on the single-column primary key (e.g. bookings.pnr), else on rowid
+    return {"columns": [row[1] for row in info], "key": pks[0] if len(pks) == 1 else "rowid"}
+
+@st.cache_data(ttl=PAGE_CACHE_TTL_S, max_entries=256)
+def fetch_page(table_name: str, columns: tuple, filters: tuple, after: Optional[str], page_size: int) -> tuple:
+    """
+    One page of `table_name`: rows with key > `after` matching the equality `filters`,
+    ordered by key. Returns (DataFrame of the page, cursor for the next page or None).
+    Only page_size (+1 to detect more) rows are read, whatever the table size.
+    """
+    schema = table_schema(table_name)
+    key = schema["key"]
+    select = [key] + [c for c in columns if c != key]
+    where, params = [], []
+    if after is not None:
+        where.append(f"{_ident(key)} > ?")
+        params.append(after)
+    for col, value in filters:
+        where.append(f"{_ident(col)} = ?")
+        params.append(value)
+    sql = (f"SELECT {', '.join(map(_ident, select))} FROM {_ident(table_name)}"
+           + (f" WHERE {' AND '.join(where)}" if where else "")
+           + f" ORDER BY {_ident(key)} LIMIT ?")
+    rows = _query(sql, tuple(params) + (page_size + 1,))
+    next_after = str(rows[page_size - 1][0]) if len(rows) > page_size else None
+    df = pd.DataFrame.from_records(rows[:page_size], columns=select)
+    if key not in columns:
+        df = df.drop(columns=[key])
+    return df, next_after
+
+def parse_view_command(text: str) -> dict:
+    """
+    `/view <table> [cols=a,b] [after=<key>] [limit=N] [<column>=<value> ...]`
+    e.g. `/view seats cols=row_number,column_letter,is_booked flight_id=3 after=120`
+    """
+    parts = text.split()[1:]
+    cmd = {"table": parts[0] if parts else "", "columns": None, "after": None, "limit": PAGE_SIZE, "filters": []}
+    for part in parts[1:]:
+        name, sep, value = part.partition("=")
+        if not sep:
+            continue
+        if name == "cols":
+            cmd["columns"] = [c for c in value.split(",") if c]
+        elif name == "after":
+            cmd["after"] = value
+        elif name == "limit" and value.isdigit():
+            cmd["limit"] = max(1, min(int(value), MAX_PAGE_SIZE))
+        else:
+            cmd["filters"].append((name, value))
+    return cmd
+
+def view_table(cmd: dict) -> tuple:
+    """
+    Validates a parsed /view command against the schema and reads its page; returns
+    (message text, data reference for append_message or None).
+    """
+    table_name = cmd["table"]
+    schema = table_schema(table_name)
+    if schema is None:
+        return f"Table `{table_name}` does not exist.", None
+    columns = cmd["columns"] or schema["columns"]
+    unknown = [c for c in list(columns) + [f for f, _ in cmd["filters"]] if c not in schema["columns"]]
+    if unknown:
+        return f"Unknown column(s) for `{table_name}`: {', '.join(unknown)}. Columns: {', '.join(schema['columns'])}", None
+    df, next_after = fetch_page(table_name, tuple(columns), tuple(cmd["filters"]), cmd["after"], cmd["limit"])
+    if df.empty:
+        return f"No rows in `{table_name}` for that page/filter.", None
+    text = f"Displaying {len(df)} row(s) of `{table_name}`"
+    if next_after is not None:
+        # Same projection and filters, continuing after this page's last key
+        extra = "".join(f" {f}={v}" for f, v in cmd["filters"])
+        if cmd["columns"]:
+            extra += f" cols={','.join(cmd['columns'])}"
+        text += f". Next page: `/view {table_name} after={next_after} limit={cmd['limit']}{extra}`"
+    data_ref = {"table": table_name, "columns": tuple(columns), "filters": tuple(cmd["filters"]),
+                "after": cmd["after"], "limit": cmd["limit"],
+                "summary": f"{len(df)} row(s) × {len(df.columns)} column(s) of {table_name}"}
+    return text, data_ref
+
+def render_data_ref(data_ref: dict, expanded: bool, key: str):
+    """Shows a message's table on demand; only the page it refers to is ever read."""
+    if st.toggle(f"Show table: {data_ref['summary']}", value=expanded, key=key):
+        df, _ = fetch_page(data_ref["table"], data_ref["columns"], data_ref["filters"], data_ref["after"], data_ref["limit"])
+        st.dataframe(df, use_container_width=True)
 
 # Initialize session state safely
 ensure_session_state()
 
+if BACKEND_MODE == "inprocess":
+    load_inprocess_backend()  # Warm the shared models before the first message, not during it
+
 # If a quick action was clicked previously (pending_command), set input_text and clear pending
 if st.session_state.pending_command:
     st.session_state.input_text = st.session_state.pending_command
@@ -219,8 +368,8 @@ with st.sidebar:
     #     # st.success(f"DB found: {DB_PATH}")
     #     tbl = st.selectbox("Table to view", ["flights", "customers", "bookings", "policies", "seats"], key="inspect_table")
     #     if st.button("Load table", use_container_width=True): # Added width
-    #         df = read_table(st.session_state.inspect_table)
-    #         if df.empty:
+    #         _, data_ref = view_table(parse_view_command(f"/view {st.session_state.inspect_table}"))
+    #         if data_ref is None:
     #             st.warning("Table empty or could not be read.")
     #         else:
     #             st.dataframe(df)
@@ -238,16 +387,21 @@ st.markdown("<div style='display:flex; gap:14px; align-items:center;'><div class
 st.write("")
 
 # --- NEW: Chat window with fixed height and scroll ---
+# Only the most recent window is rendered, so reruns stay flat as the conversation grows
 chat_container = st.container(height=550)
 with chat_container:
-    for m in st.session_state.messages:
-        if m["role"] == "user":
-            st.markdown(f"<div style='display:flex; justify-content:flex-end; margin-bottom:10px'><div class='bubble-user'>{m['text']}</div></div>", unsafe_allow_html=True)
-        else:
-            st.markdown(f"<div style='display:flex; justify-content:flex-start; margin-bottom:10px'><div class='bubble-assistant'>{m['text']}</div></div>", unsafe_allow_html=True)
-            # **FIX (Feature):** Render dataframe if it exists in the message
-            if m.get("data") is not None:
-                st.dataframe(m["data"], use_container_width=True)
+    messages = st.session_state.messages
+    hidden = max(0, len(messages) - st.session_state.visible_messages)
+    if hidden:
+        if st.button(f"Show {min(hidden, CHAT_WINDOW)} earlier message(s) ({hidden} hidden)", key="show_earlier"):
+            st.session_state.visible_messages += CHAT_WINDOW
+            st.rerun()
+    latest_data_id = next((m["id"] for m in reversed(messages) if m.get("data")), None)
+    for m in messages[hidden:]:
+        st.markdown(m["html"], unsafe_allow_html=True)
+        if m.get("data"):
+            # Only the newest table starts expanded; older ones are read when toggled open
+            render_data_ref(m["data"], expanded=m["id"] == latest_data_id, key=f"data_{m['id']}")
 
 st.markdown("---")
 
@@ -292,17 +446,14 @@ if submit:
         st.warning("Please enter a message.")
 
     # **FIX (Feature):** Handle '/view' command locally
-    elif text.startswith("/view "):
-        table_name = text.split(" ", 1)[-1].strip()
+    elif text.startswith("/view"):
+        cmd = parse_view_command(text)
         append_message("user", text)  # Add user's command to chat
-        if not table_name:
-            append_message("assistant", "Please specify a table name. e.g., `/view customers`")
+        if not cmd["table"]:
+            append_message("assistant", "Please specify a table name. e.g., `/view customers` or `/view seats flight_id=3 cols=row_number,column_letter,is_booked`")
         else:
-            df = read_table(table_name)
-            if df.empty:
-                append_message("assistant", f"Table `{table_name}` is empty or does not exist.")
-            else:
-                append_message("assistant", f"Displaying table: `{table_name}`", data=df)
+            reply, data_ref = view_table(cmd)
+            append_message("assistant", reply, data_ref=data_ref)
         # Rerun to show new messages (form clear_on_submit handles input)
         st.rerun()
 
@@ -0,0 +1,87 @@
+# backend/utils/cache.py
+"""
+Small thread-safe LRU cache with hit/miss/eviction stats, plus helpers to freeze
+cached values so callers sharing one cached object can't mutate it.
+"""
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Hashable, Mapping
+
+from backend.utils.memory_diagnostics import deep_sizeof, register_component
+from backend.utils.metrics import counter
+
+CACHE_EVENTS = counter(
+    "trip_assistant_cache_events_total",
+    "Cache lookups and evictions per named cache (event = hit | miss | eviction).",
+    ("cache", "event"),
+)
+
+
+def freeze(value: Any) -> Any:
+    """Recursively converts dicts to read-only mappings and lists/sets to tuples/frozensets."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(freeze(v) for v in value)
+    return value
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry; maxsize <= 0 disables caching."""
+
+    def __init__(self, name: str, maxsize: int = 1024):
+        self.name = name
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        register_component(f"cache.{name}", self.memory_stats)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Returns the cached value for `key`, computing and storing it on a miss (outside the lock)."""
+        if self.maxsize <= 0:
+            return compute()
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                CACHE_EVENTS.inc(self.name, "hit")
+                return self._data[key]
+            self.misses += 1
+        CACHE_EVENTS.inc(self.name, "miss")
+        value = compute()
+        with self._lock:
+            self._data[key] = value # A concurrent miss on the same key just stores an equal value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+                CACHE_EVENTS.inc(self.name, "eviction")
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def memory_stats(self) -> Dict[str, int]:
+        with self._lock:
+            items = list(self._data.items())
+        return {"entries": len(items), "maxsize": self.maxsize, "bytes": deep_sizeof(items)}
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -7,3 +7,57 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 load_dotenv(os.path.join(BASE_DIR, '.env'))
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+# Optional override, e.g. http://127.0.0.1:8100/v1 for the local fake server used in load tests
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "")
+
+# Intent source for process_user_query: "rules" (keyword hints), "classifier" or "hybrid"
+INTENT_SOURCE = os.getenv("INTENT_SOURCE", "rules").lower()
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.6"))
+
+# Max distinct canonical queries kept by the entity extraction memo (0 disables it)
+ENTITY_CACHE_SIZE = int(os.getenv("ENTITY_CACHE_SIZE", "1024"))
+
+# Seconds between background policy digest refreshes in the API process (0 disables the thread)
+POLICY_DIGEST_REFRESH_S = float(os.getenv("POLICY_DIGEST_REFRESH_S", "3600"))
+
+# LLM admission control (see query_processing/llm_gateway.py); 0 disables a limit
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "90000"))
+LLM_QUEUE_DEADLINE_S = float(os.getenv("LLM_QUEUE_DEADLINE_S", "2.0")) # Max queueing for interactive turns
+
+# LLM providers (see query_processing/llm_providers.py): openai | local | echo.
+# LLM_PROVIDER is the default; LLM_PROVIDER_OVERRIDES picks per call site, e.g. "policy_digest=local,fallback=echo"
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").lower()
+LLM_PROVIDER_OVERRIDES = os.getenv("LLM_PROVIDER_OVERRIDES", "")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "") # Empty: gpt-4o-mini if the account lists it, else gpt-3.5-turbo
+LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", "distilgpt2") # Hugging Face model id or path, run on CPU
+LLM_ECHO_LATENCY_MS = float(os.getenv("LLM_ECHO_LATENCY_MS", "0")) # Simulated latency of the echo provider
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "20")) # Per attempt
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2")) # Retries on timeouts, rate limits and 5xx
+LLM_RETRY_BACKOFF_S = float(os.getenv("LLM_RETRY_BACKOFF_S", "0.5")) # Base of the jittered exponential backoff
+
+# Production server (backend/server.py): worker processes forked from one preloaded master
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "4"))
+SERVER_PRELOAD = os.getenv("SERVER_PRELOAD", "1") != "0" # 0: every worker loads its own models after fork
+
+# Opt-in memory diagnostics (utils/memory_diagnostics.py, GET /admin/memory). Off: nothing traced, no endpoint
+MEMORY_DIAGNOSTICS = os.getenv("MEMORY_DIAGNOSTICS", "0") == "1"
+MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", "15")) # Traceback depth kept per allocation
+MEMORY_SNAPSHOT_INTERVAL_S = float(os.getenv("MEMORY_SNAPSHOT_INTERVAL_S", "300")) # 0: snapshots only on request
+
+# Per-request deadlines (utils/deadline.py): budget of a /query turn when the client sends no `deadline`
+# (0: none). Stages get the remaining budget as their timeout; below *_MIN_BUDGET_S the slow stage is skipped
+REQUEST_DEADLINE_S = float(os.getenv("REQUEST_DEADLINE_S", "10"))
+API_MIN_BUDGET_S = float(os.getenv("API_MIN_BUDGET_S", "1.0")) # Live AviationStack lookup, else DB/template answer
+LLM_MIN_BUDGET_S = float(os.getenv("LLM_MIN_BUDGET_S", "1.5")) # LLM call, else template answer
+DEADLINE_RESERVE_S = float(os.getenv("DEADLINE_RESERVE_S", "0.2")) # Kept back from stage timeouts for the fallback answer
+
+# Connecting itineraries (DB/route_graph.py), offered by the booking flow when a route has no direct flight
+ITINERARY_MAX_LEGS = int(os.getenv("ITINERARY_MAX_LEGS", "3")) # Flights per itinerary (3 = up to two stops)
+ITINERARY_MIN_CONNECTION_MIN = float(os.getenv("ITINERARY_MIN_CONNECTION_MIN", "45")) # Minimum connection time
+ITINERARY_MAX_CONNECTION_H = float(os.getenv("ITINERARY_MAX_CONNECTION_H", "12")) # Longest layover offered
+# Seconds between checks for flights changed outside this process (other workers, scripts, direct SQL)
+ROUTE_GRAPH_CHECK_S = float(os.getenv("ROUTE_GRAPH_CHECK_S", "5"))
+
+# Flights offered per booking request (the cheapest free seat per class of each), see find_booking_candidates
+BOOKING_CHOICES = int(os.getenv("BOOKING_CHOICES", "3"))
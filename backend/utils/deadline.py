@@ -0,0 +1,83 @@
+# backend/utils/deadline.py
+"""
+Per-request deadlines, carried in a ContextVar so every stage of a chat turn sees
+the same budget without threading it through each signature.
+
+The /query entry point opens the budget; stages size their own timeouts from what
+is left and skip slow, optional work (live API, LLM) once too little remains, so a
+turn answers with the fastest source it has (DB status, template) instead of
+running past the point where the client has given up.
+
+Usage:
+    with request_deadline(5.0):                   # main.py, around process_user_query
+        ...
+        if has_budget(API_MIN_BUDGET_S):          # else take the DB/template path
+            requests.get(url, timeout=stage_timeout(8.0))
+
+Outside a request_deadline block there is no deadline: has_budget() is always
+True and stage_timeout() returns the stage's own default.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from backend.utils.config import DEADLINE_RESERVE_S
+from backend.utils.metrics import counter
+
+MIN_STAGE_TIMEOUT_S = 0.05 # Never hand a client library a zero or negative timeout
+
+DEADLINE_EVENTS = counter(
+    "trip_assistant_deadline_events_total",
+    "Deadline effects per stage (event = degraded: slow stage skipped for lack of budget | exceeded: turn overran).",
+    ("stage", "event"),
+)
+
+_deadline: ContextVar[Optional[float]] = ContextVar("trip_assistant_deadline", default=None)
+
+
+@contextmanager
+def request_deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Sets a deadline `seconds` from now for the enclosed work (None or <= 0: no deadline)."""
+    if not seconds or seconds <= 0:
+        yield
+        return
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        if time.monotonic() > _deadline.get():
+            DEADLINE_EVENTS.inc("turn", "exceeded")
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left (negative once passed), or None without a deadline."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def has_budget(seconds: float, stage: Optional[str] = None) -> bool:
+    """True unless a deadline leaves less than `seconds`; counts a degradation for `stage` when it doesn't."""
+    left = remaining()
+    if left is None or left >= seconds:
+        return True
+    if stage:
+        DEADLINE_EVENTS.inc(stage, "degraded")
+    return False
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def stage_timeout(default_s: float) -> float:
+    """
+    The stage's own timeout, capped by the remaining budget less DEADLINE_RESERVE_S, so
+    a stage that times out still leaves time to answer from the fallback.
+    """
+    left = remaining()
+    if left is None:
+        return default_s
+    return max(min(default_s, left - DEADLINE_RESERVE_S), MIN_STAGE_TIMEOUT_S)
@@ -0,0 +1,30 @@
+# backend/utils/http_session.py
+"""
+Pooled keep-alive HTTP sessions.
+
+A requests.Session reuses TCP connections across calls (no handshake per request).
+Every method is retried on connection failures (the request was never sent).
+Gateway statuses (502/503/504) are retried for idempotent methods only: a 504 means
+the gateway gave up while the application may still be processing the request,
+and POST /query is not idempotent (a confirm turn books seats and advances the
+flow), so a retried POST could apply twice. Read timeouts are not retried.
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def pooled_session(retries: int = 2, pool_maxsize: int = 32, backoff_s: float = 0.2) -> requests.Session:
+    """A Session with up to `pool_maxsize` keep-alive connections per host; share one per process."""
+    retry = Retry(
+        total=retries, connect=retries, read=0, status=retries,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS, # Status retries: idempotent methods only, never POST
+        backoff_factor=backoff_s,
+        raise_on_status=False, # Hand the last 5xx back to the caller's raise_for_status
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -0,0 +1,152 @@
+# backend/utils/logger.py
+"""
+Structured, non-blocking logging for the backend.
+
+Records are handed to a queue on the calling thread and serialized/written by a
+background listener thread, so request threads never block on stdout/stderr.
+Messages use stdlib lazy %-formatting: `log.debug("seat %s", seat)` costs an
+`isEnabledFor` check when DEBUG is off. Enabled records get their message formatted
+on the calling thread (args such as state dicts may change before the listener runs);
+the JSON entry, timestamp and exception text are built by the listener.
+
+Environment:
+    LOG_LEVEL                default level for backend.* loggers (INFO)
+    LOG_LEVELS               per-module overrides, e.g.
+                             "backend.query_processing.rag=DEBUG,backend.DB=WARNING"
+    LOG_FORMAT               "json" (default) or "text"
+    LOG_DEBUG_SAMPLE_RATE    fraction of DEBUG records kept (1.0 = all), so hot-path
+                             debug logging can stay on under load
+
+Usage:
+    from backend.utils.logger import get_logger
+    log = get_logger(__name__)
+    log.info("Calling API to search flights: %s -> %s", src, dst)
+    log.warning("Seat not found", extra={"pnr": pnr})   # extra keys become JSON fields
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+
+ROOT_LOGGER = "backend"
+
+# Attributes every LogRecord has; anything else came from `extra=` and is emitted as a field
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_configure_lock = threading.Lock()
+_listener: logging.handlers.QueueListener | None = None
+_queue: queue.SimpleQueue | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, extra fields and exception text."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DebugSampler(logging.Filter):
+    """Keeps every Nth DEBUG record (deterministic, lock-free enough for sampling); other levels pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._seen = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.DEBUG or self.every == 1:
+            return True
+        if self.every == 0:
+            return False
+        self._seen += 1
+        return self._seen % self.every == 0
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Merges the %-args into the message on the calling thread, like the stock
+    QueueHandler, so the line shows the values at log time. Unlike it, the full
+    format (JSON assembly, traceback text) is left to the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _parse_levels(spec: str) -> dict:
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _start_listener() -> None:
+    """(Re)creates the queue and background writer thread; also used after fork."""
+    global _listener, _queue
+    stream = logging.StreamHandler(sys.stderr)
+    if os.getenv("LOG_FORMAT", "json").lower() == "text":
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+    else:
+        stream.setFormatter(JsonFormatter())
+    _queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(_queue, stream, respect_handler_level=False)
+    _listener.start()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    for handler in list(root.handlers):
+        if isinstance(handler, DeferredQueueHandler):
+            root.removeHandler(handler)
+    handler = DeferredQueueHandler(_queue)
+    handler.addFilter(DebugSampler(float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))))
+    root.addHandler(handler)
+
+
+def _stop_listener() -> None:
+    if _listener is not None:
+        _listener.stop() # Drains the queue before returning
+
+
+def configure_logging() -> None:
+    """Idempotently installs the queue handler, listener thread and per-module levels."""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+        root.propagate = False # Don't double-log through the root logger (e.g. uvicorn's config)
+        for name, level in _parse_levels(os.getenv("LOG_LEVELS", "")).items():
+            logging.getLogger(name).setLevel(level)
+        _start_listener()
+        atexit.register(_stop_listener)
+        if hasattr(os, "register_at_fork"):
+            # The listener thread does not survive fork(); give each child its own
+            os.register_at_fork(after_in_child=_start_listener)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Returns a logger under the `backend` hierarchy, configuring logging on first use."""
+    configure_logging()
+    if name != ROOT_LOGGER and not name.startswith(ROOT_LOGGER + "."):
+        name = f"{ROOT_LOGGER}.{name}"
+    return logging.getLogger(name)
@@ -0,0 +1,209 @@
+# backend/utils/memory_diagnostics.py
+"""
+Opt-in memory diagnostics: what is a worker's memory made of, and what is growing?
+
+Two views, both computed only when asked for (GET /admin/memory):
+  * allocations: tracemalloc snapshots. start() takes a baseline and a background
+    thread takes a snapshot every MEMORY_SNAPSHOT_INTERVAL_S; a report diffs a fresh
+    snapshot against the baseline or the previous one, grouped by source line or by
+    the innermost backend/ frame of each traceback (so json.loads of an AviationStack
+    payload is charged to aviationstack_api.py rather than json/decoder.py)
+  * components: sizers registered by the modules that own long-lived state
+    (conversation state, caches, models, live DB sessions), plus live object counts per type
+
+With MEMORY_DIAGNOSTICS unset nothing is traced, no thread runs and the admin
+endpoint is not mounted; register_component() only stores a callable at import.
+
+Usage:
+    register_component("conversation_state", lambda: {"users": len(state), "bytes": deep_sizeof(state)})
+"""
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from types import FunctionType, MappingProxyType, ModuleType
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.utils.config import MEMORY_SNAPSHOT_INTERVAL_S, MEMORY_TRACE_FRAMES
+from backend.utils.logger import get_logger
+
+log = get_logger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+# Types whose live counts are always reported, leaked or not
+WATCHED_TYPES = ("spacy.tokens.doc.Doc", "sqlalchemy.orm.session.Session")
+# Shared, not owned by whatever references them: deep_sizeof does not descend into these
+_SKIP_TYPES = (type, ModuleType, FunctionType)
+
+_components: Dict[str, Callable[[], Dict[str, Any]]] = {}
+_snapshots = {"baseline": None, "latest": None}
+_snapshot_lock = threading.Lock()
+
+
+def register_component(name: str, sizer: Callable[[], Dict[str, Any]]) -> None:
+    """Adds a named size accounting hook; `sizer` is only called when a report is built."""
+    _components[name] = sizer
+
+
+def deep_sizeof(obj: Any, max_objects: int = 200_000) -> int:
+    """
+    Bytes of `obj` and everything reachable through containers, instance __dict__s and
+    __slots__ (each object counted once). Stops after `max_objects`, so it is a lower
+    bound for very large structures.
+    """
+    seen, stack, total = set(), [obj], 0
+    while stack and len(seen) < max_objects:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, _SKIP_TYPES):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, (dict, MappingProxyType)):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            stack.extend(item)
+        else:
+            if hasattr(item, "__dict__"):
+                stack.append(item.__dict__)
+            for slot in getattr(type(item), "__slots__", ()):
+                if hasattr(item, slot):
+                    stack.append(getattr(item, slot))
+    return total
+
+
+def component_sizes() -> Dict[str, Dict[str, Any]]:
+    sizes = {}
+    for name, sizer in sorted(_components.items()):
+        t0 = time.perf_counter()
+        try:
+            sizes[name] = dict(sizer())
+        except Exception as e: # A broken hook must not take the report down
+            sizes[name] = {"error": str(e)}
+        sizes[name]["seconds"] = round(time.perf_counter() - t0, 4)
+    return sizes
+
+
+def live_objects(predicate: Callable[[Any], bool]) -> List[Any]:
+    """GC-tracked objects matching `predicate` (walks the whole heap: for on-demand sizers only)."""
+    return [o for o in gc.get_objects() if predicate(o)]
+
+
+def live_object_counts(limit: int = 20) -> Dict[str, int]:
+    """Live GC-tracked objects per type: the `limit` most common, plus WATCHED_TYPES."""
+    counts = Counter(f"{type(o).__module__}.{type(o).__qualname__}" for o in gc.get_objects())
+    top = dict(counts.most_common(limit))
+    top.update({name: counts.get(name, 0) for name in WATCHED_TYPES})
+    return top
+
+
+def _rss_kb() -> Optional[int]:
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def enabled() -> bool:
+    return tracemalloc.is_tracing()
+
+
+def take_snapshot() -> tracemalloc.Snapshot:
+    """Takes a snapshot (without tracemalloc's own and import machinery allocations) and makes it the latest."""
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ))
+    with _snapshot_lock:
+        if _snapshots["baseline"] is None:
+            _snapshots["baseline"] = snapshot
+        _snapshots["latest"] = snapshot
+    return snapshot
+
+
+def start(nframes: int = MEMORY_TRACE_FRAMES, interval_s: float = MEMORY_SNAPSHOT_INTERVAL_S) -> None:
+    """Starts tracing (idempotent), takes the baseline and, if interval_s > 0, periodic snapshots."""
+    if tracemalloc.is_tracing():
+        return
+    tracemalloc.start(nframes)
+    take_snapshot()
+    log.warning("Memory diagnostics on: tracemalloc with %d frames (slows allocation-heavy code)", nframes)
+    if interval_s > 0:
+        def loop():
+            while tracemalloc.is_tracing():
+                time.sleep(interval_s)
+                take_snapshot()
+
+        threading.Thread(target=loop, name="memory-snapshots", daemon=True).start()
+
+
+def stop() -> None:
+    tracemalloc.stop()
+    with _snapshot_lock:
+        _snapshots.update(baseline=None, latest=None)
+
+
+def _backend_frame(traceback: tracemalloc.Traceback) -> str:
+    """Innermost frame in backend/ code (this module excluded), else the innermost frame."""
+    for frame in reversed(traceback): # Frames are ordered oldest first
+        if frame.filename.startswith(BACKEND_DIR) and frame.filename != __file__:
+            return f"{frame.filename[len(BACKEND_DIR):]}:{frame.lineno}"
+    frame = traceback[-1]
+    return f"(outside backend) {frame.filename}:{frame.lineno}"
+
+
+def top_allocators(limit: int = 25, group_by: str = "backend", compare: str = "baseline") -> List[Dict[str, Any]]:
+    """
+    Largest allocation sites in a fresh snapshot. group_by: "backend" (innermost
+    backend/ frame), "lineno" or "filename". compare: "baseline", "previous" or "none";
+    when comparing, sites are ordered by growth and carry *_diff fields.
+    """
+    if not tracemalloc.is_tracing():
+        return []
+    with _snapshot_lock:
+        # "previous" is the latest snapshot before the fresh one below (periodic or from the last report)
+        reference = {"baseline": _snapshots["baseline"], "previous": _snapshots["latest"]}.get(compare)
+    snapshot = take_snapshot()
+    key_type = "traceback" if group_by == "backend" else group_by
+    stats = snapshot.compare_to(reference, key_type) if reference is not None else snapshot.statistics(key_type)
+
+    sites: Dict[str, Dict[str, Any]] = {}
+    for stat in stats:
+        where = _backend_frame(stat.traceback) if group_by == "backend" else str(stat.traceback[-1])
+        site = sites.setdefault(where, {"where": where, "size_kb": 0.0, "count": 0})
+        site["size_kb"] += stat.size / 1024
+        site["count"] += stat.count
+        if reference is not None:
+            site["size_diff_kb"] = site.get("size_diff_kb", 0.0) + stat.size_diff / 1024
+            site["count_diff"] = site.get("count_diff", 0) + stat.count_diff
+
+    order = (lambda s: abs(s["size_diff_kb"])) if reference is not None else (lambda s: s["size_kb"])
+    top = sorted(sites.values(), key=order, reverse=True)[:limit]
+    for site in top:
+        for field in ("size_kb", "size_diff_kb"):
+            if field in site:
+                site[field] = round(site[field], 1)
+    return top
+
+
+def memory_report(limit: int = 25, group_by: str = "backend", compare: str = "baseline",
+                  objects: bool = True) -> Dict[str, Any]:
+    report: Dict[str, Any] = {"pid": os.getpid(), "rss_kb": _rss_kb(), "tracing": tracemalloc.is_tracing()}
+    if report["tracing"]:
+        current, peak = tracemalloc.get_traced_memory()
+        report.update(traced_kb=current // 1024, traced_peak_kb=peak // 1024,
+                      tracemalloc_overhead_kb=tracemalloc.get_tracemalloc_memory() // 1024,
+                      allocations=top_allocators(limit, group_by, compare))
+    report["components"] = component_sizes()
+    if objects:
+        report["live_objects"] = live_object_counts(limit)
+    report["gc"] = {"counts": gc.get_count(), "frozen": gc.get_freeze_count()}
+    return report
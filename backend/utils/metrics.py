@@ -0,0 +1,247 @@
+# backend/utils/metrics.py
+"""
+Lightweight in-process metrics with Prometheus text exposition.
+
+Recording is a perf_counter pair plus a bisect into fixed buckets under a lock;
+nothing is formatted until /metrics is scraped.
+
+Usage:
+    @track_request                      # wraps one chat turn, records stage="total"
+    def process_user_query(...):
+        set_intent("cancel_booking")    # label for every span recorded in this turn
+        with span("extract_entities"):
+            ...
+
+    @timed("llm")                       # times every call of an external helper
+    def generate_llm_response(...): ...
+
+Spans recorded inside a tracked request are buffered and labelled with the
+turn's final intent when it ends; spans outside one are labelled intent="none".
+"""
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+# Seconds; spans from sub-millisecond regex work up to slow LLM/API calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down (queue depth, in-flight calls)."""
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed set of label names."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labelvalues: str) -> int:
+        series = self._series.get(labelvalues)
+        return series[2] if series else 0
+
+    def mean(self, *labelvalues: str) -> float:
+        """Mean observed value (0.0 before any observation); sum and count read under one lock."""
+        with self._lock:
+            series = self._series.get(labelvalues)
+            return series[1] / series[2] if series else 0.0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items())
+        for labels, (counts, total, count) in snapshot:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Counter | Gauge | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    """Creates (or returns the already registered) counter called `name`."""
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    """Creates (or returns the already registered) gauge called `name`."""
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    """Creates (or returns the already registered) histogram called `name`."""
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def render_prometheus() -> str:
+    return REGISTRY.render()
+
+
+STAGE_LATENCY = histogram(
+    "trip_assistant_stage_latency_seconds",
+    "Latency of each stage of a chat turn (stage=total is the whole turn).",
+    ("intent", "stage"),
+)
+
+
+class _RequestTrace:
+    __slots__ = ("intent", "spans")
+
+    def __init__(self):
+        self.intent = "unknown"
+        self.spans: List[Tuple[str, float]] = []
+
+
+_current_request: ContextVar[_RequestTrace | None] = ContextVar("trip_assistant_request_trace", default=None)
+
+
+def set_intent(intent: str | None) -> None:
+    """Sets the intent label used for every span of the current chat turn."""
+    trace = _current_request.get()
+    if trace is not None and intent:
+        trace.intent = intent
+
+
+def _record(stage: str, duration: float) -> None:
+    trace = _current_request.get()
+    if trace is None:
+        STAGE_LATENCY.observe(duration, "none", stage)
+    else:
+        trace.spans.append((stage, duration))
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Times the enclosed block as `stage`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(stage, time.perf_counter() - start)
+
+
+def timed(stage: str) -> Callable:
+    """Decorator form of span() for helpers called from many places."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def track_request(func: Callable) -> Callable:
+    """Decorator for the per-turn entry point: buffers spans and flushes them with the final intent."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        trace = _RequestTrace()
+        token = _current_request.set(trace)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            total = time.perf_counter() - start
+            _current_request.reset(token)
+            for stage, duration in trace.spans:
+                STAGE_LATENCY.observe(duration, trace.intent, stage)
+            STAGE_LATENCY.observe(total, trace.intent, "total")
+    return wrapper